@@ -0,0 +1,275 @@
+"""
+K-12 Learning Management System - Term Archive
+
+When a term ends its submissions and grades move out of the live store
+into a read-only archive directory of fixed-width NumPy arrays (IDs,
+grades, timestamps) plus a text file with an offsets array for
+submission content and feedback. Archives are opened with mmap, so a
+query over years of terms reads only the pages it touches: submissions
+are sorted by student with a per-student offsets array, so one student's
+history is a single contiguous slice.
+
+Usage:
+    archive_term(store, 'archive/2025-fall', term='2025 Fall')   # writes, then drops from the store
+    with TermArchive('archive/2025-fall') as fall:
+        fall.student_scores('student1')
+        fall.submission('student1', 'a1')['content']
+    history = archived_history([fall, spring], 'student1', live=store.student_performance.get('student1'))
+
+Each archive is written to a temporary directory that then replaces the
+target, so readers never open a half-written archive. Scores are grouped
+by the same subject keys as live PerformanceHistory ('math', not
+'Mathematics'), so archived and live terms merge into one history.
+"""
+
+import json
+import mmap
+import os
+from datetime import datetime
+
+import numpy as np
+
+from lms_files import atomic_directory
+from lms_performance import PerformanceHistory, subject_key
+
+
+FORMAT_VERSION = 1
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+SUBMISSION_DTYPE = np.dtype([
+    ('student', '<i4'), ('assignment', '<i4'), ('course', '<i4'),
+    ('submitted', '<M8[s]'), ('grade', '<f4'), ('ai_score', '<f4'),
+])
+ASSIGNMENT_DTYPE = np.dtype([
+    ('assignment', '<i4'), ('course', '<i4'), ('due', '<M8[s]'), ('points', '<i4'), ('difficulty', '<i1'),
+])
+
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+def _nan_if_none(value):
+    return np.nan if value is None else value
+
+
+def write_archive(path, term, courses, assignments, submissions):
+    """Write course, assignment and submission records (e.g. from a StoreSnapshot) as an archive"""
+    with atomic_directory(path) as tmp_path:
+        return _write_files(tmp_path, term, courses, assignments, submissions)
+
+
+def _write_files(path, term, courses, assignments, submissions):
+    course_ids = list(courses)
+    course_index = {course_id: i for i, course_id in enumerate(course_ids)}
+    assignment_ids = list(assignments)
+    assignment_index = {assignment_id: i for i, assignment_id in enumerate(assignment_ids)}
+    subs = [s for s in submissions if s.assignment_id in assignment_index]
+    student_ids = sorted({s.student_id for s in subs})
+    student_index = {student_id: i for i, student_id in enumerate(student_ids)}
+    # Student order, then submission time, so each student's history is one slice
+    subs.sort(key=lambda s: (student_index[s.student_id], s.submitted_date))
+
+    records = np.zeros(len(subs), dtype=SUBMISSION_DTYPE)
+    records['student'] = [student_index[s.student_id] for s in subs]
+    records['assignment'] = [assignment_index[s.assignment_id] for s in subs]
+    records['course'] = [course_index[assignments[s.assignment_id].course_id] for s in subs]
+    records['submitted'] = [np.datetime64(s.submitted_date, 's') for s in subs]
+    records['grade'] = [_nan_if_none(s.grade) for s in subs]
+    records['ai_score'] = [_nan_if_none(s.ai_score) for s in subs]
+    np.save(os.path.join(path, 'submissions.npy'), records)
+
+    offsets = np.searchsorted(records['student'], np.arange(len(student_ids) + 1)).astype(np.int64)
+    np.save(os.path.join(path, 'student_offsets.npy'), offsets)
+
+    table = np.zeros(len(assignment_ids), dtype=ASSIGNMENT_DTYPE)
+    for i, assignment_id in enumerate(assignment_ids):
+        a = assignments[assignment_id]
+        table[i] = (i, course_index[a.course_id], np.datetime64(a.due_date, 's'), a.points,
+                    DIFFICULTIES.index(a.difficulty) if a.difficulty in DIFFICULTIES else -1)
+    np.save(os.path.join(path, 'assignments.npy'), table)
+
+    # Text: content and feedback of submission i are entries 2i and 2i+1
+    text_offsets = np.zeros(2 * len(subs) + 1, dtype=np.int64)
+    with open(os.path.join(path, 'text.bin'), 'wb') as f:
+        position = 0
+        for i, s in enumerate(subs):
+            for j, text in enumerate((s.content or '', s.feedback or '')):
+                data = text.encode('utf-8')
+                f.write(data)
+                position += len(data)
+                text_offsets[2 * i + j + 1] = position
+    np.save(os.path.join(path, 'text_offsets.npy'), text_offsets)
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'term': term,
+        'created': datetime.now().isoformat(),
+        'students': student_ids,
+        'courses': [{'id': c, 'name': courses[c].name, 'subject': courses[c].subject} for c in course_ids],
+        'assignments': [{'id': a, 'title': assignments[a].title} for a in assignment_ids],
+    }
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return len(subs)
+
+
+def archive_term(store, path, term, course_ids=None, remove=True, attempts=3):
+    """Archive the assignments and submissions of some (default all) courses, then drop them from the store
+
+    Files are written from a snapshot without blocking writers. If the
+    store changed before the removal, the archive is written again so
+    nothing is dropped unarchived; the last attempt holds the store lock
+    throughout.
+    """
+    for attempt in range(attempts):
+        locked = remove and attempt == attempts - 1
+        if locked:
+            store.lock.acquire()
+        try:
+            snap = store.snapshot()
+            ids = list(snap.courses) if course_ids is None else list(course_ids)
+            courses = {c: snap.courses[c] for c in ids}
+            assignments = {aid: a for aid, a in snap.assignments.items() if a.course_id in courses}
+            submissions = [s for key, s in snap.submissions.items() if key[1] in assignments]
+            count = write_archive(path, term, courses, assignments, submissions)
+            if not remove:
+                return count
+            with store.lock:
+                if store.version != snap.epoch:
+                    continue  # written to while archiving; archive again
+                store.remove_assignments(list(assignments))
+            return count
+        finally:
+            if locked:
+                store.lock.release()
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+class TermArchive:
+    """A memory-mapped, read-only term archive"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported archive format {meta.get('format_version')!r} in {path}")
+        self.term = meta['term']
+        self.student_ids = meta['students']
+        self.course_ids = [c['id'] for c in meta['courses']]
+        self.course_subjects = [c['subject'] for c in meta['courses']]
+        self.course_subject_keys = [subject_key(subject) for subject in self.course_subjects]
+        self.assignment_ids = [a['id'] for a in meta['assignments']]
+        self.assignment_titles = [a['title'] for a in meta['assignments']]
+        self._students = {student_id: i for i, student_id in enumerate(self.student_ids)}
+        self._assignments = {assignment_id: i for i, assignment_id in enumerate(self.assignment_ids)}
+
+        self.submissions = np.load(os.path.join(path, 'submissions.npy'), mmap_mode='r')
+        self.student_offsets = np.load(os.path.join(path, 'student_offsets.npy'), mmap_mode='r')
+        self.assignments = np.load(os.path.join(path, 'assignments.npy'), mmap_mode='r')
+        self.text_offsets = np.load(os.path.join(path, 'text_offsets.npy'), mmap_mode='r')
+        self._text_file = open(os.path.join(path, 'text.bin'), 'rb')
+        size = os.fstat(self._text_file.fileno()).st_size
+        self._text = mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return len(self.submissions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+        self._text_file.close()
+
+    def _text_at(self, entry):
+        start, end = int(self.text_offsets[entry]), int(self.text_offsets[entry + 1])
+        return self._text[start:end].decode('utf-8')
+
+    def student_records(self, student_id):
+        """The student's submission records, oldest first (a view into the mapped file)"""
+        index = self._students.get(student_id)
+        if index is None:
+            return self.submissions[:0]
+        return self.submissions[self.student_offsets[index]:self.student_offsets[index + 1]]
+
+    def student_scores(self, student_id, subject=None):
+        """Graded scores, oldest first, optionally for one subject ('math' or 'Mathematics')"""
+        records = self.student_records(student_id)
+        graded = records[~np.isnan(records['grade'])]
+        if subject is not None:
+            key = subject_key(subject)
+            wanted = [i for i, k in enumerate(self.course_subject_keys) if k == key]
+            graded = graded[np.isin(graded['course'], wanted)]
+        return graded['grade'].astype(np.float64)
+
+    def subject_scores(self, student_id):
+        """{subject key, as in PerformanceHistory: scores oldest first} for one student"""
+        records = self.student_records(student_id)
+        graded = records[~np.isnan(records['grade'])]
+        subjects = {}
+        for course, grade in zip(graded['course'].tolist(), graded['grade'].tolist()):
+            subjects.setdefault(self.course_subject_keys[course], []).append(grade)
+        return subjects
+
+    def submission(self, student_id, assignment_id):
+        """One archived submission as a dict (with content and feedback), or None"""
+        column = self._assignments.get(assignment_id)
+        records = self.student_records(student_id)
+        if column is None or not len(records):
+            return None
+        matches = np.flatnonzero(records['assignment'] == column)
+        if not len(matches):
+            return None
+        position = int(self.student_offsets[self._students[student_id]]) + int(matches[0])
+        record = self.submissions[position]
+        return {
+            'student_id': student_id,
+            'assignment_id': assignment_id,
+            'course_id': self.course_ids[record['course']],
+            'title': self.assignment_titles[column],
+            'submitted_date': record['submitted'].astype(datetime),
+            'grade': None if np.isnan(record['grade']) else float(record['grade']),
+            'ai_score': None if np.isnan(record['ai_score']) else float(record['ai_score']),
+            'content': self._text_at(2 * position),
+            'feedback': self._text_at(2 * position + 1) or None,
+        }
+
+    def course_grades(self, course_id):
+        """All graded scores in one course"""
+        if course_id not in self.course_ids:
+            return np.empty(0)
+        grades = self.submissions['grade'][self.submissions['course'] == self.course_ids.index(course_id)]
+        return grades[~np.isnan(grades)].astype(np.float64)
+
+
+def open_archives(directory):
+    """Open every term archive under a directory, oldest (by name) first"""
+    # Dot-prefixed directories are archives still being written or replaced
+    names = sorted(n for n in os.listdir(directory)
+                   if not n.startswith('.') and os.path.exists(os.path.join(directory, n, 'meta.json')))
+    return [TermArchive(os.path.join(directory, name)) for name in names]
+
+
+def archived_history(archives, student_id, live=None, window=None):
+    """PerformanceHistory of a student's archived terms (oldest first) followed by live scores"""
+    history = PerformanceHistory(window=window)
+    for archive in archives:
+        for subject, scores in archive.subject_scores(student_id).items():
+            for score in scores:
+                history.record(subject, score)
+    if live is not None:
+        for subject in live.subjects:
+            for score in live.subject_scores(subject):
+                history.record(subject, score)
+        history.profile.update(live.profile)
+    return history
@@ -0,0 +1,136 @@
+"""
+K-12 Learning Management System - Background Computation
+
+Moves slow dashboard work (analytics statistics and chart rendering) off
+the widget callback thread. Requests are debounced - flipping quickly
+through a filter only computes the selection the user stopped on - and a
+request made while an older one is computing supersedes it, so the stale
+result is discarded instead of shown. The last result computed for a key
+is returned immediately so the widget never sits empty while fresh
+numbers are on their way. The worker thread exits when idle and is
+restarted on the next request.
+
+Charts drawn on the worker use OFFSCREEN_PLT, a minimal stand-in for
+pyplot built on Agg figures, because pyplot's global figure state is not
+thread-safe.
+"""
+
+import threading
+import time
+
+
+# ============================================================================
+# OFFSCREEN FIGURES
+# ============================================================================
+
+class _OffscreenPyplot:
+    """The subplots()/close() subset of pyplot, without global figure state"""
+
+    def subplots(self, nrows=1, ncols=1, figsize=None, **kwargs):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig, fig.subplots(nrows, ncols, **kwargs)
+
+    def close(self, fig):
+        fig.clear()
+
+
+OFFSCREEN_PLT = _OffscreenPyplot()
+
+
+# ============================================================================
+# BACKGROUND TASK
+# ============================================================================
+
+class BackgroundTask:
+    """Computes compute(key) on a worker thread and delivers on_result(key, result)"""
+
+    def __init__(self, compute, on_result, delay=0.2, name='lms-background'):
+        self.compute = compute
+        self.on_result = on_result
+        self.delay = delay
+        self.name = name
+        self.condition = threading.Condition()
+        self.results = {}  # key -> last computed result
+        self.stale = set()  # keys whose result predates an invalidate()
+        self.invalidations = 0
+        self.generation = 0
+        self.requested = None  # (generation, key) waiting to be computed
+        self.requested_at = 0.0
+        self.busy = False
+        self.closed = False
+        self._thread = None
+
+    def request(self, key, refresh=False):
+        """Ask for key's result; returns the last computed result (or None) for immediate display"""
+        with self.condition:
+            if self.closed:
+                return None
+            self.generation += 1
+            cached = self.results.get(key)
+            if cached is not None and key not in self.stale and not refresh:
+                # Nothing to compute, but any older request must not overwrite this one
+                self.requested = None
+                return cached
+            self.requested = (self.generation, key)
+            self.requested_at = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self.condition.notify_all()
+            return cached
+
+    def invalidate(self, keys=None):
+        """Mark cached results stale so the next request recomputes (they still show until then)"""
+        with self.condition:
+            self.stale.update(self.results if keys is None else keys)
+            self.invalidations += 1
+
+    def wait_idle(self, timeout=None):
+        """Block until no request is pending or computing; returns False on timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.requested is None and not self.busy, timeout)
+
+    def close(self):
+        """Cancel pending work and stop delivering results"""
+        with self.condition:
+            self.closed = True
+            self.requested = None
+            self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                # Debounce: wait until requests stop arriving for `delay` seconds
+                while self.requested is not None and not self.closed:
+                    remaining = self.requested_at + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                if self.requested is None or self.closed:
+                    self._thread = None
+                    self.condition.notify_all()
+                    return
+                generation, key = self.requested
+                invalidations = self.invalidations
+                self.requested = None
+                self.busy = True
+
+            result = None
+            try:
+                result = self.compute(key)
+            finally:
+                with self.condition:
+                    self.busy = False
+                    if result is not None:
+                        self.results[key] = result
+                        if invalidations == self.invalidations:
+                            self.stale.discard(key)
+                    # A newer request supersedes this result
+                    current = generation == self.generation and not self.closed
+                    self.condition.notify_all()
+            if current and result is not None:
+                self.on_result(key, result)
@@ -0,0 +1,189 @@
+"""
+K-12 Learning Management System - Benchmark Harness
+
+Renders every dashboard for every user outside a notebook and reports
+render time, the number of display() output messages sent to the front
+end and the number of widgets (comm channels) created.
+
+Usage:
+    python lms_bench.py [runs] [--profile]
+
+With --profile, per-function latencies are printed and a Chrome trace is
+written to lms_trace.json.
+"""
+
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+
+def build_district_store(schools=4, courses_per_school=25, students_per_course=30,
+                         assignments_per_course=10, graded_fraction=0.7, seed=7):
+    """A reproducible district-sized LMSStore for scaling benchmarks"""
+    import random
+    from datetime import timedelta
+
+    from lms_performance import HISTORY_WINDOW, PerformanceHistory, subject_key
+    from lms_store import LMSStore
+    from lms_system import User, Course, Assignment, Submission
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    subjects = ['Mathematics', 'Science', 'English', 'History']
+    difficulties = ['easy', 'medium', 'hard']
+    users, courses, assignments, submissions, performance = {}, {}, {}, {}, {}
+
+    for school in range(schools):
+        for c in range(courses_per_school):
+            course_id = f's{school}c{c}'
+            teacher_id = f's{school}t{c}'
+            users[teacher_id] = User(teacher_id, f'Teacher {school}-{c}', 'teacher')
+            course = Course(course_id, f'Course {school}-{c}', users[teacher_id].name, 7, subjects[c % len(subjects)])
+            course.school = f'school{school}'
+            courses[course_id] = course
+
+            for n in range(students_per_course):
+                student_id = f's{school}u{(c * students_per_course + n) % (courses_per_school * students_per_course // 2)}'
+                if student_id not in users:
+                    users[student_id] = User(student_id, f'Student {student_id}', 'student', 7)
+                    performance[student_id] = PerformanceHistory(window=HISTORY_WINDOW)
+                if student_id not in course.students:
+                    course.students.append(student_id)
+                    performance[student_id].record(subject_key(course.subject), rng.randint(50, 100))
+
+            for n in range(assignments_per_course):
+                assignment_id = f'{course_id}a{n}'
+                due = now + timedelta(days=rng.randint(-14, 14))
+                assignments[assignment_id] = Assignment(
+                    assignment_id, course_id, f'Assignment {n}', 'Synthetic assignment',
+                    due, 100, difficulties[n % len(difficulties)]
+                )
+                course.assignments.append(assignment_id)
+                for student_id in course.students:
+                    if rng.random() < 0.8:
+                        sub = Submission(student_id, assignment_id, 'x' * rng.randint(50, 400),
+                                         due - timedelta(hours=rng.randint(1, 48)))
+                        if rng.random() < graded_fraction:
+                            sub.grade = rng.randint(40, 100)
+                        submissions[(student_id, assignment_id)] = sub
+
+    return LMSStore(users, courses, assignments, submissions, performance)
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+class RenderCounter:
+    """Counts output messages and widget constructions during a render"""
+
+    def __init__(self, widgets):
+        self.widgets = widgets
+        self.display_messages = 0
+        self.widgets_created = 0
+        self._previous_callback = None
+
+    def display(self, *objs, **kwargs):
+        self.display_messages += len(objs)
+
+    def _on_widget(self, widget):
+        self.widgets_created += 1
+        if callable(self._previous_callback):
+            self._previous_callback(widget)
+
+    def __enter__(self):
+        self._previous_callback = self.widgets.Widget._widget_construction_callback
+        self.widgets.Widget.on_widget_constructed(self._on_widget)
+        return self
+
+    def __exit__(self, *exc):
+        self.widgets.Widget.on_widget_constructed(self._previous_callback)
+        return False
+
+
+def measure_render(render, widgets):
+    """Run render(display) once and return (seconds, display messages, widgets created)"""
+    with RenderCounter(widgets) as counter:
+        start = time.perf_counter()
+        render(counter.display)
+        elapsed = time.perf_counter() - start
+    return elapsed, counter.display_messages, counter.widgets_created
+
+
+def benchmark_dashboards(store, runs=5):
+    """Benchmark the login screen and every user's dashboard"""
+    import ipywidgets as widgets
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from IPython.display import HTML
+
+    from lms_system import AIAssistant, render_teacher_dashboard, render_student_dashboard, render_login_screen
+
+    users, courses, assignments, submissions, student_performance = store.as_tuple()
+    ai_assistant = AIAssistant()
+
+    def noop(*args):
+        pass
+
+    def renderer(user):
+        if user is None:
+            return lambda display: render_login_screen(users, widgets, HTML, display, noop)
+        if user.role == 'teacher':
+            return lambda display: render_teacher_dashboard(
+                user, users, courses, assignments, submissions, ai_assistant, student_performance,
+                widgets, HTML, plt, noop, display, noop, noop, store=store
+            )
+        return lambda display: render_student_dashboard(
+            user, users, courses, assignments, submissions, ai_assistant, student_performance,
+            widgets, HTML, plt, defaultdict, noop, display, noop, noop, datetime, store=store
+        )
+
+    targets = [('login', None)] + [(user_id, user) for user_id, user in users.items()]
+    results = []
+    for name, user in targets:
+        render = renderer(user)
+        timings = []
+        for _ in range(runs):
+            elapsed, messages, created = measure_render(render, widgets)
+            timings.append(elapsed)
+        results.append({
+            'view': name,
+            'median_ms': statistics.median(timings) * 1000,
+            'max_ms': max(timings) * 1000,
+            'display_messages': messages,
+            'widgets_created': created,
+        })
+    return results
+
+
+def print_report(results):
+    """Print benchmark results as a table"""
+    print(f"{'View':<12} {'Median ms':>10} {'Max ms':>10} {'Messages':>9} {'Widgets':>8}")
+    print("-" * 53)
+    for row in results:
+        print(f"{row['view']:<12} {row['median_ms']:>10.2f} {row['max_ms']:>10.2f} "
+              f"{row['display_messages']:>9} {row['widgets_created']:>8}")
+
+
+if __name__ == '__main__':
+    import lms_profiling
+    from lms_store import LMSStore
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    profile = '--profile' in sys.argv
+    runs = int(args[0]) if args else 5
+
+    if profile:
+        lms_profiling.enable()
+    print_report(benchmark_dashboards(LMSStore.from_sample_data(), runs=runs))
+    if profile:
+        print()
+        lms_profiling.print_latency_table()
+        print(f"\nChrome trace written to {lms_profiling.export_chrome_trace('lms_trace.json')}")
@@ -5,7 +5,6 @@ This module contains all the data models, AI features, and dashboard functions.
 
 import ipywidgets as widgets
 from IPython.display import display, clear_output, HTML
-import pandas as pd
 from datetime import datetime, timedelta
 import random
 import json
@@ -13,6 +12,8 @@ from collections import defaultdict
 import matplotlib.pyplot as plt
 import numpy as np
 
+from lms_rules import LEARNING_PATH_RULES
+
 
 # ============================================================================
 # DATA MODELS
@@ -100,57 +101,12 @@ class AIAssistant:
     @staticmethod
     def personalized_learning_path(student_id, student_performance):
         """Generate personalized learning recommendations"""
-        perf = student_performance.get(student_id, {})
-        strength = perf.get('strength', 'general')
-        weakness = perf.get('weakness', 'general')
-        
-        recommendations = []
-        
-        if weakness == 'math':
-            recommendations.append({
-                'type': 'Practice',
-                'title': 'Math Foundations Workshop',
-                'description': 'Extra practice on fractions and decimals',
-                'priority': 'High'
-            })
-            recommendations.append({
-                'type': 'Resource',
-                'title': 'Khan Academy Math Videos',
-                'description': 'Visual learning for mathematical concepts',
-                'priority': 'Medium'
-            })
-        elif weakness == 'writing':
-            recommendations.append({
-                'type': 'Practice',
-                'title': 'Writing Skills Lab',
-                'description': 'Improve essay structure and grammar',
-                'priority': 'High'
-            })
-        
-        if strength == 'math':
-            recommendations.append({
-                'type': 'Enrichment',
-                'title': 'Advanced Math Challenge',
-                'description': 'Algebra preview and problem-solving',
-                'priority': 'Medium'
-            })
-        elif strength == 'science':
-            recommendations.append({
-                'type': 'Enrichment',
-                'title': 'Science Fair Project',
-                'description': 'Apply scientific method to real research',
-                'priority': 'Medium'
-            })
-        
-        # General recommendation
-        recommendations.append({
-            'type': 'Social',
-            'title': 'Study Group',
-            'description': 'Collaborate with peers on challenging topics',
-            'priority': 'Low'
-        })
-        
-        return recommendations
+        return LEARNING_PATH_RULES.path_for(student_performance.get(student_id, {}))
+    
+    @staticmethod
+    def personalized_learning_paths(student_performance):
+        """Generate learning recommendations for every student in one pass"""
+        return LEARNING_PATH_RULES.paths_for_all(student_performance)
     
     @staticmethod
     def intelligent_content_recommendation(student_id, subject, student_performance):
@@ -0,0 +1,94 @@
+"""
+K-12 Learning Management System - Enrollment Index
+
+Enrollment kept as indexed sets: course -> students, student -> courses
+and teacher -> courses. Teachers are resolved from the course's display
+name to their user ID once, when the index is built, so dashboards look
+up "my courses" directly instead of scanning every course roster.
+Roster intersections and unions are plain set operations.
+"""
+
+import threading
+
+
+# ============================================================================
+# ENROLLMENT INDEX
+# ============================================================================
+
+class EnrollmentIndex:
+    """Set-based enrollment lookups in both directions"""
+
+    def __init__(self, users, courses):
+        self.lock = threading.RLock()
+        self._order = {}  # course_id -> position, for stable display order
+        self._students = {}  # course_id -> set of student_ids
+        self._student_courses = {}  # student_id -> set of course_ids
+        self._teacher_courses = {}  # teacher user_id -> set of course_ids
+        self._course_teachers = {}  # course_id -> set of teacher user_ids
+        self._teachers_by_name = {}
+        for user_id, user in users.items():
+            if user.role == 'teacher':
+                self._teachers_by_name.setdefault(user.name, set()).add(user_id)
+        for course in courses.values():
+            self.add_course(course)
+
+    def add_course(self, course):
+        """Index a course, its teacher and its roster"""
+        with self.lock:
+            self._order.setdefault(course.course_id, len(self._order))
+            self._students.setdefault(course.course_id, set())
+            teachers = self._teachers_by_name.get(course.teacher, set())
+            self._course_teachers[course.course_id] = set(teachers)
+            for teacher_id in teachers:
+                self._teacher_courses.setdefault(teacher_id, set()).add(course.course_id)
+            for student_id in course.students:
+                self.enroll(student_id, course.course_id)
+
+    def enroll(self, student_id, course_id):
+        with self.lock:
+            self._students.setdefault(course_id, set()).add(student_id)
+            self._student_courses.setdefault(student_id, set()).add(course_id)
+
+    def drop(self, student_id, course_id):
+        with self.lock:
+            self._students.get(course_id, set()).discard(student_id)
+            self._student_courses.get(student_id, set()).discard(course_id)
+
+    def _ordered(self, course_ids):
+        return sorted(course_ids, key=self._order.__getitem__)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def roster(self, course_id):
+        """Students enrolled in a course"""
+        return frozenset(self._students.get(course_id, ()))
+
+    def is_enrolled(self, student_id, course_id):
+        return student_id in self._students.get(course_id, ())
+
+    def student_courses(self, student_id):
+        """Course IDs a student is enrolled in, in course order"""
+        return self._ordered(self._student_courses.get(student_id, ()))
+
+    def teacher_courses(self, teacher_id):
+        """Course IDs taught by a teacher (user ID), in course order"""
+        return self._ordered(self._teacher_courses.get(teacher_id, ()))
+
+    def teachers_of(self, course_id):
+        """Teacher user IDs for a course"""
+        return frozenset(self._course_teachers.get(course_id, ()))
+
+    def students_in_all(self, *course_ids):
+        """Students enrolled in every one of the courses"""
+        rosters = [self._students.get(course_id, set()) for course_id in course_ids]
+        return frozenset(set.intersection(*rosters)) if rosters else frozenset()
+
+    def students_in_any(self, *course_ids):
+        """Students enrolled in at least one of the courses"""
+        return frozenset().union(*(self._students.get(course_id, ()) for course_id in course_ids))
+
+    def students_of_teacher(self, teacher_id):
+        """Every student in any of a teacher's courses"""
+        return self.students_in_any(*self._teacher_courses.get(teacher_id, ()))
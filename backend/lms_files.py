@@ -0,0 +1,70 @@
+"""
+K-12 Learning Management System - Atomic File Writes
+
+Metrics dumps, the grading cache and static dashboard pages are read by
+other processes while they are rewritten. atomic_write() writes into a
+temporary file in the target's directory, flushes it to disk and then
+renames it over the target, so a reader sees the old file or the new
+one and a crash never leaves a truncated file behind. atomic_directory()
+does the same for a directory of files, such as a term archive.
+
+Usage:
+    with atomic_write('lms_metrics.prom') as f:
+        f.write(text)
+    with atomic_directory('archive/2025-fall') as tmp:
+        np.save(os.path.join(tmp, 'grades.npy'), grades)
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8'):
+    """Open a temporary file that replaces path when the with-block succeeds"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+@contextmanager
+def atomic_directory(path):
+    """Yield a temporary directory that replaces the directory at path when the with-block succeeds
+
+    Readers see the complete old or new directory, never a partly written
+    one, and files they already opened stay valid. Replacing an existing
+    directory takes two renames; a crash between them leaves the old copy
+    in a '.old' sibling.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix='.tmp')
+    try:
+        yield tmp_path
+        for name in os.listdir(tmp_path):
+            with open(os.path.join(tmp_path, name), 'rb') as f:
+                os.fsync(f.fileno())
+        old_path = None
+        if os.path.exists(path):
+            old_path = tempfile.mkdtemp(dir=parent, prefix='.old')
+            os.rmdir(old_path)
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
@@ -0,0 +1,125 @@
+"""
+K-12 Learning Management System - DataFrame Views
+
+pandas views over the gradebook's column arrays for notebook analysis.
+Nothing here loops over Submission objects: the wide grade matrix is the
+gradebook's NumPy matrix wrapped without copying, and the long frames
+are assembled from its sparse submission columns with vectorized NumPy
+indexing. ID columns are Categoricals built from the gradebook's
+interned integer IDs, so a district-sized frame stores one small integer
+per row per ID column.
+
+Usage:
+    import lms_frames
+    lms_frames.grade_matrix(store.gradebook)          # students x assignments
+    lms_frames.submissions_frame(store.gradebook)     # one row per submission
+    lms_frames.performance_frame(store.student_performance)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _categorical(codes, interner):
+    """Categorical column from interned integer IDs without touching each value"""
+    return pd.Categorical.from_codes(codes, categories=pd.Index(interner.keys(), dtype=object))
+
+
+# ============================================================================
+# GRADEBOOK FRAMES
+# ============================================================================
+
+def grade_matrix(gradebook):
+    """Students x assignments DataFrame of grades (NaN = no grade) sharing the gradebook's memory
+
+    Grade writes to existing cells show through until the gradebook grows:
+    adding a student or assignment beyond its capacity moves the matrix
+    to a new buffer, and the frame keeps the old one. Call again after
+    roster or assignment changes, or .copy() the frame to keep it.
+    """
+    with gradebook.lock:
+        grades = gradebook.grades
+        index = pd.CategoricalIndex(gradebook.students.keys(), name='student_id')
+        columns = pd.Index(gradebook.assignments.keys(), name='assignment_id')
+    # A read-only view of the current buffer; edits to the frame raise
+    return pd.DataFrame(grades, index=index, columns=columns, copy=False)
+
+
+def _submission_arrays(gradebook, graded_only):
+    # Caller holds the gradebook lock
+    rows, columns, times = gradebook.submission_cells()
+    grades = gradebook.grades[rows, columns]
+    keep = gradebook.assignment_courses[columns] >= 0
+    if graded_only:
+        keep &= ~np.isnan(grades)
+    return rows[keep], columns[keep], times[keep], grades[keep]
+
+
+def submissions_frame(gradebook, graded_only=False):
+    """One row per submission: student_id, assignment_id, course_id, submitted_date, grade (NaN = ungraded)"""
+    with gradebook.lock:
+        rows, columns, times, grades = _submission_arrays(gradebook, graded_only)
+        return pd.DataFrame({
+            'student_id': _categorical(rows, gradebook.students),
+            'assignment_id': _categorical(columns, gradebook.assignments),
+            'course_id': _categorical(gradebook.assignment_courses[columns], gradebook.courses),
+            'submitted_date': times,
+            'grade': grades,
+        })
+
+
+def grades_frame(gradebook):
+    """submissions_frame() restricted to graded submissions"""
+    return submissions_frame(gradebook, graded_only=True)
+
+
+def course_summary(gradebook):
+    """Per-course count, mean, min and max grade over graded submissions"""
+    with gradebook.lock:
+        _, columns, _, grades = _submission_arrays(gradebook, graded_only=True)
+        course_of = gradebook.assignment_courses[columns]
+        course_count = len(gradebook.courses)
+        index = pd.CategoricalIndex(gradebook.courses.keys(), name='course_id')
+    counts = np.bincount(course_of, minlength=course_count)
+    sums = np.bincount(course_of, weights=grades, minlength=course_count)
+    lows = np.full(course_count, np.inf)
+    highs = np.full(course_count, -np.inf)
+    np.minimum.at(lows, course_of, grades)
+    np.maximum.at(highs, course_of, grades)
+    graded = counts > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frame = pd.DataFrame({'count': counts, 'mean': sums / counts, 'min': lows, 'max': highs}, index=index)
+    return frame[graded]
+
+
+# ============================================================================
+# PERFORMANCE HISTORY
+# ============================================================================
+
+def performance_frame(histories):
+    """One row per recorded score: student_id, subject, seq (0 = oldest in window), score"""
+    students, subjects, lengths, arrays = [], [], [], []
+    for student_id, history in histories.items():
+        for subject, scores in history.subjects.items():
+            if len(scores):
+                students.append(student_id)
+                subjects.append(subject)
+                lengths.append(len(scores))
+                arrays.append(scores.as_numpy())
+
+    lengths = np.asarray(lengths, dtype=np.int64)
+    student_categories = pd.Index(list(dict.fromkeys(students)), dtype=object)
+    subject_categories = pd.Index(sorted(set(subjects)), dtype=object)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return pd.DataFrame({
+        'student_id': pd.Categorical.from_codes(
+            np.repeat(student_categories.get_indexer(students), lengths), categories=student_categories),
+        'subject': pd.Categorical.from_codes(
+            np.repeat(subject_categories.get_indexer(subjects), lengths), categories=subject_categories),
+        'seq': np.arange(lengths.sum()) - starts,
+        'score': np.concatenate(arrays) if arrays else np.empty(0),
+    })
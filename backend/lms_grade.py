@@ -0,0 +1,218 @@
+"""
+K-12 Learning Management System - Batch Grading
+
+Headless counterpart of the "🤖 AI Grade" button: grades every pending
+submission for a course, a teacher or the whole store in a process pool
+and writes the grades back through the store in batches, so each batch
+is one store transaction. With a GradingCache, cached results are
+applied directly and only misses go to the pool. With a grading backend
+(see lms_grader_backend), misses go to the model server instead of the
+pool; grades the client had to fall back to the local heuristic for are
+recorded but not cached. Prints throughput and per-submission latency
+percentiles at the end.
+
+The store has no on-disk form yet, so the command line grades a freshly
+built sample (or --district) store and is a throughput benchmark: its
+grades are discarded when it exits, and only --cache persists anything.
+Code holding a live LMSStore calls grade_pending() to grade for real.
+
+Usage:
+    python -m lms_grade [--course ID ...] [--teacher ID] [--workers N]
+                        [--batch-size N] [--cache PATH] [--backend URL [--model-version V]]
+                        [--district]
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lms_grading_cache import GradingCache
+from lms_profiling import percentile
+from lms_system import AIAssistant, GRADER_VERSION
+
+
+# ============================================================================
+# JOBS
+# ============================================================================
+
+def pending_jobs(store, course_ids=None, teacher_id=None):
+    """(student_id, assignment_id, content, difficulty, performance) for ungraded submissions"""
+    with store.lock:
+        if teacher_id is not None:
+            course_ids = set(store.enrollment.teacher_courses(teacher_id)) | set(course_ids or ())
+        elif course_ids is not None:
+            course_ids = set(course_ids)
+        jobs = []
+        for (student_id, assignment_id), sub in store.submissions.items():
+            if sub.grade is not None:
+                continue
+            assignment = store.assignments.get(assignment_id)
+            if assignment is None or (course_ids is not None and assignment.course_id not in course_ids):
+                continue
+            jobs.append((student_id, assignment_id, sub.content, assignment.difficulty,
+                         store.student_performance.get(student_id)))
+    return jobs
+
+
+def _grade(job):
+    """Grade one submission (runs in a worker); returns (student, assignment, score, feedback, seconds, raw result, outcome)"""
+    student_id, assignment_id, content, difficulty, perf = job
+    start = time.perf_counter()
+    result = AIAssistant.auto_grade_assignment(content, difficulty, perf)
+    score, feedback, suggestions = result
+    full_feedback = feedback + " Suggestions: " + "; ".join(suggestions)
+    return student_id, assignment_id, round(score), full_feedback, time.perf_counter() - start, result, 'local'
+
+
+def _grade_remote(jobs, backend):
+    """Grade jobs through a GraderBackend; yields the same tuples as _grade, outcome 'remote' or 'fallback'"""
+    from lms_grader_backend import grade_all
+
+    graded = grade_all(backend, [(content, difficulty, perf) for _, _, content, difficulty, perf in jobs])
+    for (student_id, assignment_id, _, _, _), (result, seconds, outcome) in zip(jobs, graded):
+        score, feedback, suggestions = result
+        full_feedback = feedback + " Suggestions: " + "; ".join(suggestions)
+        yield student_id, assignment_id, round(score), full_feedback, seconds, result, outcome
+
+
+# ============================================================================
+# BATCH GRADING
+# ============================================================================
+
+def grade_pending(store, course_ids=None, teacher_id=None, workers=None, batch_size=100, chunksize=32, cache=None,
+                  backend=None):
+    """AI-grade pending submissions and record the grades; returns a report dict"""
+    start = time.perf_counter()
+    jobs = pending_jobs(store, course_ids, teacher_id)
+
+    latencies = []
+    graded = 0
+    batch = []
+    cached = []
+    keys = {}
+    misses = jobs
+    if cache is not None:
+        misses = []
+        for job in jobs:
+            lookup = time.perf_counter()
+            key = cache.key(job[2], job[3], job[4])
+            result = cache.get(key)
+            if result is None:
+                keys[job[:2]] = key
+                misses.append(job)
+            else:
+                score, feedback, suggestions = result
+                latencies.append(time.perf_counter() - lookup)
+                cached.append((job[0], job[1], round(score), feedback + " Suggestions: " + "; ".join(suggestions)))
+
+    if backend is not None:
+        results = _grade_remote(misses, backend)
+        executor = None
+    elif workers == 1 or len(misses) < 2:
+        results = map(_grade, misses)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_grade, misses, chunksize=chunksize)
+
+    def flush():
+        # Skip submissions graded or withdrawn while the pool was running
+        with store.lock:
+            writes = []
+            for student_id, assignment_id, score, feedback in batch:
+                sub = store.submissions.get((student_id, assignment_id))
+                if sub is not None and sub.grade is None:
+                    writes.append((sub, score, feedback, score))
+            store.record_grades(writes)
+        batch.clear()
+        return len(writes)
+
+    try:
+        for item in cached:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                graded += flush()
+        for student_id, assignment_id, score, feedback, seconds, result, outcome in results:
+            latencies.append(seconds)
+            # A fallback grade is not what the cache's grader would return
+            if cache is not None and outcome != 'fallback':
+                cache.put(keys[(student_id, assignment_id)], result)
+            batch.append((student_id, assignment_id, score, feedback))
+            if len(batch) >= batch_size:
+                graded += flush()
+        if batch:
+            graded += flush()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'pending': len(jobs),
+        'graded': graded,
+        'cache_hits': len(cached),
+        'seconds': elapsed,
+        'per_second': graded / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def print_report(report):
+    print(f"Graded {report['graded']} of {report['pending']} pending submissions "
+          f"in {report['seconds']:.2f}s ({report['per_second']:.0f}/s, {report['cache_hits']} from cache)")
+    print(f"Latency ms: p50 {report['p50_ms']:.3f}  p95 {report['p95_ms']:.3f}  "
+          f"p99 {report['p99_ms']:.3f}  max {report['max_ms']:.3f}")
+
+
+def main(argv=None):
+    import argparse
+
+    from lms_store import LMSStore
+
+    parser = argparse.ArgumentParser(prog='python -m lms_grade',
+                                     description='Benchmark AI grading of pending submissions on a built-in data set')
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument('--course', action='append', dest='courses', help='course ID (repeatable)')
+    scope.add_argument('--teacher', help='teacher user ID')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=100, help='grades written per store transaction')
+    parser.add_argument('--cache', metavar='PATH', help='grading cache file, loaded before and saved after')
+    parser.add_argument('--backend', metavar='URL', help='grading backend, e.g. http://127.0.0.1:8770/grade')
+    parser.add_argument('--model-version', help='model the backend must report (part of the cache key)')
+    parser.add_argument('--district', action='store_true', help='use a synthetic district-sized data set')
+    args = parser.parse_args(argv)
+
+    if args.district:
+        from lms_bench import build_district_store
+        store = build_district_store()
+    else:
+        store = LMSStore.from_sample_data()
+    if args.teacher is not None and args.teacher not in store.users:
+        parser.error(f"unknown teacher {args.teacher!r}")
+    unknown = [course_id for course_id in args.courses or () if course_id not in store.courses]
+    if unknown:
+        parser.error(f"unknown course {unknown[0]!r}")
+
+    if args.model_version and not args.backend:
+        parser.error("--model-version needs --backend")
+    backend = None
+    grader_version = GRADER_VERSION
+    if args.backend:
+        from lms_grader_backend import HTTPGraderBackend
+        backend = HTTPGraderBackend(args.backend, model_version=args.model_version)
+        # Backend grades are cached apart from local ones, per backend and model
+        grader_version = f'{GRADER_VERSION}/{backend.version}'
+    cache = GradingCache(AIAssistant.auto_grade_assignment, grader_version, path=args.cache) if args.cache else None
+    print_report(grade_pending(store, args.courses, args.teacher, workers=args.workers,
+                               batch_size=args.batch_size, cache=cache, backend=backend))
+    if cache is not None:
+        cache.save()
+        stats = cache.stats()
+        print(f"Grading cache: {stats['entries']} entries, hit rate {stats['hit_rate']:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+K-12 Learning Management System - Gradebook Matrix
+
+String user, course and assignment IDs are interned into dense integer
+IDs and every grade is kept in a student x assignment NumPy matrix (NaN
+where there is no grade). The matrix is updated on each grade write, so
+course averages, per-assignment statistics, z-scores and percentile ranks
+are vectorized operations instead of walks over Submission objects.
+Submissions themselves are kept as sparse (row, column, submitted time)
+column arrays, so lms_frames can expose them as DataFrames without
+per-row conversion.
+"""
+
+import threading
+
+import numpy as np
+
+
+# ============================================================================
+# ID INTERNING
+# ============================================================================
+
+class IdInterner:
+    """Maps string IDs to dense integers 0..n-1 and back"""
+
+    def __init__(self, keys=()):
+        self._ids = {}
+        self._keys = []
+        for key in keys:
+            self.intern(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def intern(self, key):
+        """Integer ID for key, assigning the next one if it is new"""
+        index = self._ids.get(key)
+        if index is None:
+            index = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return index
+
+    def id_of(self, key, default=None):
+        """Integer ID for key without assigning one"""
+        return self._ids.get(key, default)
+
+    def key_of(self, index):
+        """String ID for an integer ID"""
+        return self._keys[index]
+
+    def keys(self):
+        return list(self._keys)
+
+
+# ============================================================================
+# GRADEBOOK
+# ============================================================================
+
+class Gradebook:
+    """Dense student x assignment grade matrix with vectorized statistics"""
+
+    def __init__(self, capacity=(64, 64)):
+        self.students = IdInterner()
+        self.assignments = IdInterner()
+        self.courses = IdInterner()
+        self.lock = threading.RLock()
+        self._grades = np.full(capacity, np.nan)
+        self._assignment_course = np.full(capacity[1], -1, dtype=np.int32)
+        # Sparse submission columns; _cells maps (row, column) -> position
+        self._cells = {}
+        self._cell_rows = np.empty(64, dtype=np.int32)
+        self._cell_columns = np.empty(64, dtype=np.int32)
+        self._cell_times = np.empty(64, dtype='datetime64[us]')
+
+    @classmethod
+    def from_data(cls, users, courses, assignments, submissions):
+        """Build a gradebook from the initialize_sample_data() dicts"""
+        students = [uid for uid, user in users.items() if user.role == 'student']
+        book = cls(capacity=(max(len(students), 1), max(len(assignments), 1)))
+        for student_id in students:
+            book.students.intern(student_id)
+        for course_id in courses:
+            book.courses.intern(course_id)
+        for assignment in assignments.values():
+            book.add_assignment(assignment.assignment_id, assignment.course_id)
+        for (student_id, assignment_id), sub in submissions.items():
+            book.set_submitted(student_id, assignment_id, sub.submitted_date)
+            if sub.grade is not None:
+                book.set_grade(student_id, assignment_id, sub.grade)
+        return book
+
+    @property
+    def shape(self):
+        return len(self.students), len(self.assignments)
+
+    @property
+    def grades(self):
+        """Read-only view of the (students x assignments) grade matrix"""
+        view = self._grades[:len(self.students), :len(self.assignments)]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def assignment_courses(self):
+        """Read-only view of each assignment column's course ID (-1 once retired)"""
+        view = self._assignment_course[:len(self.assignments)]
+        view.flags.writeable = False
+        return view
+
+    def submission_cells(self):
+        """Read-only (rows, columns, submitted times) arrays, one entry per submission"""
+        count = len(self._cells)
+        views = self._cell_rows[:count], self._cell_columns[:count], self._cell_times[:count]
+        for view in views:
+            view.flags.writeable = False
+        return views
+
+    def _ensure_capacity(self, rows, cols):
+        capacity_rows, capacity_cols = self._grades.shape
+        if rows <= capacity_rows and cols <= capacity_cols:
+            return
+        # Grow geometrically so appends stay amortized O(1)
+        new_rows = max(rows, capacity_rows * 2) if rows > capacity_rows else capacity_rows
+        new_cols = max(cols, capacity_cols * 2) if cols > capacity_cols else capacity_cols
+        grown = np.full((new_rows, new_cols), np.nan)
+        grown[:capacity_rows, :capacity_cols] = self._grades
+        self._grades = grown
+        if new_cols > capacity_cols:
+            course_of = np.full(new_cols, -1, dtype=np.int32)
+            course_of[:capacity_cols] = self._assignment_course
+            self._assignment_course = course_of
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add_assignment(self, assignment_id, course_id):
+        """Register an assignment column under its course"""
+        with self.lock:
+            column = self.assignments.intern(assignment_id)
+            self._ensure_capacity(len(self.students), len(self.assignments))
+            self._assignment_course[column] = self.courses.intern(course_id)
+            return column
+
+    def add_assignments(self, pairs):
+        """Register many (assignment_id, course_id) columns with a single resize"""
+        with self.lock:
+            columns = [(self.assignments.intern(aid), self.courses.intern(cid)) for aid, cid in pairs]
+            self._ensure_capacity(len(self.students), len(self.assignments))
+            for column, course in columns:
+                self._assignment_course[column] = course
+            return [column for column, _ in columns]
+
+    def remove_assignment(self, assignment_id):
+        """Retire an assignment column (its ID is never reused)"""
+        with self.lock:
+            column = self.assignments.id_of(assignment_id)
+            if column is not None:
+                self._grades[:, column] = np.nan
+                self._assignment_course[column] = -1
+                positions = np.flatnonzero(self._cell_columns[:len(self._cells)] == column)
+                for position in positions[::-1]:
+                    self._remove_cell(int(position))
+
+    def set_grade(self, student_id, assignment_id, grade):
+        """Write (or clear, with grade=None) one cell"""
+        with self.lock:
+            row = self.students.intern(student_id)
+            column = self.assignments.intern(assignment_id)
+            self._ensure_capacity(len(self.students), len(self.assignments))
+            self._grades[row, column] = np.nan if grade is None else grade
+
+    def set_submitted(self, student_id, assignment_id, submitted_date):
+        """Record (or clear, with None) when a submission was made"""
+        with self.lock:
+            row = self.students.intern(student_id)
+            column = self.assignments.intern(assignment_id)
+            self._ensure_capacity(len(self.students), len(self.assignments))
+            position = self._cells.get((row, column))
+            if submitted_date is None:
+                if position is not None:
+                    self._remove_cell(position)
+                return
+            if position is None:
+                position = self._cells[(row, column)] = len(self._cells)
+                if position >= len(self._cell_rows):
+                    size = len(self._cell_rows) * 2
+                    self._cell_rows = np.resize(self._cell_rows, size)
+                    self._cell_columns = np.resize(self._cell_columns, size)
+                    self._cell_times = np.resize(self._cell_times, size)
+                self._cell_rows[position] = row
+                self._cell_columns[position] = column
+            self._cell_times[position] = np.datetime64(submitted_date, 'us')
+
+    def _remove_cell(self, position):
+        # Move the last entry into the hole so the columns stay dense
+        last = len(self._cells) - 1
+        del self._cells[(int(self._cell_rows[position]), int(self._cell_columns[position]))]
+        if position != last:
+            self._cell_rows[position] = self._cell_rows[last]
+            self._cell_columns[position] = self._cell_columns[last]
+            self._cell_times[position] = self._cell_times[last]
+            self._cells[(int(self._cell_rows[position]), int(self._cell_columns[position]))] = position
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def course_columns(self, course_ids):
+        """Boolean mask over assignment columns belonging to any of the courses"""
+        wanted = [self.courses.id_of(c) for c in course_ids if c in self.courses]
+        return np.isin(self._assignment_course[:len(self.assignments)], wanted)
+
+    def course_grades(self, course_ids):
+        """Flat array of all grades in the given courses"""
+        with self.lock:
+            block = self.grades[:, self.course_columns(course_ids)]
+            return block[~np.isnan(block)]
+
+    def student_grades(self, student_id):
+        """{assignment_id: grade} for one student"""
+        row = self.students.id_of(student_id)
+        if row is None:
+            return {}
+        with self.lock:
+            values = self.grades[row]
+            columns = np.flatnonzero(~np.isnan(values))
+            return {self.assignments.key_of(c): float(values[c]) for c in columns}
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def assignment_stats(self):
+        """{assignment_id: {'count','mean','std','min','max'}} for graded assignments"""
+        with self.lock:
+            grades = self.grades
+            counts = np.count_nonzero(~np.isnan(grades), axis=0)
+            graded = np.flatnonzero(counts)
+            if not len(graded):
+                return {}
+            block = grades[:, graded]
+            means = np.nanmean(block, axis=0)
+            stds = np.nanstd(block, axis=0)
+            lows = np.nanmin(block, axis=0)
+            highs = np.nanmax(block, axis=0)
+        return {
+            self.assignments.key_of(c): {
+                'count': int(counts[c]), 'mean': float(means[i]), 'std': float(stds[i]),
+                'min': float(lows[i]), 'max': float(highs[i]),
+            }
+            for i, c in enumerate(graded)
+        }
+
+    def course_averages(self):
+        """{course_id: mean grade} for courses with at least one grade"""
+        with self.lock:
+            grades = self.grades
+            course_of = self._assignment_course[:len(self.assignments)]
+            known = course_of >= 0
+            present = ~np.isnan(grades[:, known])
+            column_sums = np.where(present, grades[:, known], 0).sum(axis=0)
+            sums = np.bincount(course_of[known], weights=column_sums, minlength=len(self.courses))
+            counts = np.bincount(course_of[known], weights=present.sum(axis=0), minlength=len(self.courses))
+        return {
+            self.courses.key_of(c): float(sums[c] / counts[c])
+            for c in np.flatnonzero(counts)
+        }
+
+    def student_averages(self, course_ids=None):
+        """{student_id: mean grade}, optionally restricted to some courses"""
+        with self.lock:
+            grades = self.grades
+            if course_ids is not None:
+                grades = grades[:, self.course_columns(course_ids)]
+            present = ~np.isnan(grades)
+            counts = present.sum(axis=1)
+            sums = np.where(present, grades, 0).sum(axis=1)
+        return {
+            self.students.key_of(r): float(sums[r] / counts[r])
+            for r in np.flatnonzero(counts)
+        }
+
+    def z_scores(self):
+        """Matrix of per-assignment z-scores (NaN where ungraded or no spread)"""
+        with self.lock:
+            grades = self.grades.copy()
+        present = ~np.isnan(grades)
+        counts = present.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(present, grades, 0).sum(axis=0) / counts
+            deviations = np.where(present, grades - means, 0)
+            stds = np.sqrt((deviations ** 2).sum(axis=0) / counts)
+            stds[stds == 0] = np.nan
+            return (grades - means) / stds
+
+    def percentile_ranks(self, assignment_id):
+        """{student_id: percent of graded students scoring at or below them}"""
+        column = self.assignments.id_of(assignment_id)
+        if column is None:
+            return {}
+        with self.lock:
+            values = self.grades[:, column].copy()
+        rows = np.flatnonzero(~np.isnan(values))
+        if not len(rows):
+            return {}
+        ordered = np.sort(values[rows])
+        ranks = np.searchsorted(ordered, values[rows], side='right') / len(rows) * 100
+        return {self.students.key_of(r): float(rank) for r, rank in zip(rows, ranks)}
+
+
+def grade_bands(scores, edges=(0, 60, 70, 80, 90)):
+    """Counts of scores in [edge_i, edge_i+1) bands, the last band open-ended"""
+    bins = np.append(np.asarray(edges, dtype=float), np.inf)
+    counts, _ = np.histogram(scores, bins=bins)
+    return counts.tolist()
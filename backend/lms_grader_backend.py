@@ -0,0 +1,437 @@
+"""
+K-12 Learning Management System - External Grading Backend
+
+Sends AI grading to a model server instead of the local heuristic in
+AIAssistant.auto_grade_assignment. GradingClient is an asyncio client
+that collects concurrent grade() calls into batches (one request grades
+many submissions), keeps a bounded number of batches in flight over a
+bounded pool of keep-alive connections, and applies a timeout and
+retries with backoff to each batch. When the queue of waiting
+submissions is full, grade() waits (backpressure) instead of growing the
+queue without limit. A batch the backend cannot grade in time is graded
+by the local heuristic instead, and after such a failure the backend is
+skipped for a cooldown period, so a slow model server lowers grading
+quality rather than grading throughput.
+
+Backends implement GraderBackend. HTTPGraderBackend speaks JSON over
+HTTP/1.1; LocalGraderBackend and serve() are in-process and local
+stand-ins for tests, with configurable latency and failure rate. Each
+backend has a version string for cache keys, and grade_outcome() tells
+backend results ('remote') from local fallbacks ('fallback'), so callers
+can avoid caching degraded grades as if the model had produced them.
+
+Wire format:
+    POST /grade {"grader_version": 1, "items": [{"content", "difficulty", "average"}, ...]}
+    200 {"model_version": "...", "results": [{"score", "feedback", "suggestions"}, ...]}   # same order as items
+
+Usage:
+    async with GradingClient(HTTPGraderBackend('http://127.0.0.1:8770/grade')) as client:
+        score, feedback, suggestions = await client.grade(content, 'medium', perf)
+    grade_all(backend, [(content, difficulty, perf), ...])    # from synchronous code
+
+    python lms_grader_backend.py serve [port] [latency]    # local stand-in server
+    python lms_grader_backend.py [submissions] [latency]   # client benchmark
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from lms_metrics import REMOTE_GRADING
+from lms_performance import as_history
+from lms_system import AIAssistant, GRADER_VERSION
+
+
+class GraderBackendError(Exception):
+    """The grading backend rejected a request or returned a malformed response"""
+
+
+def request_item(content, difficulty, perf=None):
+    """Wire form of one submission; the heuristic only needs the history's mean"""
+    return {'content': content, 'difficulty': difficulty, 'average': as_history(perf).mean()}
+
+
+def grade_item(item):
+    """Grade one wire item with the local heuristic"""
+    perf = {'average': [item['average']]} if item.get('average') is not None else None
+    return AIAssistant.auto_grade_assignment(item['content'], item['difficulty'], perf)
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class GraderBackend:
+    """Grades batches of request_item() dicts; returns [(score, feedback, suggestions)] in order"""
+
+    version = 'unversioned'  # identifies the grading model in cache keys
+
+    async def grade_batch(self, items):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class LocalGraderBackend(GraderBackend):
+    """In-process stand-in with simulated latency and failures"""
+
+    version = f'heuristic-{GRADER_VERSION}'
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    async def grade_batch(self, items):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            raise GraderBackendError('simulated backend failure')
+        return [grade_item(item) for item in items]
+
+
+class HTTPGraderBackend(GraderBackend):
+    """JSON over HTTP/1.1 with a bounded pool of keep-alive connections
+
+    With a model_version, responses reporting another model are rejected
+    (and so fall back), so cached results always match version.
+    """
+
+    def __init__(self, url, model_version=None, pool_size=4, connect_timeout=2.0):
+        self.model_version = model_version
+        self.version = f'{url}@{model_version}' if model_version else url
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 80
+        self.path = parts.path or '/grade'
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self._idle = []  # open (reader, writer) pairs not in use
+        self._slots = None  # created on first use, inside the event loop
+
+    async def _acquire(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        await self._slots.acquire()
+        if self._idle:
+            return self._idle.pop(), True
+        try:
+            connection = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.connect_timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+        return connection, False
+
+    def _release(self, connection, reusable):
+        if reusable:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+        self._slots.release()
+
+    async def _exchange(self, connection, body):
+        reader, writer = connection
+        writer.write(
+            f'POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+            f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'.encode('ascii') + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('grading backend closed the connection')
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        payload = await reader.readexactly(int(headers.get('content-length', 0)))
+        parts = status_line.split()
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise GraderBackendError(f'grading backend sent a malformed status line {status_line!r}')
+        return int(parts[1]), payload, headers.get('connection', '').lower() != 'close'
+
+    async def grade_batch(self, items):
+        body = json.dumps({'grader_version': GRADER_VERSION, 'items': items}).encode('utf-8')
+        while True:
+            connection, reused = await self._acquire()
+            try:
+                status, payload, keep_alive = await self._exchange(connection, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self._release(connection, False)
+                if reused:
+                    continue  # the server closed an idle connection; retry on a fresh one
+                raise
+            except BaseException:
+                # Timed out or cancelled mid-response: the connection's state is unknown
+                self._release(connection, False)
+                raise
+            self._release(connection, keep_alive)
+            break
+
+        if status != 200:
+            raise GraderBackendError(f'grading backend returned HTTP {status}')
+        response = json.loads(payload)
+        if not isinstance(response, dict):
+            raise GraderBackendError('grading backend returned a non-object response')
+        if self.model_version is not None and response.get('model_version') != self.model_version:
+            raise GraderBackendError(f"grading backend runs model {response.get('model_version')!r}, "
+                                     f"expected {self.model_version!r}")
+        results = response.get('results')
+        if not isinstance(results, list) or len(results) != len(items):
+            raise GraderBackendError('grading backend returned the wrong number of results')
+        try:
+            return [(r['score'], r['feedback'], list(r['suggestions'])) for r in results]
+        except (TypeError, KeyError) as exc:
+            raise GraderBackendError(f'grading backend returned a malformed result: {exc!r}') from None
+
+    async def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class GradingClient:
+    """Batching, concurrency-limited grading client with local fallback"""
+
+    def __init__(self, backend, batch_size=32, max_wait=0.01, max_in_flight=4, max_pending=1024,
+                 timeout=2.0, retries=2, backoff=0.05, cooldown=5.0, fallback=None):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_wait = max_wait  # seconds a partial batch waits for more submissions
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+        self.timeout = timeout  # per request attempt
+        self.retries = retries
+        self.backoff = backoff
+        self.cooldown = cooldown  # seconds to skip the backend after a batch falls back
+        self.fallback = fallback or AIAssistant.auto_grade_assignment
+        self.stats = {'batches': 0, 'remote': 0, 'fallback': 0, 'timeouts': 0, 'errors': 0, 'retries': 0}
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._sending = set()
+        self._skip_until = 0.0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+    def _start(self):
+        self._queue = asyncio.Queue(self.max_pending)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._batcher = asyncio.get_running_loop().create_task(self._run())
+
+    async def grade(self, content, difficulty, perf=None):
+        """(score, feedback, suggestions) for one submission; waits while the queue is full"""
+        result, _ = await self.grade_outcome(content, difficulty, perf)
+        return result
+
+    async def grade_outcome(self, content, difficulty, perf=None):
+        """(result, outcome) where outcome is 'remote' or 'fallback'"""
+        if self._batcher is None:
+            self._start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request_item(content, difficulty, perf), (content, difficulty, perf), future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = loop.time() + self.max_wait
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                try:
+                    entry = self._queue.get_nowait() if remaining <= 0 else \
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            # Holding the batch here until a slot frees lets the queue fill, which blocks grade()
+            await self._slots.acquire()
+            task = loop.create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+            if stop:
+                return
+
+    async def _send(self, batch):
+        try:
+            self.stats['batches'] += 1
+            if time.monotonic() >= self._skip_until:
+                items = [item for item, _, _ in batch]
+                for attempt in range(self.retries + 1):
+                    try:
+                        results = await asyncio.wait_for(self.backend.grade_batch(items), self.timeout)
+                        if len(results) != len(batch):
+                            raise GraderBackendError('grading backend returned the wrong number of results')
+                    except asyncio.TimeoutError:
+                        self.stats['timeouts'] += 1
+                    except Exception:
+                        # Whatever a backend raises, the batch is still graded by the fallback
+                        self.stats['errors'] += 1
+                    else:
+                        self._resolve(batch, results, 'remote')
+                        return
+                    if attempt < self.retries:
+                        self.stats['retries'] += 1
+                        await asyncio.sleep(self.backoff * 2 ** attempt)
+                self._skip_until = time.monotonic() + self.cooldown
+            self._resolve(batch, [self.fallback(*args) for _, args, _ in batch], 'fallback')
+        except Exception as exc:
+            # The fallback itself failed: the waiting grade() calls raise instead of hanging
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        except BaseException:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        finally:
+            self._slots.release()
+
+    def _resolve(self, batch, results, outcome):
+        self.stats[outcome] += len(batch)
+        REMOTE_GRADING.labels(outcome=outcome).inc(len(batch))
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result((result, outcome))
+
+    async def close(self):
+        """Grade everything already queued, then close the backend"""
+        if self._batcher is not None:
+            await self._queue.put(None)
+            await self._batcher
+            if self._sending:
+                await asyncio.gather(*self._sending)
+            self._batcher = None
+        await self.backend.close()
+
+
+def grade_all(backend, requests, **options):
+    """Grade (content, difficulty, perf) requests from synchronous code
+
+    Returns [(result, seconds, outcome)] in request order; outcome is
+    'remote' or 'fallback' (see GradingClient.grade_outcome).
+    """
+
+    async def run():
+        async with GradingClient(backend, **options) as client:
+            async def timed(request):
+                start = time.perf_counter()
+                result, outcome = await client.grade_outcome(*request)
+                return result, time.perf_counter() - start, outcome
+            return await asyncio.gather(*(timed(request) for request in requests))
+
+    return asyncio.run(run())
+
+
+# ============================================================================
+# LOCAL STAND-IN SERVER
+# ============================================================================
+
+def serve(port=8770, host='127.0.0.1', latency=0.0, failure_rate=0.0):
+    """Serve POST /grade with the local heuristic from daemon threads; returns the server"""
+    rng = random.Random()
+
+    class GradeHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, so clients can pool connections
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if urlsplit(self.path).path != '/grade':
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            if failure_rate and rng.random() < failure_rate:
+                self.send_error(503, 'Simulated backend failure')
+                return
+            try:
+                items = json.loads(body)['items']
+                results = [grade_item(item) for item in items]
+            except (ValueError, KeyError, TypeError):
+                self.send_error(400, 'Expected {"items": [{"content", "difficulty", "average"}, ...]}')
+                return
+            payload = json.dumps({'model_version': LocalGraderBackend.version, 'results': [
+                {'score': score, 'feedback': feedback, 'suggestions': suggestions}
+                for score, feedback, suggestions in results
+            ]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), GradeHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='lms-grader', daemon=True)
+    thread.start()
+    return server
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(submissions=5000, latency=0.05, seed=3):
+    """Grade synthetic submissions through the stand-in server, then through one that is too slow"""
+    rng = random.Random(seed)
+    requests = [
+        ('answer ' * rng.randint(5, 60), rng.choice(('easy', 'medium', 'hard')), {'math': [rng.uniform(50, 100)]})
+        for _ in range(submissions)
+    ]
+    for label, server_latency, timeout in (('healthy', latency, 1.0), ('slow', 1.0, 0.25)):
+        server = serve(port=0, latency=server_latency)
+        backend = HTTPGraderBackend(f'http://127.0.0.1:{server.server_address[1]}/grade')
+        start = time.perf_counter()
+        graded = grade_all(backend, requests, timeout=timeout, retries=1)
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        remote = sum(1 for _, _, outcome in graded if outcome == 'remote')
+        seconds = sorted(s for _, s, _ in graded)
+        print(f"{label:<8} backend ({server_latency * 1000:.0f} ms/request): {len(graded)} graded in "
+              f"{elapsed:.2f}s ({len(graded) / elapsed:.0f}/s, {remote} remote, {len(graded) - remote} fallback), "
+              f"p50 {seconds[len(seconds) // 2] * 1000:.0f} ms, p99 {seconds[int(len(seconds) * 0.99)] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8770
+        server = serve(port=port, latency=float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
+        print(f"Stand-in grading backend on http://127.0.0.1:{port}/grade (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+                  float(sys.argv[2]) if len(sys.argv) > 2 else 0.05)
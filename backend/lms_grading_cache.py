@@ -0,0 +1,136 @@
+"""
+K-12 Learning Management System - Grading Result Cache
+
+Memoizes AI grading results. Resubmissions, copied boilerplate answers
+and reruns of bulk grading present the same (content, difficulty,
+performance history) again and again; the cache keys a result by a hash
+of the content plus the difficulty, a digest of the student's score
+history and the grader version, so any change to the inputs - or a bump
+of GRADER_VERSION when the grading logic or rubric changes - misses
+instead of returning a stale grade. Entries are evicted least recently
+used first, can be saved to disk between runs, and every lookup is
+counted in lms_metrics (cache='grading').
+
+Usage:
+    cache = GradingCache(AIAssistant.auto_grade_assignment, GRADER_VERSION, path='grading_cache.json')
+    score, feedback, suggestions = cache.grade(content, 'medium', history)
+    cache.save()
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import lms_metrics as metrics
+from lms_files import atomic_write
+from lms_performance import as_history
+
+
+# ============================================================================
+# GRADING CACHE
+# ============================================================================
+
+class GradingCache:
+    """Size-bounded LRU cache of (score, feedback, suggestions) results"""
+
+    def __init__(self, grader, grader_version, maxsize=10000, path=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.grader = grader
+        self.grader_version = grader_version
+        self.maxsize = maxsize
+        self.path = path
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (score, feedback, suggestions)
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, content, difficulty, perf=None):
+        """Cache key for one grading request"""
+        digest = hashlib.sha256(content.encode('utf-8'))
+        digest.update(f'|{difficulty}|{as_history(perf).digest()}|{self.grader_version}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Cached result or None, counting the lookup"""
+        with self.lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if result is None:
+            metrics.cache_miss('grading')
+            return None
+        metrics.cache_hit('grading')
+        score, feedback, suggestions = result
+        return score, feedback, list(suggestions)
+
+    def put(self, key, result):
+        score, feedback, suggestions = result
+        with self.lock:
+            self._entries[key] = (score, feedback, tuple(suggestions))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def grade(self, content, difficulty, perf=None):
+        """Grade through the cache, calling the grader only on a miss"""
+        key = self.key(content, difficulty, perf)
+        result = self.get(key)
+        if result is None:
+            result = self.grader(content, difficulty, perf)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self, path=None):
+        """Load saved entries; a missing file or another grader version loads nothing"""
+        path = path or self.path
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('grader_version') != self.grader_version:
+            return 0
+        with self.lock:
+            for key, score, feedback, suggestions in data.get('entries', [])[-self.maxsize:]:
+                self._entries[key] = (score, feedback, tuple(suggestions))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return len(self._entries)
+
+    def save(self, path=None):
+        """Write entries (least recently used first) atomically"""
+        path = path or self.path
+        with self.lock:
+            entries = [[key, score, feedback, list(suggestions)]
+                       for key, (score, feedback, suggestions) in self._entries.items()]
+        with atomic_write(path) as f:
+            json.dump({'grader_version': self.grader_version, 'entries': entries}, f)
+        return path
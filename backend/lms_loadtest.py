@@ -0,0 +1,315 @@
+"""
+K-12 Learning Management System - Load Test Harness
+
+Simulates the 8 a.m. rush: virtual students and teachers log in, open
+dashboards, submit work, AI-grade and view analytics against one shared
+LMSStore at the rates you specify. Arrivals are open-loop (Poisson per
+operation), so a slow backend shows up as queueing latency instead of
+silently lowering the offered load. Latency is measured from each
+operation's scheduled start, and throughput and p50/p95/p99 latency are
+reported per operation.
+
+Everything runs in-process by default. With --http, the 'sync' operation
+fetches each virtual user's delta updates over HTTP, with their session,
+from an lms_push server started on a free port in this process (it has
+to share the workload's SessionManager).
+
+Usage:
+    python lms_loadtest.py [--students 2000] [--teachers 80] [--duration 30]
+                           [--threads 32] [--rate submit=35 --rate grade=15 ...]
+                           [--http]
+"""
+
+import heapq
+import itertools
+import json
+import math
+import random
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.request import urlopen
+
+from lms_background import OFFSCREEN_PLT
+from lms_profiling import percentile
+from lms_sessions import SessionManager
+from lms_static import student_inputs, teacher_inputs
+from lms_system import AIAssistant, Submission, analytics_html
+
+
+# Operations per second across all virtual users
+DEFAULT_RATES = {
+    'login': 20.0,
+    'view': 40.0,
+    'submit': 35.0,
+    'grade': 15.0,
+    'analytics': 2.0,
+    'sync': 0.0,
+}
+
+
+# ============================================================================
+# VIRTUAL USERS
+# ============================================================================
+
+class Workload:
+    """The operations virtual users perform against a store"""
+
+    def __init__(self, store, students, teachers, sync_url=None, seed=1):
+        self.store = store
+        self.students = students
+        self.teachers = teachers
+        self.users = students + teachers
+        self.sync_url = sync_url
+        self.sessions = SessionManager(store)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()  # guards rng, active, versions and pending
+        self.active = {}  # user_id -> session_id
+        # Clients start with an up-to-date replica; a full reset is a different workload
+        self.versions = dict.fromkeys(self.users, store.version)  # user_id -> last synced version
+        self.counter = itertools.count()
+
+        # Ungraded submissions per course, kept current from store events, so
+        # the grade operation does not scan the store
+        self.pending = defaultdict(set)  # course_id -> {(student_id, assignment_id)}
+        with store.lock:
+            for key, submission in store.submissions.items():
+                if submission.grade is None:
+                    self._add_pending(submission)
+        store.subscribe(self._on_store_change)
+
+    def close(self):
+        self.store.unsubscribe(self._on_store_change)
+
+    def _add_pending(self, submission):
+        assignment = self.store.assignments.get(submission.assignment_id)
+        if assignment is not None:
+            self.pending[assignment.course_id].add((submission.student_id, submission.assignment_id))
+
+    def _on_store_change(self, event, obj):
+        if event not in ('submission', 'grade', 'submission_removed', 'assignment_removed'):
+            return
+        with self.lock:
+            if event == 'submission' and obj.grade is None:
+                self._add_pending(obj)
+            elif event == 'assignment_removed':
+                keys = self.pending.get(obj.course_id, set())
+                keys.difference_update([key for key in keys if key[1] == obj.assignment_id])
+            else:
+                assignment = self.store.assignments.get(obj.assignment_id)
+                if assignment is not None:
+                    self.pending[assignment.course_id].discard((obj.student_id, obj.assignment_id))
+
+    def _pick(self, users):
+        with self.lock:
+            return self.rng.choice(users)
+
+    def _session(self, user_id):
+        with self.lock:
+            session_id = self.active.get(user_id)
+        if session_id is None or self.sessions.get(session_id) is None:
+            session_id = self.login(user_id)
+        return session_id
+
+    def login(self, user_id=None):
+        user_id = user_id or self._pick(self.users)
+        with self.lock:
+            previous = self.active.pop(user_id, None)
+        if previous is not None:
+            self.sessions.close(previous)
+        session = self.sessions.create(user_id)
+        with self.lock:
+            self.active[user_id] = session.session_id
+        return session.session_id
+
+    def view(self):
+        user_id = self._pick(self.users)
+        session_id = self._session(user_id)
+        user = self.store.users[user_id]
+        inputs = student_inputs if user.role == 'student' else teacher_inputs
+        return self.sessions.view_model(session_id, 'dashboard',
+                                        lambda: inputs(self.store.snapshot(), self.store, user))
+
+    def submit(self):
+        student_id = self._pick(self.students)
+        self._session(student_id)
+        enrollment = self.store.enrollment
+        open_work = [
+            aid for cid in enrollment.student_courses(student_id)
+            for aid in self.store.courses[cid].assignments
+            if (student_id, aid) not in self.store.submissions
+        ]
+        if not open_work:
+            return None
+        assignment_id = self._pick(open_work)
+        content = f'Submission {next(self.counter)}: ' + 'worked solution and explanation ' * self._pick(range(2, 20))
+        return self.store.add_submission(Submission(student_id, assignment_id, content, datetime.now()))
+
+    def grade(self):
+        teacher_id = self._pick(self.teachers)
+        self._session(teacher_id)
+        key = None
+        with self.lock:
+            # Claiming the key under the lock keeps two virtual teachers off the same submission
+            for course_id in self.store.enrollment.teacher_courses(teacher_id):
+                if self.pending.get(course_id):
+                    key = self.pending[course_id].pop()
+                    break
+        submission = self.store.submissions.get(key) if key is not None else None
+        if submission is None or submission.grade is not None:
+            return None
+        assignment = self.store.assignments[key[1]]
+        score, feedback, suggestions = AIAssistant.auto_grade_cached(
+            submission.content, assignment.difficulty, self.store.student_performance.get(key[0])
+        )
+        full_feedback = feedback + " Suggestions: " + "; ".join(suggestions)
+        return self.store.record_grade(submission, round(score), full_feedback, ai_score=round(score))
+
+    def analytics(self):
+        teacher_id = self._pick(self.teachers)
+        self._session(teacher_id)
+        course_ids = self.store.enrollment.teacher_courses(teacher_id)
+        return analytics_html(course_ids, 'All Courses', self.store.gradebook, OFFSCREEN_PLT)
+
+    def sync(self):
+        user_id = self._pick(self.users)
+        session_id = self._session(user_id)
+        with self.lock:
+            since = self.versions[user_id]
+        if self.sync_url is not None:
+            with urlopen(f'{self.sync_url}/changes?session={session_id}&since={since}', timeout=30) as response:
+                delta = json.loads(response.read())
+        else:
+            delta = self.store.changes_since(since)
+        with self.lock:
+            self.versions[user_id] = max(self.versions[user_id], delta['version'])
+        return delta
+
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def _arrivals(rates, duration, rng):
+    """Merged Poisson arrival times as (offset, operation), in order"""
+    heap = [(rng.expovariate(rate), op) for op, rate in rates.items() if rate > 0]
+    heapq.heapify(heap)
+    while heap:
+        offset, op = heapq.heappop(heap)
+        if offset >= duration:
+            continue
+        yield offset, op
+        heapq.heappush(heap, (offset + rng.expovariate(rates[op]), op))
+
+
+def run_load(workload, rates=None, duration=30.0, threads=32, seed=2):
+    """Drive the workload at the given rates for duration seconds; returns per-operation stats"""
+    rates = dict(DEFAULT_RATES if rates is None else rates)
+    rng = random.Random(seed)
+    results = {op: [] for op, rate in rates.items() if rate > 0}
+    errors = {op: 0 for op in results}
+    first_errors = {}  # op -> traceback of its first failure
+    lock = threading.Lock()
+
+    def execute(op, scheduled):
+        try:
+            getattr(workload, op)()
+            failed = None
+        except Exception:
+            failed = traceback.format_exc()
+        latency = time.perf_counter() - scheduled
+        with lock:
+            if failed is not None:
+                errors[op] += 1
+                first_errors.setdefault(op, failed)
+            else:
+                results[op].append(latency)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for offset, op in _arrivals(rates, duration, rng):
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(execute, op, start + offset)
+    elapsed = time.perf_counter() - start
+
+    stats = {}
+    for op, latencies in results.items():
+        latencies.sort()
+        stats[op] = {
+            'count': len(latencies),
+            'errors': errors[op],
+            'first_error': first_errors.get(op),
+            'offered_per_second': rates[op],
+            'per_second': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        }
+    return stats
+
+
+def print_report(stats):
+    print(f"{'Operation':<10} {'Count':>7} {'Err':>5} {'Offered/s':>10} {'Done/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Max ms':>8}")
+    print("-" * 82)
+    for op, row in stats.items():
+        print(f"{op:<10} {row['count']:>7} {row['errors']:>5} {row['offered_per_second']:>10.1f} "
+              f"{row['per_second']:>8.1f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+              f"{row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}")
+    for op, row in stats.items():
+        if row['first_error']:
+            print(f"\nFirst of {row['errors']} '{op}' errors:\n{row['first_error'].rstrip()}")
+
+
+def build_store(students, teachers):
+    """A synthetic district with at least the requested numbers of students and teachers"""
+    from lms_bench import build_district_store
+
+    # build_district_store makes 25 teachers and ~375 students per school by default
+    schools = max(1, math.ceil(students / 375), math.ceil(teachers / 25))
+    store = build_district_store(schools=schools, graded_fraction=0.5)
+    student_ids = [uid for uid, u in store.users.items() if u.role == 'student'][:students]
+    teacher_ids = [uid for uid, u in store.users.items() if u.role == 'teacher'][:teachers]
+    return store, student_ids, teacher_ids
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulate concurrent students and teachers')
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--teachers', type=int, default=80)
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds')
+    parser.add_argument('--threads', type=int, default=32, help='concurrent virtual-user threads')
+    parser.add_argument('--rate', action='append', default=[], metavar='OP=PER_SECOND',
+                        help=f"operation rate, ops: {', '.join(DEFAULT_RATES)}")
+    parser.add_argument('--http', action='store_true', help='run sync over HTTP against a local lms_push server')
+    args = parser.parse_args()
+
+    rates = dict(DEFAULT_RATES)
+    for item in args.rate:
+        op, _, value = item.partition('=')
+        if op not in rates:
+            parser.error(f"unknown operation {op!r}")
+        rates[op] = float(value)
+
+    store, student_ids, teacher_ids = build_store(args.students, args.teachers)
+    workload = Workload(store, student_ids, teacher_ids)
+    if args.http:
+        import lms_push
+
+        if rates['sync'] <= 0:
+            rates['sync'] = 20.0
+        server = lms_push.serve(lms_push.PushHub(store, sessions=workload.sessions), port=0)
+        workload.sync_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    print(f"{len(student_ids)} students, {len(teacher_ids)} teachers, {args.duration:g}s, {args.threads} threads"
+          + (f", sync via {workload.sync_url}" if workload.sync_url else ''))
+    print_report(run_load(workload, rates, args.duration, args.threads))
+    workload.close()
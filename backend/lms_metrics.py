@@ -0,0 +1,360 @@
+"""
+K-12 Learning Management System - Operational Metrics
+
+A small thread-safe metrics registry (counters, gauges, histograms) with
+Prometheus text exposition. Metrics can be dumped to a file for a
+node-exporter style textfile collector, or served on a local HTTP port;
+no external service or client library is required.
+
+Usage:
+    import lms_metrics
+    lms_metrics.watch_store(store)            # pending-queue gauge
+    lms_metrics.serve(port=9108)              # http://127.0.0.1:9108/metrics
+    lms_metrics.dump('lms_metrics.prom')      # or write a snapshot file
+"""
+
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lms_files import atomic_write
+
+
+# ============================================================================
+# METRIC TYPES
+# ============================================================================
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """Context manager and decorator observing elapsed seconds"""
+
+    __slots__ = ('observe', 'start')
+
+    def __init__(self, observe):
+        self.observe = observe
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.observe(time.perf_counter() - self.start)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.observe):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+class _Metric:
+    kind = 'untyped'
+    family_suffix = ''  # appended to the name in HELP/TYPE and every sample
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, **labels):
+        """Child metric for one combination of label values"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels()")
+        return self.labels()
+
+    def samples(self):
+        """(suffix, label names, label values, value) tuples for exposition"""
+        raise NotImplementedError
+
+    def expose(self):
+        family = self.name + self.family_suffix
+        lines = [f'# HELP {family} {self.documentation}', f'# TYPE {family} {self.kind}']
+        for suffix, names, values, value in self.samples():
+            lines.append(f'{family}{suffix}{_format_labels(names, values)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+    family_suffix = '_total'  # TYPE must name the samples, which end in _total
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def samples(self):
+        for key, child in sorted(self._children.items()):
+            yield '', self.labelnames, key, child.value
+
+
+class _GaugeChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set_function(self, fn):
+        """Compute the gauge at scrape time; fn returns a number or {label values: number}"""
+        self._function = fn
+
+    def samples(self):
+        if self._function is not None:
+            result = self._function()
+            if not isinstance(result, dict):
+                yield '', (), (), result
+                return
+            for key, value in sorted(result.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                yield '', self.labelnames, key, value
+            return
+        for key, child in sorted(self._children.items()):
+            yield '', self.labelnames, key, child.value
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', 'bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self._lock = threading.Lock()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """Observe elapsed seconds of a with-block or decorated function"""
+        return _Timer(self.observe)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return _Timer(self.observe)
+
+    def samples(self):
+        bucket_names = self.labelnames + ('le',)
+        for key, child in sorted(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total, count = child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield '_bucket', bucket_names, key + (_format_value(float(bound)),), cumulative
+            yield '_sum', self.labelnames, key, total
+            yield '_count', self.labelnames, key, count
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def exposition(self):
+        """All metrics in Prometheus text format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return '\n'.join(metric.expose() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ============================================================================
+# LMS METRICS
+# ============================================================================
+
+SUBMISSIONS = REGISTRY.counter(
+    'lms_submissions', 'Assignment submissions received')
+GRADES = REGISTRY.counter(
+    'lms_grades', 'Grades written to submissions', ('source',))
+AI_GRADING_SECONDS = REGISTRY.histogram(
+    'lms_ai_grading_seconds', 'Time spent in AIAssistant.auto_grade_assignment')
+PENDING_SUBMISSIONS = REGISTRY.gauge(
+    'lms_pending_submissions', 'Submissions waiting to be graded', ('teacher',))
+RENDER_SECONDS = REGISTRY.histogram(
+    'lms_render_seconds', 'Dashboard render time per view and tab', ('view',))
+CACHE_REQUESTS = REGISTRY.counter(
+    'lms_cache_requests', 'Cache lookups by cache and result', ('cache', 'result'))
+REMOTE_GRADING = REGISTRY.counter(
+    'lms_remote_grading', 'Submissions sent to the external grading backend by outcome', ('outcome',))
+
+
+def cache_hit(cache):
+    CACHE_REQUESTS.labels(cache=cache, result='hit').inc()
+
+
+def cache_miss(cache):
+    CACHE_REQUESTS.labels(cache=cache, result='miss').inc()
+
+
+def watch_store(store):
+    """Report the pending grading queue depth per teacher from a store at scrape time"""
+    PENDING_SUBMISSIONS.set_function(store.pending_by_teacher)
+
+
+# ============================================================================
+# EXPOSITION
+# ============================================================================
+
+def dump(path, registry=REGISTRY):
+    """Atomically write the current metrics to a text file"""
+    with atomic_write(path) as f:
+        f.write(registry.exposition())
+    return path
+
+
+def serve(port=9108, host='127.0.0.1', registry=REGISTRY):
+    """Serve /metrics on a local port from a daemon thread; returns the server"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.exposition().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='lms-metrics', daemon=True)
+    thread.start()
+    return server
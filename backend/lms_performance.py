@@ -0,0 +1,190 @@
+"""
+K-12 Learning Management System - Performance History
+
+Typed replacement for the per-student performance dicts, which mixed
+subject score lists with 'strength'/'weakness' strings. Scores are kept
+per subject in compact float arrays, optionally bounded to a window of
+the most recent scores (a ring buffer), with running sums so averages
+need no rescans. Profile attributes live in a separate mapping.
+"""
+
+import hashlib
+from array import array
+
+
+HISTORY_WINDOW = 100  # scores kept per subject for the sample data
+
+# Course subjects whose history key is not simply the lowercased name
+SUBJECT_KEYS = {'mathematics': 'math', 'maths': 'math'}
+
+
+def subject_key(subject):
+    """History key for a course subject ('Mathematics' -> 'math', 'Science' -> 'science')"""
+    key = subject.strip().lower()
+    return SUBJECT_KEYS.get(key, key)
+
+
+# ============================================================================
+# SCORE HISTORY
+# ============================================================================
+
+class ScoreHistory:
+    """Scores for one subject, oldest first, optionally bounded to maxlen"""
+
+    __slots__ = ('maxlen', '_buffer', '_start', '_sum')
+
+    def __init__(self, scores=(), maxlen=None):
+        if maxlen is not None and maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self.maxlen = maxlen
+        self._buffer = array('d')
+        self._start = 0
+        self._sum = 0.0
+        for score in scores:
+            self.append(score)
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __iter__(self):
+        buffer, start = self._buffer, self._start
+        return iter(buffer[start:] + buffer[:start])
+
+    def __repr__(self):
+        return f'ScoreHistory({list(self)!r}, maxlen={self.maxlen!r})'
+
+    def append(self, score):
+        """Add a score, dropping the oldest one once the window is full"""
+        score = float(score)
+        buffer = self._buffer
+        if self.maxlen is None or len(buffer) < self.maxlen:
+            buffer.append(score)
+        else:
+            self._sum -= buffer[self._start]
+            buffer[self._start] = score
+            self._start = (self._start + 1) % self.maxlen
+        self._sum += score
+
+    def values(self):
+        """Scores oldest first as a list"""
+        return list(self)
+
+    def as_numpy(self):
+        """Scores oldest first as a float64 NumPy array (one buffer copy, no per-score conversion)"""
+        import numpy as np
+
+        # A view would pin the array's buffer and make later appends fail
+        scores = np.array(self._buffer, dtype=np.float64)
+        return np.roll(scores, -self._start) if self._start else scores
+
+    @property
+    def total(self):
+        return self._sum
+
+    def mean(self, default=None):
+        """Average of the scores in the window"""
+        return self._sum / len(self._buffer) if self._buffer else default
+
+
+# ============================================================================
+# PERFORMANCE HISTORY
+# ============================================================================
+
+class PerformanceHistory:
+    """One student's score histories per subject plus profile attributes"""
+
+    __slots__ = ('window', 'subjects', 'profile', '_flat', '_digest')
+
+    def __init__(self, subjects=None, profile=None, window=None):
+        self.window = window
+        self.subjects = {}
+        self.profile = dict(profile or {})
+        self._flat = None
+        self._digest = None
+        for subject, scores in (subjects or {}).items():
+            self.subjects[subject] = ScoreHistory(scores, maxlen=window)
+
+    @classmethod
+    def from_dict(cls, perf, window=None):
+        """Split a legacy {subject: [scores], 'strength': str, ...} dict"""
+        subjects = {k: v for k, v in perf.items() if isinstance(v, (list, tuple, ScoreHistory))}
+        profile = {k: v for k, v in perf.items() if isinstance(v, str)}
+        return cls(subjects, profile, window)
+
+    def __repr__(self):
+        return f'PerformanceHistory({self.subjects!r}, profile={self.profile!r})'
+
+    def __bool__(self):
+        return bool(self.subjects) or bool(self.profile)
+
+    def __getstate__(self):
+        return self.window, self.subjects, self.profile
+
+    def __setstate__(self, state):
+        self.window, self.subjects, self.profile = state
+        self._flat = None
+        self._digest = None
+
+    def record(self, subject, score):
+        """Append a score to a subject's history"""
+        history = self.subjects.get(subject)
+        if history is None:
+            history = self.subjects[subject] = ScoreHistory(maxlen=self.window)
+        history.append(score)
+        self._flat = None
+        self._digest = None
+
+    def subject_scores(self, subject):
+        """Scores for one subject, oldest first (empty if none)"""
+        history = self.subjects.get(subject)
+        return history.values() if history is not None else []
+
+    def subject_mean(self, subject, default=None):
+        history = self.subjects.get(subject)
+        return history.mean(default) if history is not None else default
+
+    def scores(self):
+        """All scores, subject by subject, as one cached tuple"""
+        if self._flat is None:
+            flat = []
+            for history in self.subjects.values():
+                flat.extend(history)
+            self._flat = tuple(flat)
+        return self._flat
+
+    def digest(self):
+        """Stable content hash of the scores, for cache keys (changes whenever a score is recorded)"""
+        if self._digest is None:
+            self._digest = hashlib.sha1(repr(self.scores()).encode('ascii')).hexdigest()
+        return self._digest
+
+    def count(self):
+        return sum(len(history) for history in self.subjects.values())
+
+    def mean(self, default=None):
+        """Average across every subject, from the running sums"""
+        count = self.count()
+        if not count:
+            return default
+        return sum(history.total for history in self.subjects.values()) / count
+
+    def copy(self):
+        clone = PerformanceHistory(profile=self.profile, window=self.window)
+        for subject, history in self.subjects.items():
+            clone.subjects[subject] = ScoreHistory(history, maxlen=history.maxlen)
+        return clone
+
+
+def as_history(perf):
+    """Accept a PerformanceHistory, a legacy dict or None"""
+    if isinstance(perf, PerformanceHistory):
+        return perf
+    return PerformanceHistory.from_dict(perf or {})
+
+
+def build_histories(student_performance, window=HISTORY_WINDOW):
+    """Convert {student_id: legacy dict} into {student_id: PerformanceHistory}"""
+    return {
+        student_id: PerformanceHistory.from_dict(perf, window)
+        for student_id, perf in student_performance.items()
+    }
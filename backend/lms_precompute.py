@@ -0,0 +1,141 @@
+"""
+K-12 Learning Management System - Nightly Precomputation
+
+Precomputes learning paths, content recommendations and per-assignment
+predictions for every student so render_student_dashboard() can read them
+from the store instead of recomputing them at login. Only students whose
+grades changed since the last run are refreshed.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from lms_performance import as_history
+from lms_system import AIAssistant
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+def compute_student(job):
+    """Compute materials and predictions for one student (runs in a worker)"""
+    student_id, perf, course_subjects, assignment_difficulties = job
+    performance = {student_id: perf}
+
+    materials = {
+        course_id: AIAssistant.intelligent_content_recommendation(student_id, subject, performance)
+        for course_id, subject in course_subjects
+    }
+
+    # Predictions only depend on difficulty, so compute each level once
+    by_difficulty = {}
+    predictions = {}
+    for assignment_id, difficulty in assignment_difficulties:
+        if difficulty not in by_difficulty:
+            by_difficulty[difficulty] = AIAssistant.predict_student_performance(
+                student_id, difficulty, performance
+            )
+        predictions[assignment_id] = by_difficulty[difficulty]
+
+    return student_id, materials, predictions
+
+
+# ============================================================================
+# BATCH JOB
+# ============================================================================
+
+def _build_jobs(store, student_ids):
+    """Snapshot the inputs each worker needs as plain picklable tuples"""
+    with store.lock:
+        student_courses = {
+            student_id: [store.courses[cid] for cid in store.enrollment.student_courses(student_id)]
+            for student_id in student_ids
+        }
+
+        jobs = []
+        versions = {}
+        for student_id in student_ids:
+            perf = as_history(store.student_performance.get(student_id)).copy()
+            course_subjects = [(c.course_id, c.subject) for c in student_courses[student_id]]
+            assignment_difficulties = [
+                (aid, store.assignments[aid].difficulty)
+                for c in student_courses[student_id]
+                for aid in c.assignments
+            ]
+            jobs.append((student_id, perf, course_subjects, assignment_difficulties))
+            versions[student_id] = store.grade_version(student_id)
+    return jobs, versions
+
+
+def precompute_all(store, workers=None, force=False, chunksize=16):
+    """Precompute results for stale students (or all students with force=True)"""
+    if force:
+        student_ids = [uid for uid, u in store.users.items() if u.role == 'student']
+    else:
+        student_ids = store.stale_students()
+    if not student_ids:
+        return []
+
+    jobs, versions = _build_jobs(store, student_ids)
+    paths = AIAssistant.personalized_learning_paths(
+        {student_id: job[1] for student_id, job in zip(student_ids, jobs)}
+    )
+
+    if workers == 1 or len(jobs) < 2:
+        results = map(compute_student, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(compute_student, jobs, chunksize=chunksize)
+
+    try:
+        computed_at = datetime.now()
+        for student_id, materials, predictions in results:
+            store.store_precomputed(student_id, versions[student_id], {
+                'learning_path': paths[student_id],
+                'materials': materials,
+                'predictions': predictions,
+                'computed_at': computed_at,
+            })
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return student_ids
+
+
+def start_nightly_precompute(store, hour=2, minute=0, workers=None):
+    """Run precompute_all() every night at the given local time"""
+    state = {}
+
+    def next_delay():
+        now = datetime.now()
+        run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if run_at <= now:
+            run_at += timedelta(days=1)
+        return (run_at - now).total_seconds()
+
+    def run():
+        try:
+            precompute_all(store, workers=workers)
+        finally:
+            schedule()
+
+    def schedule():
+        timer = threading.Timer(next_delay(), run)
+        timer.daemon = True
+        state['timer'] = timer
+        timer.start()
+
+    schedule()
+    return lambda: state['timer'].cancel()
+
+
+if __name__ == '__main__':
+    from lms_store import LMSStore
+
+    store = LMSStore.from_sample_data()
+    refreshed = precompute_all(store)
+    print(f"✅ Precomputed results for {len(refreshed)} students")
@@ -0,0 +1,203 @@
+"""
+K-12 Learning Management System - Profiling Hooks
+
+Opt-in instrumentation for the hot paths: AIAssistant calls, dashboard
+render functions, tab builders, data scans and chart rendering. Spans are
+free to leave in place; while profiling is disabled, span() returns a
+shared no-op context manager and @traced functions call straight through.
+
+Usage:
+    import lms_profiling
+    lms_profiling.enable()
+    ...render some dashboards...
+    lms_profiling.print_latency_table()
+    lms_profiling.export_chrome_trace('trace.json')   # open in chrome://tracing
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+# ============================================================================
+# STATE
+# ============================================================================
+
+class _ProfilerState:
+    enabled = False
+
+
+_state = _ProfilerState()
+_local = threading.local()
+_records_lock = threading.Lock()
+_records = []  # (name, start_ns, duration_ns, self_ns, thread_id, depth)
+_pid = os.getpid()
+
+
+def enable():
+    """Start recording spans"""
+    _state.enabled = True
+
+
+def disable():
+    """Stop recording spans (recorded data is kept)"""
+    _state.enabled = False
+
+
+def is_enabled():
+    return _state.enabled
+
+
+def reset():
+    """Discard recorded spans"""
+    with _records_lock:
+        del _records[:]
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'start', 'child_ns', 'stack')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.stack = stack
+        self.child_ns = 0
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        stack = self.stack
+        stack.pop()
+        if stack:
+            stack[-1].child_ns += duration
+        record = (self.name, self.start, duration, duration - self.child_ns, threading.get_ident(), len(stack))
+        with _records_lock:
+            _records.append(record)
+        return False
+
+
+def span(name):
+    """Context manager timing a block under the given name"""
+    if not _state.enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def traced(name=None):
+    """Decorator timing every call of a function"""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def records():
+    """Snapshot of recorded spans"""
+    with _records_lock:
+        return list(_records)
+
+
+def chrome_trace():
+    """Recorded spans as a Chrome trace event document"""
+    records_ = records()
+    origin = min((r[1] for r in records_), default=0)
+    events = [
+        {
+            'name': name,
+            'cat': name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': (start - origin) / 1000.0,
+            'dur': duration / 1000.0,
+            'pid': _pid,
+            'tid': thread_id,
+            'args': {'self_us': self_ns / 1000.0, 'depth': depth},
+        }
+        for name, start, duration, self_ns, thread_id, depth in records_
+    ]
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(path):
+    """Write recorded spans as Chrome trace JSON (chrome://tracing, Perfetto)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(), f)
+    return path
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list (0 when empty)"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_table():
+    """Aggregate recorded spans per name, slowest total time first"""
+    durations = defaultdict(list)
+    self_totals = defaultdict(int)
+    for name, start, duration, self_ns, thread_id, depth in records():
+        durations[name].append(duration)
+        self_totals[name] += self_ns
+
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            'name': name,
+            'calls': len(values),
+            'total_ms': sum(values) / 1e6,
+            'self_ms': self_totals[name] / 1e6,
+            'mean_ms': sum(values) / len(values) / 1e6,
+            'p50_ms': percentile(values, 0.50) / 1e6,
+            'p95_ms': percentile(values, 0.95) / 1e6,
+            'max_ms': values[-1] / 1e6,
+        })
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows
+
+
+def print_latency_table():
+    """Print the aggregated per-function latency table"""
+    print(f"{'Span':<48} {'Calls':>6} {'Total ms':>9} {'Self ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'Max ms':>8}")
+    print("-" * 102)
+    for row in latency_table():
+        print(f"{row['name']:<48} {row['calls']:>6} {row['total_ms']:>9.2f} {row['self_ms']:>9.2f} "
+              f"{row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} {row['max_ms']:>8.3f}")
@@ -0,0 +1,310 @@
+"""
+K-12 Learning Management System - Server-Sent Events Push
+
+Streams store change events (new submission, grade written, assignment
+published, student enrolled) to browsers over Server-Sent Events so the
+React client does not have to poll. Each connection subscribes with a
+filter - a session, a teacher, a student or explicit courses - and only
+receives events for the courses and students it can see. A user's filter
+follows their enrollments. Over HTTP the filter always comes from a
+session issued by the SessionManager, so a client only sees what its
+user's dashboard shows, and a stream ends within one heartbeat of the
+session's logout or expiry. Events are coalesced per
+connection: within a short window, repeated events for the same
+submission or assignment collapse into the latest one, so a burst of
+grading is delivered as one small batch.
+
+Usage:
+    import lms_push
+    hub = lms_push.PushHub(store, sessions=sessions)
+    lms_push.serve(hub, port=8765, allowed_origin='http://localhost:3000')
+
+    GET /events?session=<session_id>
+    GET /changes?session=<session_id>&since=<version>   # delta sync, see LMSStore.changes_since
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+EVENTS = ('submission', 'grade', 'assignment', 'enrollment')
+
+
+# ============================================================================
+# PAYLOADS
+# ============================================================================
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def event_payload(event, obj, course_id):
+    """JSON-ready description of a store change"""
+    if event == 'enrollment':
+        return {'student_id': obj.student_id, 'course_id': obj.course_id}
+    if event == 'assignment':
+        return {
+            'assignment_id': obj.assignment_id,
+            'course_id': obj.course_id,
+            'title': obj.title,
+            'due_date': _iso(obj.due_date),
+            'points': obj.points,
+            'difficulty': obj.difficulty,
+        }
+    return {
+        'student_id': obj.student_id,
+        'assignment_id': obj.assignment_id,
+        'course_id': course_id,
+        'submitted_date': _iso(obj.submitted_date),
+        'grade': obj.grade,
+        'ai_score': obj.ai_score,
+        'feedback': obj.feedback,
+    }
+
+
+# ============================================================================
+# SUBSCRIPTIONS
+# ============================================================================
+
+class Subscriber:
+    """One connected client: a filter plus a coalescing queue of pending events"""
+
+    def __init__(self, courses=None, students=None, max_pending=1000, user_id=None):
+        self.courses = courses
+        self.students = students
+        self.user_id = user_id  # the filter is recomputed when this user's enrollments change
+        self.max_pending = max_pending
+        self.condition = threading.Condition()
+        self.pending = OrderedDict()  # coalescing key -> (event, payload)
+        self.first_pending = None
+        self.closed = False
+        self.dropped = 0
+
+    def wants(self, course_id, student_id):
+        if self.courses is not None and course_id not in self.courses:
+            return False
+        return self.students is None or student_id is None or student_id in self.students
+
+    def offer(self, key, event, payload):
+        with self.condition:
+            if self.closed:
+                return
+            # Latest state wins; the event moves to the back of the queue
+            self.pending.pop(key, None)
+            self.pending[key] = (event, payload)
+            while len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+            if self.first_pending is None:
+                self.first_pending = time.monotonic()
+            self.condition.notify()
+
+    def drain(self, window, timeout):
+        """Wait for events, hold them for the coalescing window, then return them all"""
+        with self.condition:
+            if not self.pending and not self.closed:
+                self.condition.wait(timeout)
+            if not self.pending:
+                return []
+            delay = self.first_pending + window - time.monotonic()
+            if delay > 0:
+                self.condition.wait_for(lambda: self.closed, delay)
+            batch = list(self.pending.values())
+            self.pending.clear()
+            self.first_pending = None
+            return batch
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class PushHub:
+    """Fans store change events out to subscribers"""
+
+    def __init__(self, store, sessions=None, coalesce_window=0.25):
+        self.store = store
+        self.sessions = sessions
+        self.coalesce_window = coalesce_window
+        self._lock = threading.Lock()
+        self._subscribers = []
+        store.subscribe(self._on_store_change)
+
+    def subscribe(self, courses=None, students=None, user_id=None):
+        subscriber = Subscriber(
+            frozenset(courses) if courses is not None else None,
+            frozenset(students) if students is not None else None,
+            user_id=user_id,
+        )
+        with self._lock:
+            self._subscribers = self._subscribers + [subscriber]
+        return subscriber
+
+    def user_filter(self, user_id):
+        """(courses, students) a teacher or student may see, or None for an unknown user"""
+        user = self.store.users.get(user_id)
+        if user is None:
+            return None
+        enrollment = self.store.enrollment
+        if user.role == 'teacher':
+            return frozenset(enrollment.teacher_courses(user_id)), None
+        return frozenset(enrollment.student_courses(user_id)), frozenset((user_id,))
+
+    def session_user(self, session_id):
+        """User ID of a live session, or None"""
+        if self.sessions is None or session_id is None:
+            return None
+        session = self.sessions.get(session_id)
+        return session.user_id if session is not None else None
+
+    def session_live(self, session_id):
+        """Whether a session is still signed in (does not count as activity)"""
+        return self.sessions is not None and self.sessions.is_live(session_id)
+
+    def subscribe_user(self, user_id):
+        """Subscribe to everything a teacher or student sees on their dashboard"""
+        visible = self.user_filter(user_id)
+        return self.subscribe(*visible, user_id=user_id) if visible is not None else None
+
+    def subscribe_session(self, session_id):
+        user_id = self.session_user(session_id)
+        return self.subscribe_user(user_id) if user_id is not None else None
+
+    def changes_for(self, user_id, since):
+        """LMSStore.changes_since() limited to what one user may see (None for an unknown user)"""
+        visible = self.user_filter(user_id)
+        if visible is None:
+            return None
+        courses, students = visible
+        return self.store.changes_since(since, courses, students)
+
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
+
+    def close(self):
+        self.store.unsubscribe(self._on_store_change)
+        for subscriber in list(self._subscribers):
+            self.unsubscribe(subscriber)
+
+    def _on_store_change(self, event, obj):
+        if event not in EVENTS or not self._subscribers:
+            return
+        if event == 'enrollment':
+            # The student and the course's teachers now see the course
+            affected = {obj.student_id} | self.store.enrollment.teachers_of(obj.course_id)
+            for subscriber in self._subscribers:
+                visible = self.user_filter(subscriber.user_id) if subscriber.user_id in affected else None
+                if visible is not None:
+                    subscriber.courses, subscriber.students = visible
+            course_id, student_id = obj.course_id, obj.student_id
+            key = (event, obj.student_id, obj.course_id)
+        elif event == 'assignment':
+            course_id, student_id = obj.course_id, None
+            key = (event, obj.assignment_id)
+        else:
+            assignment = self.store.assignments.get(obj.assignment_id)
+            course_id = assignment.course_id if assignment is not None else None
+            student_id = obj.student_id
+            # A grade supersedes the submission event for the same work
+            key = ('work', obj.student_id, obj.assignment_id)
+        payload = event_payload(event, obj, course_id)
+        for subscriber in self._subscribers:
+            if subscriber.wants(course_id, student_id):
+                subscriber.offer(key, event, payload)
+
+
+# ============================================================================
+# HTTP SERVER
+# ============================================================================
+
+def serve(hub, port=8765, host='127.0.0.1', heartbeat=15.0, allowed_origin=None):
+    """Serve /events and /changes from daemon threads; returns the server
+
+    Both endpoints need ?session=<session_id> from the hub's SessionManager.
+    allowed_origin (e.g. the React dev server) is the only origin granted
+    cross-origin access; by default no CORS header is sent.
+    """
+
+    class EventStreamHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path not in ('/events', '/changes'):
+                self.send_error(404)
+                return
+            query = parse_qs(url.query)
+            if 'session' not in query:
+                self.send_error(400, 'session is required')
+                return
+            session_id = query['session'][0]
+            user_id = hub.session_user(session_id)
+            if user_id is None:
+                self.send_error(403, 'Unknown or expired session')
+                return
+            if url.path == '/changes':
+                self.send_changes(user_id, query)
+                return
+            subscriber = hub.subscribe_user(user_id)
+            if subscriber is None:
+                self.send_error(403, 'Unknown user')
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_cors()
+            self.end_headers()
+            try:
+                self.wfile.write(b'retry: 3000\n\n')
+                self.wfile.flush()
+                while not subscriber.closed:
+                    batch = subscriber.drain(hub.coalesce_window, heartbeat)
+                    if not hub.session_live(session_id):
+                        break  # logged out or expired
+                    if not batch:
+                        self.wfile.write(b': keep-alive\n\n')
+                    for event, payload in batch:
+                        self.wfile.write(f'event: {event}\ndata: {json.dumps(payload)}\n\n'.encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                hub.unsubscribe(subscriber)
+
+        def send_changes(self, user_id, query):
+            try:
+                since = int(query.get('since', ['0'])[0])
+            except ValueError:
+                self.send_error(400, 'since must be an integer version')
+                return
+            delta = hub.changes_for(user_id, since)
+            if delta is None:
+                self.send_error(403, 'Unknown user')
+                return
+            body = json.dumps(delta).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_cors()
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_cors(self):
+            if allowed_origin is not None:
+                self.send_header('Access-Control-Allow-Origin', allowed_origin)
+                self.send_header('Vary', 'Origin')
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), EventStreamHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='lms-push', daemon=True)
+    thread.start()
+    return server
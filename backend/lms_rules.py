@@ -0,0 +1,87 @@
+"""
+K-12 Learning Management System - Learning Path Rules
+
+Recommendations for personalized learning paths are defined as data in
+learning_path_rules.json and compiled into a dispatch index keyed by the
+student profile (weakness, strength, ...). Paths for identical profiles
+are computed once and shared internally as tuples of read-only dicts;
+callers get their own list of plain dicts, as before the rule table.
+"""
+
+import json
+import os
+from types import MappingProxyType
+
+from lms_performance import as_history
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'learning_path_rules.json')
+
+
+# ============================================================================
+# RULE ENGINE
+# ============================================================================
+
+class LearningPathRules:
+    """Compiled learning path rule table"""
+
+    def __init__(self, table):
+        self.attributes = tuple(table.get('attributes', ('weakness', 'strength')))
+        rules = table.get('rules', {})
+
+        # attribute -> {value -> tuple of recommendations}
+        self.index = {
+            attr: {value: self._freeze(recs) for value, recs in rules.get(attr, {}).items()}
+            for attr in self.attributes
+        }
+        self.always = self._freeze(table.get('always', []))
+        self._paths = {}
+
+    @staticmethod
+    def _freeze(recommendations):
+        """Convert recommendation dicts into a tuple of read-only mappings"""
+        return tuple(MappingProxyType(dict(rec)) for rec in recommendations)
+
+    def profile_key(self, profile):
+        """Dispatch key for a profile mapping; unknown values collapse to None"""
+        key = []
+        for attr in self.attributes:
+            value = profile.get(attr, 'general')
+            key.append(value if value in self.index[attr] else None)
+        return tuple(key)
+
+    def _shared_path(self, key):
+        """Read-only recommendations for a compiled profile key, shared between students"""
+        path = self._paths.get(key)
+        if path is None:
+            path = ()
+            for attr, value in zip(self.attributes, key):
+                if value is not None:
+                    path += self.index[attr][value]
+            path += self.always
+            self._paths[key] = path
+        return path
+
+    def path_for_key(self, key):
+        """Recommendations for a compiled profile key as a list of dicts"""
+        return [dict(rec) for rec in self._shared_path(key)]
+
+    def path_for(self, perf):
+        """Recommendations for a single student profile"""
+        return self.path_for_key(self.profile_key(as_history(perf).profile))
+
+    def paths_for_all(self, student_performance):
+        """Compute learning paths for every student in one pass"""
+        return {
+            student_id: self.path_for_key(self.profile_key(as_history(perf).profile))
+            for student_id, perf in student_performance.items()
+        }
+
+
+def load_learning_path_rules(path=DEFAULT_RULES_PATH):
+    """Load and compile a rule table from a JSON file"""
+    with open(path, encoding='utf-8') as f:
+        return LearningPathRules(json.load(f))
+
+
+LEARNING_PATH_RULES = load_learning_path_rules()
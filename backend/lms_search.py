@@ -0,0 +1,246 @@
+"""
+K-12 Learning Management System - Full-Text Search
+
+An inverted index over assignment titles and descriptions and submission
+content, ranked with BM25. The index subscribes to the store and updates
+only the documents a change touches, so queries never rescan text.
+Posting lists are split by course, so course and teacher filters only
+visit the postings of the courses they select.
+
+Usage:
+    index = SearchIndex(store)
+    index.search('photosynthesis', teacher_id='teacher1', kind='submission')
+
+    python lms_search.py [submissions]     # index and query benchmark
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have i in is it its my of on or so that the this to was were '
+    'with you your'.split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize(text):
+    """Lowercase word tokens without stop words"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+# ============================================================================
+# SEARCH INDEX
+# ============================================================================
+
+class SearchIndex:
+    """BM25-ranked inverted index over assignments and submissions"""
+
+    def __init__(self, store=None, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        self.postings = {}  # term -> {course_id: {doc: term frequency}}
+        self.document_frequency = Counter()  # term -> number of documents containing it
+        self.docs = {}  # doc -> (course_id, length, terms)
+        self.assignment_docs = {}  # assignment_id -> set of submission docs
+        self.total_length = 0
+        self.store = store
+        if store is not None:
+            with store.lock:
+                for assignment in store.assignments.values():
+                    self.add_assignment(assignment)
+                for submission in store.submissions.values():
+                    assignment = store.assignments.get(submission.assignment_id)
+                    if assignment is not None:
+                        self.add_submission(submission, assignment.course_id)
+            store.subscribe(self._on_store_change)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def close(self):
+        if self.store is not None:
+            self.store.unsubscribe(self._on_store_change)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _add(self, doc, course_id, text):
+        terms = Counter(tokenize(text))
+        with self.lock:
+            self._remove(doc)
+            for term, count in terms.items():
+                self.postings.setdefault(term, {}).setdefault(course_id, {})[doc] = count
+            self.document_frequency.update(terms.keys())
+            length = sum(terms.values())
+            self.docs[doc] = (course_id, length, tuple(terms))
+            self.total_length += length
+            if doc[0] == 'submission':
+                self.assignment_docs.setdefault(doc[1][1], set()).add(doc)
+
+    def _remove(self, doc):
+        with self.lock:
+            entry = self.docs.pop(doc, None)
+            if entry is None:
+                return
+            course_id, length, terms = entry
+            for term in terms:
+                by_course = self.postings[term]
+                del by_course[course_id][doc]
+                if not by_course[course_id]:
+                    del by_course[course_id]
+                    if not by_course:
+                        del self.postings[term]
+                self.document_frequency[term] -= 1
+                if not self.document_frequency[term]:
+                    del self.document_frequency[term]
+            self.total_length -= length
+            if doc[0] == 'submission':
+                self.assignment_docs.get(doc[1][1], set()).discard(doc)
+
+    def add_assignment(self, assignment):
+        self._add(('assignment', assignment.assignment_id), assignment.course_id,
+                  f'{assignment.title} {assignment.description}')
+
+    def add_submission(self, submission, course_id):
+        self._add(('submission', (submission.student_id, submission.assignment_id)), course_id, submission.content)
+
+    def remove_assignment(self, assignment_id):
+        """Drop an assignment and every submission to it"""
+        with self.lock:
+            self._remove(('assignment', assignment_id))
+            for doc in self.assignment_docs.pop(assignment_id, ()):
+                self._remove(doc)
+
+    def remove_submission(self, student_id, assignment_id):
+        self._remove(('submission', (student_id, assignment_id)))
+
+    def _on_store_change(self, event, obj):
+        if event == 'assignment':
+            self.add_assignment(obj)
+        elif event == 'submission':
+            assignment = self.store.assignments.get(obj.assignment_id)
+            if assignment is not None:
+                self.add_submission(obj, assignment.course_id)
+        elif event == 'submission_removed':
+            self.remove_submission(obj.student_id, obj.assignment_id)
+        elif event == 'assignment_removed':
+            self.remove_assignment(obj.assignment_id)
+        # Grades do not change any indexed text
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(self, query, course_ids=None, teacher_id=None, kind=None, limit=20):
+        """Best-matching documents as [{'kind', 'id', 'course_id', 'score'}], highest score first"""
+        if teacher_id is not None:
+            if self.store is None:
+                raise ValueError("teacher_id filtering needs an index built from a store")
+            teacher_courses = set(self.store.enrollment.teacher_courses(teacher_id))
+            course_ids = teacher_courses if course_ids is None else teacher_courses & set(course_ids)
+        elif course_ids is not None:
+            course_ids = set(course_ids)
+
+        terms = set(tokenize(query))
+        scores = Counter()
+        with self.lock:
+            n = len(self.docs)
+            if not n or not terms:
+                return []
+            docs = self.docs
+            k1, b = self.k1, self.b
+            length_scale = k1 * b / (self.total_length / n or 1.0)
+
+            # Rarest terms first. A term's contribution to any document is below
+            # its weight, so once the k-th best score reaches the summed weight of
+            # the remaining (common) terms, documents they alone match can never
+            # enter the top k and those terms only update existing candidates.
+            weighted = []
+            for term in terms:
+                by_course = self.postings.get(term)
+                if by_course:
+                    df = self.document_frequency[term]
+                    weighted.append((df, math.log(1 + (n - df + 0.5) / (df + 0.5)) * (k1 + 1), by_course))
+            weighted.sort(key=lambda item: item[0])
+            remaining = sum(weight for _, weight, _ in weighted)
+
+            for _, weight, by_course in weighted:
+                pruned = len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] >= remaining
+                remaining -= weight
+                if pruned:
+                    for doc in scores:
+                        tf = by_course.get(docs[doc][0], {}).get(doc)
+                        if tf:
+                            scores[doc] += weight * tf / (tf + k1 * (1 - b) + length_scale * docs[doc][1])
+                    continue
+                if course_ids is None:
+                    postings = by_course.values()
+                else:
+                    postings = [by_course[c] for c in course_ids if c in by_course]
+                for posting in postings:
+                    for doc, tf in posting.items():
+                        if kind is not None and doc[0] != kind:
+                            continue
+                        scores[doc] += weight * tf / (tf + k1 * (1 - b) + length_scale * docs[doc][1])
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [
+                {'kind': doc[0], 'id': doc[1], 'course_id': docs[doc][0], 'score': score}
+                for doc, score in ranked
+            ]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(submissions=200000, queries=200, seed=11):
+    """Index a year of synthetic submissions and time filtered queries"""
+    import random
+    import time
+    from datetime import datetime
+
+    from lms_bench import build_district_store
+    from lms_system import Submission
+
+    rng = random.Random(seed)
+    vocabulary = [f'term{i}' for i in range(5000)] + [
+        'photosynthesis', 'fractions', 'geometry', 'ecosystem', 'democracy', 'metaphor', 'revolution',
+    ]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]  # Zipf-like word frequencies
+
+    store = build_district_store()
+    student_ids = [uid for uid, u in store.users.items() if u.role == 'student']
+    assignment_ids = list(store.assignments)
+    start = time.perf_counter()
+    index = SearchIndex(store)
+    for n in range(submissions):
+        words = rng.choices(vocabulary, weights, k=rng.randint(20, 120))
+        store.add_submission(Submission(rng.choice(student_ids), rng.choice(assignment_ids), ' '.join(words), datetime.now()))
+    build_seconds = time.perf_counter() - start
+
+    teachers = [uid for uid, u in store.users.items() if u.role == 'teacher']
+    timings = []
+    for _ in range(queries):
+        query = ' '.join(rng.choices(vocabulary, weights, k=2) + ['photosynthesis'])
+        begin = time.perf_counter()
+        index.search(query, teacher_id=rng.choice(teachers))
+        index.search(query)
+        timings.append(time.perf_counter() - begin)
+    timings.sort()
+    index.close()
+    print(f"Indexed {len(index)} documents, {len(index.postings)} terms in {build_seconds:.1f}s")
+    print(f"Query pair ms: p50 {timings[len(timings) // 2] * 1000:.2f}  "
+          f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f}  max {timings[-1] * 1000:.2f}")
+
+
+if __name__ == '__main__':
+    import sys
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
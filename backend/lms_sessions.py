@@ -0,0 +1,226 @@
+"""
+K-12 Learning Management System - Session Manager
+
+Replaces the single global current_user with per-session state so one
+kernel (or server process) can serve many users over the shared LMSStore.
+Each session is a small slotted object holding the user, the open tab,
+page cursors and a bounded LRU of cached view-models. Idle sessions are
+evicted, and view-models are dropped when the store reports a change to
+the data they were built from.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import lms_metrics as metrics
+
+
+# ============================================================================
+# SESSIONS
+# ============================================================================
+
+class Session:
+    """Compact state for one signed-in user"""
+
+    __slots__ = ('session_id', 'user_id', 'role', 'tab', 'cursors', 'view_models', 'generation', 'created', 'last_seen')
+
+    def __init__(self, session_id, user_id, role, now):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.role = role
+        self.tab = 0
+        self.cursors = {}
+        self.view_models = OrderedDict()
+        self.generation = 0  # bumped whenever the view-models are invalidated
+        self.created = now
+        self.last_seen = now
+
+
+class SessionManager:
+    """Tracks concurrent sessions with idle eviction and bounded per-session memory"""
+
+    def __init__(self, store, idle_timeout=30 * 60, max_sessions=10000,
+                 max_view_models=8, max_cursors=16, on_evict=None, clock=time.monotonic):
+        self.store = store
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_view_models = max_view_models
+        self.max_cursors = max_cursors
+        self.on_evict = on_evict
+        self.clock = clock
+        self.lock = threading.RLock()
+        self._sessions = OrderedDict()  # session_id -> Session, least recently used first
+        self._by_user = {}  # user_id -> set of session_ids
+        store.subscribe(self._on_store_change)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def create(self, user_id):
+        """Start a session for a user; returns None if the user does not exist"""
+        user = self.store.users.get(user_id)
+        if user is None:
+            return None
+
+        now = self.clock()
+        session = Session(secrets.token_urlsafe(16), user_id, user.role, now)
+        with self.lock:
+            self.evict_idle(now)
+            while len(self._sessions) >= self.max_sessions:
+                self._evict(next(iter(self._sessions)))
+            self._sessions[session.session_id] = session
+            self._by_user.setdefault(user_id, set()).add(session.session_id)
+        return session
+
+    def get(self, session_id):
+        """Look up a live session and mark it as recently used"""
+        now = self.clock()
+        with self.lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_seen > self.idle_timeout:
+                self._evict(session_id)
+                return None
+            session.last_seen = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def is_live(self, session_id):
+        """Whether a session exists and has not expired, without marking it as used"""
+        with self.lock:
+            session = self._sessions.get(session_id)
+            return session is not None and self.clock() - session.last_seen <= self.idle_timeout
+
+    def user(self, session_id):
+        """The User behind a session, or None"""
+        session = self.get(session_id)
+        return self.store.users.get(session.user_id) if session is not None else None
+
+    def close(self, session_id):
+        """End a session (logout)"""
+        with self.lock:
+            if session_id in self._sessions:
+                self._evict(session_id)
+
+    def evict_idle(self, now=None):
+        """Evict sessions idle for longer than idle_timeout; returns the count"""
+        now = self.clock() if now is None else now
+        evicted = 0
+        with self.lock:
+            # Sessions are kept in last-used order, so stop at the first live one
+            while self._sessions:
+                session_id, session = next(iter(self._sessions.items()))
+                if now - session.last_seen <= self.idle_timeout:
+                    break
+                self._evict(session_id)
+                evicted += 1
+        return evicted
+
+    def _evict(self, session_id):
+        session = self._sessions.pop(session_id)
+        user_sessions = self._by_user.get(session.user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._by_user[session.user_id]
+        session.view_models.clear()
+        if self.on_evict is not None:
+            self.on_evict(session)
+
+    def sessions_for(self, user_id):
+        """Live session ids for a user"""
+        with self.lock:
+            return set(self._by_user.get(user_id, ()))
+
+    # ------------------------------------------------------------------
+    # Per-session state
+    # ------------------------------------------------------------------
+
+    def set_tab(self, session_id, tab):
+        """Remember which dashboard tab is open"""
+        session = self.get(session_id)
+        if session is not None:
+            session.tab = tab
+
+    def set_cursor(self, session_id, name, position):
+        """Remember a page cursor (e.g. the grading queue offset)"""
+        session = self.get(session_id)
+        if session is None:
+            return
+        with self.lock:
+            cursors = session.cursors
+            cursors.pop(name, None)
+            cursors[name] = position
+            while len(cursors) > self.max_cursors:
+                del cursors[next(iter(cursors))]
+
+    def cursor(self, session_id, name, default=0):
+        """Read a page cursor"""
+        session = self.get(session_id)
+        return session.cursors.get(name, default) if session is not None else default
+
+    def view_model(self, session_id, key, build):
+        """Return a cached view-model for the session, building it with build() on a miss"""
+        session = self.get(session_id)
+        if session is None:
+            return build()
+        with self.lock:
+            cached = session.view_models.get(key)
+            if cached is not None:
+                session.view_models.move_to_end(key)
+                metrics.cache_hit('view_model')
+                return cached
+            generation = session.generation
+        metrics.cache_miss('view_model')
+        value = build()
+        with self.lock:
+            # A change that arrived while building may not be in value; serve it uncached
+            if session.generation != generation:
+                return value
+            session.view_models[key] = value
+            while len(session.view_models) > self.max_view_models:
+                session.view_models.popitem(last=False)
+        return value
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def _affected_users(self, event, obj):
+        enrollment = self.store.enrollment
+        if event == 'enrollment':
+            return {obj.student_id} | enrollment.teachers_of(obj.course_id)
+        if event in ('assignment', 'assignment_removed'):
+            return enrollment.roster(obj.course_id) | enrollment.teachers_of(obj.course_id)
+        assignment = self.store.assignments.get(obj.assignment_id)
+        users = {obj.student_id}
+        if assignment is not None:
+            users |= enrollment.teachers_of(assignment.course_id)
+        return users
+
+    def _on_store_change(self, event, obj):
+        if event not in ('submission', 'grade', 'assignment', 'submission_removed', 'assignment_removed',
+                         'enrollment'):
+            return
+        with self.lock:
+            for user_id in self._affected_users(event, obj):
+                for session_id in self._by_user.get(user_id, ()):
+                    session = self._sessions[session_id]
+                    session.generation += 1
+                    session.view_models.clear()
+
+    def stats(self):
+        """Session counts for monitoring"""
+        with self.lock:
+            return {
+                'sessions': len(self._sessions),
+                'users': len(self._by_user),
+                'view_models': sum(len(s.view_models) for s in self._sessions.values()),
+            }
@@ -0,0 +1,380 @@
+"""
+K-12 Learning Management System - Sharded District Analytics
+
+Partitions courses (with their assignments, submissions and the
+performance histories of enrolled students) across long-lived worker
+processes, one shard per process, keyed by school or by course. District
+queries run map-reduce style: every shard computes a partial result over
+the data it owns and the coordinator merges them. Writes made through the
+LMSStore afterwards are forwarded to the owning shard so shards stay
+current.
+
+Usage:
+    with ShardedLMS(store, shards=4, key=by_school) as district:
+        district.analytics_summary()
+        district.at_risk(threshold=70)
+        district.grade_pending()
+
+    python lms_shards.py [shards]      # scaling benchmark on a synthetic district
+"""
+
+import multiprocessing
+import os
+import threading
+from datetime import datetime
+
+from lms_gradebook import grade_bands
+from lms_system import AIAssistant
+
+
+# ============================================================================
+# PARTITIONING
+# ============================================================================
+
+def by_course(course):
+    """Shard key balancing individual courses across shards"""
+    return course.course_id
+
+
+def by_school(course):
+    """Shard key keeping a school's courses together (falls back to the course)"""
+    return getattr(course, 'school', None) or course.course_id
+
+
+class ShardMap:
+    """Assigns shard keys to shards, placing each new key on the least loaded shard"""
+
+    def __init__(self, shards, key=by_course):
+        self.shards = shards
+        self.key = key
+        self.load = [0] * shards
+        self._key_shard = {}
+        self._course_shard = {}
+
+    def place(self, course):
+        """Shard index for a course, assigning its key on first sight"""
+        index = self._course_shard.get(course.course_id)
+        if index is None:
+            shard_key = self.key(course)
+            index = self._key_shard.get(shard_key)
+            if index is None:
+                index = self._key_shard[shard_key] = self.load.index(min(self.load))
+            self._course_shard[course.course_id] = index
+            self.load[index] += 1
+        return index
+
+    def shard_of(self, course_id):
+        return self._course_shard.get(course_id)
+
+
+def partition_store(store, shard_map):
+    """Split the store into per-shard (courses, assignments, submissions, performance) tuples"""
+    with store.lock:
+        parts = [({}, {}, {}, {}) for _ in range(shard_map.shards)]
+        # Place large courses first so greedy balancing evens out the shards
+        ordered = sorted(store.courses.values(), key=lambda c: -len(c.students) * max(len(c.assignments), 1))
+        for course in ordered:
+            courses, assignments, _, performance = parts[shard_map.place(course)]
+            courses[course.course_id] = course
+            for assignment_id in course.assignments:
+                if assignment_id in store.assignments:
+                    assignments[assignment_id] = store.assignments[assignment_id]
+            for student_id in course.students:
+                if student_id not in performance and student_id in store.student_performance:
+                    performance[student_id] = store.student_performance[student_id]
+
+        for (student_id, assignment_id), sub in store.submissions.items():
+            assignment = store.assignments.get(assignment_id)
+            index = shard_map.shard_of(assignment.course_id) if assignment is not None else None
+            if index is not None:
+                parts[index][2][(student_id, assignment_id)] = sub
+    return parts
+
+
+# ============================================================================
+# SHARD (runs inside a worker process)
+# ============================================================================
+
+class _Shard:
+    """The slice of district data owned by one worker process"""
+
+    def __init__(self, courses, assignments, submissions, performance):
+        self.courses = courses
+        self.assignments = assignments
+        self.submissions = submissions
+        self.performance = performance
+
+    def apply(self, event, obj):
+        """Mirror a write made through the coordinator's store"""
+        if event == 'assignment':
+            self.assignments[obj.assignment_id] = obj
+            course = self.courses.get(obj.course_id)
+            if course is not None and obj.assignment_id not in course.assignments:
+                course.assignments.append(obj.assignment_id)
+        elif event in ('submission', 'grade'):
+            self.submissions[(obj.student_id, obj.assignment_id)] = obj
+        elif event == 'submission_removed':
+            self.submissions.pop((obj.student_id, obj.assignment_id), None)
+        elif event == 'assignment_removed':
+            self.assignments.pop(obj.assignment_id, None)
+            course = self.courses.get(obj.course_id)
+            if course is not None and obj.assignment_id in course.assignments:
+                course.assignments.remove(obj.assignment_id)
+            for key in [k for k in self.submissions if k[1] == obj.assignment_id]:
+                del self.submissions[key]
+
+    def enroll(self, student_id, course_id, performance):
+        """Mirror a student joining a course, with their performance history"""
+        course = self.courses.get(course_id)
+        if course is not None and student_id not in course.students:
+            course.students.append(student_id)
+        if performance is not None:
+            self.performance[student_id] = performance
+
+    def summary(self, course_ids):
+        """Partial (count, sum, min, max, bands) over graded submissions"""
+        scores = []
+        for sub in self.submissions.values():
+            if sub.grade is not None:
+                assignment = self.assignments.get(sub.assignment_id)
+                if assignment is not None and (course_ids is None or assignment.course_id in course_ids):
+                    scores.append(sub.grade)
+        if not scores:
+            return 0, 0, None, None, [0] * 5
+        return len(scores), sum(scores), min(scores), max(scores), grade_bands(scores)
+
+    def student_totals(self, now):
+        """Partial {student_id: [grade sum, graded count, missing past-due count]}"""
+        totals = {}
+        for course in self.courses.values():
+            for assignment_id in course.assignments:
+                assignment = self.assignments.get(assignment_id)
+                if assignment is None:
+                    continue
+                overdue = assignment.due_date < now
+                for student_id in course.students:
+                    sub = self.submissions.get((student_id, assignment_id))
+                    if sub is not None and sub.grade is not None:
+                        entry = totals.setdefault(student_id, [0, 0, 0])
+                        entry[0] += sub.grade
+                        entry[1] += 1
+                    elif sub is None and overdue:
+                        totals.setdefault(student_id, [0, 0, 0])[2] += 1
+        return totals
+
+    def grade_pending(self):
+        """AI-grade every ungraded submission; returns (student, assignment, score, feedback)"""
+        results = []
+        for key, sub in self.submissions.items():
+            if sub.grade is not None:
+                continue
+            assignment = self.assignments.get(sub.assignment_id)
+            if assignment is None:
+                continue
+            score, feedback, suggestions = AIAssistant.auto_grade_assignment(
+                sub.content, assignment.difficulty, self.performance.get(sub.student_id)
+            )
+            score = round(score)
+            sub.grade = sub.ai_score = score
+            sub.feedback = feedback + " Suggestions: " + "; ".join(suggestions)
+            results.append((key[0], key[1], score, sub.feedback))
+        return results
+
+
+def _serve(conn, partition):
+    """Worker loop: hold one partition and answer (op, args, reply) messages"""
+    shard = _Shard(*partition)
+    del partition
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        op, args, reply = message
+        try:
+            result = getattr(shard, op)(*args)
+        except Exception as exc:
+            if reply:
+                conn.send(('error', f'{type(exc).__name__}: {exc}'))
+            continue
+        if reply:
+            conn.send(('ok', result))
+    conn.close()
+
+
+# ============================================================================
+# COORDINATOR
+# ============================================================================
+
+class ShardedLMS:
+    """Coordinator that fans queries out to shard processes and merges the results"""
+
+    def __init__(self, store, shards=None, key=by_course):
+        self.store = store
+        self.shards = shards or os.cpu_count() or 1
+        self.shard_map = ShardMap(self.shards, key)
+        self._lock = threading.Lock()
+        parts = partition_store(store, self.shard_map)
+
+        context = multiprocessing.get_context()
+        self._conns = []
+        self._processes = []
+        for index, partition in enumerate(parts):
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve, args=(child, partition),
+                                      name=f'lms-shard-{index}', daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        store.subscribe(self._forward)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        """Stop the shard processes"""
+        self.store.unsubscribe(self._forward)
+        with self._lock:
+            for conn in self._conns:
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for process in self._processes:
+                process.join(timeout=5)
+            for conn in self._conns:
+                conn.close()
+            self._conns = []
+            self._processes = []
+
+    def shard_sizes(self):
+        """Courses per shard"""
+        return list(self.shard_map.load)
+
+    def _map(self, op, *args):
+        """Run op on every shard in parallel and return the partial results"""
+        with self._lock:
+            for conn in self._conns:
+                conn.send((op, args, True))
+            replies = [conn.recv() for conn in self._conns]
+        for status, value in replies:
+            if status == 'error':
+                raise RuntimeError(f"Shard query {op} failed: {value}")
+        return [value for _, value in replies]
+
+    def _forward(self, event, obj):
+        if event in ('assignment', 'assignment_removed'):
+            course_id = obj.course_id
+            message = ('apply', (event, obj), False)
+        elif event in ('submission', 'grade', 'submission_removed'):
+            assignment = self.store.assignments.get(obj.assignment_id)
+            course_id = assignment.course_id if assignment is not None else None
+            message = ('apply', (event, obj), False)
+        elif event == 'enrollment':
+            course_id = obj.course_id
+            performance = self.store.student_performance.get(obj.student_id)
+            message = ('enroll', (obj.student_id, obj.course_id, performance), False)
+        else:
+            return
+        index = self.shard_map.shard_of(course_id)
+        if index is not None:
+            with self._lock:
+                self._conns[index].send(message)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def analytics_summary(self, course_ids=None):
+        """District (or course subset) grade summary: count, average, min, max, bands"""
+        course_ids = set(course_ids) if course_ids is not None else None
+        count, total, lows, highs, bands = 0, 0, [], [], [0] * 5
+        for n, s, low, high, shard_bands in self._map('summary', course_ids):
+            if not n:
+                continue
+            count += n
+            total += s
+            lows.append(low)
+            highs.append(high)
+            bands = [a + b for a, b in zip(bands, shard_bands)]
+        return {
+            'count': count,
+            'average': total / count if count else None,
+            'min': min(lows, default=None),
+            'max': max(highs, default=None),
+            'bands': dict(zip(['0-60', '60-70', '70-80', '80-90', '90-100'], bands)),
+        }
+
+    def at_risk(self, threshold=70.0, max_missing=2, now=None):
+        """Students averaging below threshold or missing max_missing past-due assignments"""
+        now = now or datetime.now()
+        merged = {}
+        for partial in self._map('student_totals', now):
+            for student_id, (total, graded, missing) in partial.items():
+                entry = merged.setdefault(student_id, [0, 0, 0])
+                entry[0] += total
+                entry[1] += graded
+                entry[2] += missing
+
+        flagged = []
+        for student_id, (total, graded, missing) in merged.items():
+            average = total / graded if graded else None
+            if (average is not None and average < threshold) or missing >= max_missing:
+                flagged.append({
+                    'student_id': student_id,
+                    'average': average,
+                    'graded': graded,
+                    'missing': missing,
+                })
+        flagged.sort(key=lambda row: (row['average'] if row['average'] is not None else -1, -row['missing']))
+        return flagged
+
+    def grade_pending(self):
+        """AI-grade all ungraded submissions in parallel and write the grades to the store"""
+        graded = 0
+        for results in self._map('grade_pending'):
+            for student_id, assignment_id, score, feedback in results:
+                sub = self.store.submissions.get((student_id, assignment_id))
+                if sub is not None and sub.grade is None:
+                    self.store.record_grade(sub, score, feedback, ai_score=score)
+                    graded += 1
+        return graded
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(max_shards=None, runs=3):
+    """Time district queries against a synthetic store for 1..max_shards shards"""
+    import time
+    from lms_bench import build_district_store
+
+    max_shards = max_shards or os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, max_shards} & set(range(1, max_shards + 1)))
+    print(f"{'Shards':>6} {'summary ms':>11} {'at_risk ms':>11} {'speedup':>8}")
+    print("-" * 40)
+    baseline = None
+    for shards in counts:
+        store = build_district_store(schools=8, courses_per_school=100)
+        with ShardedLMS(store, shards=shards, key=by_school) as district:
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                district.analytics_summary()
+                middle = time.perf_counter()
+                district.at_risk()
+                timings.append((middle - start, time.perf_counter() - middle))
+        summary_ms = min(t[0] for t in timings) * 1000
+        risk_ms = min(t[1] for t in timings) * 1000
+        baseline = baseline or summary_ms + risk_ms
+        print(f"{shards:>6} {summary_ms:>11.1f} {risk_ms:>11.1f} {baseline / (summary_ms + risk_ms):>7.2f}x")
+
+
+if __name__ == '__main__':
+    import sys
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,363 @@
+"""
+K-12 Learning Management System - Static Dashboard Snapshots
+
+Writes read-only per-student and per-teacher dashboard snapshots (a JSON
+view-model plus a self-contained HTML page) that the frontend can serve
+as static files, so parents and students checking grades do not need a
+live kernel. Pages are built in a process pool. Each snapshot records a
+content hash of its inputs in manifest.json, and later runs rebuild only
+the snapshots whose inputs changed.
+
+Usage:
+    python lms_static.py [--out DIR] [--workers N] [--force] [--district]
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from lms_files import atomic_write
+
+
+GENERATOR_VERSION = 1  # bump when view-models or page layout change
+DEFAULT_OUT_DIR = 'static_dashboards'
+MANIFEST = 'manifest.json'
+
+
+# ============================================================================
+# INPUTS
+# ============================================================================
+
+def student_inputs(snap, store, user):
+    """JSON-ready view model of a student's dashboard from a store snapshot"""
+    courses = [snap.courses[cid] for cid in store.enrollment.student_courses(user.user_id) if cid in snap.courses]
+    assignments = {aid: snap.assignments[aid] for c in courses for aid in c.assignments if aid in snap.assignments}
+    submissions = {
+        aid: snap.submissions[(user.user_id, aid)]
+        for aid in assignments if (user.user_id, aid) in snap.submissions
+    }
+    history = store.student_performance.get(user.user_id)
+    performance = {
+        'profile': dict(history.profile) if history is not None else {},
+        'subjects': {s: h.values() for s, h in history.subjects.items()} if history is not None else {},
+    }
+    return {
+        'user': [user.user_id, user.name, user.grade_level],
+        'courses': courses,
+        'assignments': assignments,
+        'submissions': submissions,
+        'performance': performance,
+    }
+
+
+def teacher_inputs(snap, store, user):
+    """JSON-ready view model of a teacher's dashboard from a store snapshot"""
+    courses = [snap.courses[cid] for cid in store.enrollment.teacher_courses(user.user_id) if cid in snap.courses]
+    assignments = {aid: snap.assignments[aid] for c in courses for aid in c.assignments if aid in snap.assignments}
+    # Snapshot tables iterate in hash order, which varies between processes;
+    # sort so the same data always hashes the same
+    submissions = sorted((sub for key, sub in snap.submissions.items() if key[1] in assignments),
+                         key=lambda sub: (sub.student_id, sub.assignment_id))
+    names = {sub.student_id: store.users[sub.student_id].name for sub in submissions if sub.student_id in store.users}
+    return {
+        'user': [user.user_id, user.name],
+        'courses': courses,
+        'assignments': assignments,
+        'submissions': submissions,
+        'student_names': names,
+    }
+
+
+def input_hash(inputs, now):
+    """Content hash of a snapshot's inputs (relative due dates change daily)"""
+    digest = hashlib.sha256()
+    digest.update(f'{GENERATOR_VERSION}|{now.date().isoformat()}|'.encode('utf-8'))
+    digest.update(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# ============================================================================
+# VIEW-MODELS AND PAGES (run in worker processes)
+# ============================================================================
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _assignment_status(assignment, submission, now):
+    if submission is not None:
+        return 'graded' if submission.grade is not None else 'submitted'
+    return 'overdue' if assignment.due_date < now else 'open'
+
+
+def _student_snapshot(inputs, now):
+    from collections import defaultdict
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    import lms_templates as templates
+    from lms_performance import PerformanceHistory
+    from lms_precompute import compute_student
+    from lms_rules import LEARNING_PATH_RULES
+    from lms_system import AIAssistant, assignment_row_html, student_ai_html, student_progress_html, student_upcoming_html
+
+    student_id, name, grade_level = inputs['user']
+    courses, assignments, submissions = inputs['courses'], inputs['assignments'], inputs['submissions']
+    perf = inputs['performance']
+    history = PerformanceHistory(perf['subjects'], perf['profile'])
+
+    _, materials, predictions = compute_student((
+        student_id, history,
+        [(c.course_id, c.subject) for c in courses],
+        [(aid, a.difficulty) for aid, a in assignments.items()],
+    ))
+    learning_path = LEARNING_PATH_RULES.path_for(history)
+    grades = [sub.grade for sub in submissions.values() if sub.grade is not None]
+
+    view_model = {
+        'student': {'id': student_id, 'name': name, 'grade_level': grade_level},
+        'generated_at': now.isoformat(),
+        'courses': [
+            {
+                'course_id': c.course_id, 'name': c.name, 'teacher': c.teacher, 'subject': c.subject,
+                'assignments': [
+                    {
+                        'assignment_id': aid, 'title': assignments[aid].title,
+                        'description': assignments[aid].description,
+                        'due_date': _iso(assignments[aid].due_date), 'points': assignments[aid].points,
+                        'difficulty': assignments[aid].difficulty,
+                        'status': _assignment_status(assignments[aid], submissions.get(aid), now),
+                        'grade': submissions[aid].grade if aid in submissions else None,
+                        'feedback': submissions[aid].feedback if aid in submissions else None,
+                    }
+                    for aid in c.assignments if aid in assignments
+                ],
+            }
+            for c in courses
+        ],
+        'progress': {
+            'average': sum(grades) / len(grades) if grades else None,
+            'graded': len(grades),
+            'best': max(grades, default=None),
+        },
+        'learning_path': learning_path,
+        'materials': materials,
+        'predictions': {aid: {'score': score, 'summary': text} for aid, (score, text) in predictions.items()},
+    }
+
+    # The HTML reuses the live dashboard fragments over the same records
+    course_map = {c.course_id: c for c in courses}
+    submission_map = {(student_id, aid): sub for aid, sub in submissions.items()}
+    precomputed = {'learning_path': learning_path, 'materials': materials, 'predictions': predictions}
+    parts = [templates.STUDENT_HEADER.render(name=name, grade_level=grade_level),
+             templates.HEADING.render(text='📚 My Courses & Assignments')]
+    for course in courses:
+        parts.append(templates.STUDENT_COURSE_CARD.render(name=course.name, teacher=course.teacher, subject=course.subject))
+        for aid in course.assignments:
+            if aid in assignments:
+                parts.append(assignment_row_html(assignments[aid], submissions.get(aid), now))
+                if aid in submissions and submissions[aid].grade is not None:
+                    parts.append(templates.FEEDBACK.render(feedback=submissions[aid].feedback))
+    parts.append(student_progress_html(student_id, course_map, assignments, submission_map, plt, defaultdict))
+    parts.append(student_ai_html(student_id, courses, AIAssistant, None, precomputed))
+    parts.append(student_upcoming_html(student_id, courses, assignments, submission_map, AIAssistant, None, precomputed, now))
+    return view_model, templates.join(parts)
+
+
+def _teacher_snapshot(inputs, now):
+    import lms_templates as templates
+    from lms_gradebook import grade_bands
+
+    teacher_id, name = inputs['user']
+    courses, assignments, submissions = inputs['courses'], inputs['assignments'], inputs['submissions']
+    names = inputs['student_names']
+
+    scores_by_course = {c.course_id: [] for c in courses}
+    pending = []
+    for sub in submissions:
+        assignment = assignments[sub.assignment_id]
+        if sub.grade is not None:
+            scores_by_course[assignment.course_id].append(sub.grade)
+        else:
+            pending.append((assignment, sub))
+    scores = [score for course_scores in scores_by_course.values() for score in course_scores]
+
+    view_model = {
+        'teacher': {'id': teacher_id, 'name': name},
+        'generated_at': now.isoformat(),
+        'courses': [
+            {
+                'course_id': c.course_id, 'name': c.name, 'subject': c.subject, 'grade_level': c.grade_level,
+                'student_count': len(c.students), 'assignment_count': len(c.assignments),
+                'graded': len(scores_by_course[c.course_id]),
+                'average': (sum(scores_by_course[c.course_id]) / len(scores_by_course[c.course_id])
+                            if scores_by_course[c.course_id] else None),
+            }
+            for c in courses
+        ],
+        'pending': [
+            {
+                'student_id': sub.student_id, 'student': names.get(sub.student_id, sub.student_id),
+                'assignment_id': a.assignment_id, 'title': a.title, 'submitted_date': _iso(sub.submitted_date),
+            }
+            for a, sub in pending
+        ],
+        'summary': {
+            'graded': len(scores),
+            'average': sum(scores) / len(scores) if scores else None,
+            'min': min(scores, default=None),
+            'max': max(scores, default=None),
+            'bands': dict(zip(['0-60', '60-70', '70-80', '80-90', '90-100'], grade_bands(scores))),
+        },
+    }
+
+    parts = [templates.TEACHER_HEADER.render(name=name), templates.HEADING.render(text='📚 My Courses')]
+    for course in view_model['courses']:
+        parts.append(templates.TEACHER_COURSE_CARD.render(
+            name=course['name'], subject=course['subject'], grade_level=course['grade_level'],
+            student_count=course['student_count'], assignment_count=course['assignment_count']
+        ))
+    parts.append(templates.HEADING.render(text='📝 Waiting to be Graded'))
+    for assignment, sub in pending:
+        parts.append(templates.PENDING_SUBMISSION_CARD.render(
+            title=assignment.title, student=names.get(sub.student_id, sub.student_id),
+            submitted=sub.submitted_date.strftime('%Y-%m-%d %H:%M'), content=sub.content
+        ))
+    if not pending:
+        parts.append(templates.ALL_GRADED.render())
+    parts.append(templates.HEADING.render(text='📊 Class Analytics'))
+    summary = view_model['summary']
+    if summary['graded']:
+        parts.append(templates.ANALYTICS_SUMMARY.render(
+            course_name='All Courses', avg_score=f"{summary['average']:.1f}", count=summary['graded'],
+            max_score=summary['max'], min_score=summary['min']
+        ))
+    else:
+        parts.append(templates.PARAGRAPH.render(text='No graded assignments yet for All Courses.'))
+    return view_model, templates.join(parts)
+
+
+def _write_atomic(path, text):
+    with atomic_write(path) as f:
+        f.write(text)
+
+
+def _build_snapshot(job):
+    """Build and write one snapshot (runs in a worker)"""
+    import lms_templates as templates
+
+    kind, user_id, digest, inputs, out_dir, now = job
+    builder = _student_snapshot if kind == 'student' else _teacher_snapshot
+    view_model, body = builder(inputs, now)
+
+    directory = os.path.join(out_dir, kind + 's')
+    json_path = os.path.join(directory, f'{user_id}.json')
+    html_path = os.path.join(directory, f'{user_id}.html')
+    _write_atomic(json_path, json.dumps(view_model, indent=1, default=str))
+    _write_atomic(html_path, templates.STATIC_PAGE.render(
+        title=f"{view_model[kind]['name']} - Dashboard", body=body, generated_at=now.strftime('%Y-%m-%d %H:%M')
+    ))
+    return kind, user_id, digest, os.path.relpath(json_path, out_dir), os.path.relpath(html_path, out_dir)
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get('snapshots', {}) if manifest.get('generator_version') == GENERATOR_VERSION else {}
+
+
+def build_snapshots(store, out_dir=DEFAULT_OUT_DIR, workers=None, force=False, chunksize=8, now=None):
+    """Write changed dashboard snapshots; returns {'built': [...], 'unchanged': n, 'removed': [...]}"""
+    now = now or datetime.now()
+    for kind in ('students', 'teachers'):
+        os.makedirs(os.path.join(out_dir, kind), exist_ok=True)
+
+    previous = _load_manifest(out_dir)
+    snap = store.snapshot()
+    entries = {}
+    jobs = []
+    for user_id, user in store.users.items():
+        if user.role == 'student':
+            inputs = student_inputs(snap, store, user)
+        elif user.role == 'teacher':
+            inputs = teacher_inputs(snap, store, user)
+        else:
+            continue
+        name = f'{user.role}/{user_id}'
+        digest = input_hash(inputs, now)
+        old = previous.get(name)
+        if (not force and old is not None and old['hash'] == digest
+                and os.path.exists(os.path.join(out_dir, old['json']))
+                and os.path.exists(os.path.join(out_dir, old['html']))):
+            entries[name] = old
+        else:
+            jobs.append((user.role, user_id, digest, inputs, out_dir, now))
+
+    if workers == 1 or len(jobs) < 2:
+        results = map(_build_snapshot, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_build_snapshot, jobs, chunksize=chunksize)
+
+    built = []
+    try:
+        for kind, user_id, digest, json_path, html_path in results:
+            name = f'{kind}/{user_id}'
+            entries[name] = {'hash': digest, 'json': json_path, 'html': html_path, 'built_at': now.isoformat()}
+            built.append(name)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Remove snapshots for users that no longer exist
+    removed = []
+    for name, old in previous.items():
+        if name not in entries:
+            for key in ('json', 'html'):
+                path = os.path.join(out_dir, old[key])
+                if os.path.exists(path):
+                    os.remove(path)
+            removed.append(name)
+
+    _write_atomic(os.path.join(out_dir, MANIFEST), json.dumps(
+        {'generator_version': GENERATOR_VERSION, 'store_version': snap.epoch, 'snapshots': entries},
+        indent=1, sort_keys=True
+    ))
+    return {'built': built, 'unchanged': len(entries) - len(built), 'removed': removed}
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from lms_store import LMSStore
+
+    parser = argparse.ArgumentParser(description='Write static dashboard snapshots')
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help='output directory')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='rebuild every snapshot')
+    parser.add_argument('--district', action='store_true', help='use a synthetic district-sized data set')
+    args = parser.parse_args()
+
+    if args.district:
+        from lms_bench import build_district_store
+        store = build_district_store()
+    else:
+        store = LMSStore.from_sample_data()
+
+    start = time.perf_counter()
+    result = build_snapshots(store, args.out, workers=args.workers, force=args.force)
+    print(f"Built {len(result['built'])}, unchanged {result['unchanged']}, removed {len(result['removed'])} "
+          f"in {time.perf_counter() - start:.2f}s -> {os.path.abspath(args.out)}")
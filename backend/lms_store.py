@@ -0,0 +1,606 @@
+"""
+K-12 Learning Management System - Data Store
+
+LMSStore wraps the users, courses, assignments, submissions and
+student_performance dicts returned by initialize_sample_data() and is the
+single place where dashboards and batch jobs write changes. Every write
+bumps a per-student version so derived results (precomputed
+recommendations and predictions) know when they are stale, keeps the
+dense Gradebook matrix current, and is announced to subscribed listeners as an (event, object) notification:
+
+    'submission'  a Submission was added or replaced
+    'grade'       a Submission was graded
+    'assignment'  an Assignment was published to a course (one event per
+                  course, also for bulk publish_assignments() batches)
+    'submission_removed' / 'assignment_removed'  an entity was deleted
+    'enrollment'  a student joined a course (an Enrollment tuple)
+
+snapshot() returns an immutable, epoch-stamped view of courses,
+assignments and submissions for long-running readers (analytics,
+exports). Records live in hash buckets of about 64 entries; a snapshot
+shares the store's buckets, and the first write to a bucket after a
+snapshot copies only that bucket, so readers never block writers for
+long and never see a half-applied write.
+
+Every write transaction bumps the store version (the snapshot epoch) and
+stamps each course, assignment and submission it touched with it.
+changes_since(n) returns only the entities changed after version n, plus
+tombstones for deletions, so clients can keep a local replica in sync.
+Tombstones remember the course the entity belonged to, so a delta can be
+limited to one user's courses and students, deletions included.
+compact() discards old tombstones; clients older than the compaction
+point are told to reset and receive a full copy.
+"""
+
+import re
+import threading
+from collections import OrderedDict, defaultdict, namedtuple
+from collections.abc import ItemsView, Mapping, ValuesView
+
+import lms_metrics as metrics
+from lms_enrollment import EnrollmentIndex
+from lms_gradebook import Gradebook
+from lms_performance import HISTORY_WINDOW, PerformanceHistory
+
+
+# ============================================================================
+# ID ALLOCATION
+# ============================================================================
+
+class IdAllocator:
+    """Thread-safe monotonic IDs of the form <prefix><n>
+
+    Numbering starts after the highest existing ID with the same prefix
+    and never goes back, so IDs are not reused after deletes.
+    """
+
+    def __init__(self, prefix, existing=()):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        pattern = re.compile(re.escape(prefix) + r'(\d+)$')
+        numbers = [int(m.group(1)) for m in map(pattern.match, existing) if m]
+        self._next = max(numbers, default=0) + 1
+
+    def next(self):
+        return self.reserve(1)[0]
+
+    def observe(self, assignment_id):
+        """Move past an ID that was created elsewhere"""
+        match = re.match(re.escape(self.prefix) + r'(\d+)$', assignment_id)
+        if match:
+            with self._lock:
+                self._next = max(self._next, int(match.group(1)) + 1)
+
+    def reserve(self, count):
+        """Allocate count consecutive IDs at once"""
+        with self._lock:
+            start = self._next
+            self._next += count
+        return [f'{self.prefix}{n}' for n in range(start, start + count)]
+
+
+# ============================================================================
+# SNAPSHOTS
+# ============================================================================
+
+CourseRecord = namedtuple('CourseRecord', 'course_id name teacher grade_level subject students assignments')
+AssignmentRecord = namedtuple('AssignmentRecord', 'assignment_id course_id title description due_date points difficulty')
+SubmissionRecord = namedtuple('SubmissionRecord', 'student_id assignment_id content submitted_date grade feedback ai_score')
+Enrollment = namedtuple('Enrollment', 'student_id course_id')
+
+
+def _course_record(course):
+    return CourseRecord(course.course_id, course.name, course.teacher, course.grade_level,
+                        course.subject, tuple(course.students), tuple(course.assignments))
+
+
+def _assignment_record(a):
+    return AssignmentRecord(a.assignment_id, a.course_id, a.title, a.description, a.due_date, a.points, a.difficulty)
+
+
+def _submission_record(s):
+    return SubmissionRecord(s.student_id, s.assignment_id, s.content, s.submitted_date, s.grade, s.feedback, s.ai_score)
+
+
+def _record_json(record):
+    """A snapshot record as a JSON-ready dict (datetimes as ISO strings, tuples as lists)"""
+    data = record._asdict()
+    for field, value in data.items():
+        if hasattr(value, 'isoformat'):
+            data[field] = value.isoformat()
+        elif isinstance(value, tuple):
+            data[field] = list(value)
+    return data
+
+
+BUCKET_SIZE = 64  # target records per bucket
+
+
+class _RecordItems(ItemsView):
+    def __iter__(self):
+        for bucket in self._mapping._buckets:
+            yield from bucket.items()
+
+
+class _RecordValues(ValuesView):
+    def __iter__(self):
+        for bucket in self._mapping._buckets:
+            yield from bucket.values()
+
+
+class RecordMap(Mapping):
+    """Read-only mapping over a frozen tuple of hash buckets"""
+
+    __slots__ = ('_buckets', '_mask', '_length')
+
+    def __init__(self, buckets, length):
+        self._buckets = buckets
+        self._mask = len(buckets) - 1
+        self._length = length
+
+    def __getitem__(self, key):
+        return self._buckets[hash(key) & self._mask][key]
+
+    def get(self, key, default=None):
+        return self._buckets[hash(key) & self._mask].get(key, default)
+
+    def __contains__(self, key):
+        return key in self._buckets[hash(key) & self._mask]
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __len__(self):
+        return self._length
+
+    def items(self):
+        return _RecordItems(self)
+
+    def values(self):
+        return _RecordValues(self)
+
+
+class RecordTable(RecordMap):
+    """The store's writable record mapping; freeze() shares buckets instead of copying
+
+    A bucket is owned by the table when its stamp equals the current
+    generation. freeze() starts a new generation, so the next write to any
+    bucket copies that bucket (about BUCKET_SIZE records) and leaves the
+    frozen view untouched.
+    """
+
+    __slots__ = ('_stamps', '_generation', '_frozen')
+
+    def __init__(self, records=()):
+        records = dict(records)
+        count = 16
+        while count * BUCKET_SIZE < len(records):
+            count *= 2
+        self._rebuild(count, records.items())
+
+    def _rebuild(self, count, items):
+        self._buckets = [{} for _ in range(count)]
+        self._mask = count - 1
+        self._length = 0
+        for key, record in items:
+            self._buckets[hash(key) & self._mask][key] = record
+            self._length += 1
+        self._stamps = [0] * count
+        self._generation = 0
+        self._frozen = None
+
+    def freeze(self):
+        """Immutable RecordMap of the current contents, O(buckets)"""
+        if self._frozen is None:
+            self._frozen = RecordMap(tuple(self._buckets), self._length)
+            self._generation += 1
+        return self._frozen
+
+    def _bucket_for_write(self, key):
+        index = hash(key) & self._mask
+        if self._stamps[index] != self._generation:
+            self._buckets[index] = dict(self._buckets[index])
+            self._stamps[index] = self._generation
+        self._frozen = None
+        return self._buckets[index]
+
+    def put(self, key, record):
+        if self._length >= len(self._buckets) * BUCKET_SIZE * 2:
+            # Rehash into fresh (owned) buckets; doubling keeps this amortized O(1)
+            self._rebuild(len(self._buckets) * 2, list(self.items()))
+        bucket = self._bucket_for_write(key)
+        if key not in bucket:
+            self._length += 1
+        bucket[key] = record
+
+    def pop(self, key, default=None):
+        if key not in self:
+            return default
+        self._length -= 1
+        return self._bucket_for_write(key).pop(key)
+
+
+class StoreSnapshot:
+    """Immutable view of the store as of one epoch"""
+
+    __slots__ = ('epoch', 'courses', 'assignments', 'submissions')
+
+    def __init__(self, epoch, courses, assignments, submissions):
+        self.epoch = epoch
+        self.courses = courses
+        self.assignments = assignments
+        self.submissions = submissions
+
+    def graded(self, course_ids=None):
+        """Graded submission records, optionally limited to some courses"""
+        for sub in self.submissions.values():
+            if sub.grade is not None:
+                assignment = self.assignments.get(sub.assignment_id)
+                if assignment is not None and (course_ids is None or assignment.course_id in course_ids):
+                    yield sub
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class LMSStore:
+    """Shared in-memory store for LMS data and derived results"""
+
+    def __init__(self, users, courses, assignments, submissions, student_performance):
+        self.users = users
+        self.courses = courses
+        self.assignments = assignments
+        self.submissions = submissions
+        self.student_performance = student_performance
+        self.lock = threading.RLock()
+        self.grade_versions = defaultdict(int)  # student_id -> version
+        self.precomputed = {}  # student_id -> (version, results)
+        self.gradebook = Gradebook.from_data(users, courses, assignments, submissions)
+        self.enrollment = EnrollmentIndex(users, courses)
+        self.assignment_ids = IdAllocator('a', assignments)
+        self._listeners = []
+
+        # Immutable records behind snapshot(), in bucketed copy-on-write tables
+        # Starts at 1 so since=0 (no replica yet) always differs from the current version
+        self.epoch = 1
+        self._records = {
+            'courses': RecordTable((cid, _course_record(c)) for cid, c in courses.items()),
+            'assignments': RecordTable((aid, _assignment_record(a)) for aid, a in assignments.items()),
+            'submissions': RecordTable((key, _submission_record(s)) for key, s in submissions.items()),
+        }
+
+        # Change log for delta sync: (kind, key) -> (version, deleted, course_id
+        # of a deleted entity), in version order with one entry per entity
+        self._changes = OrderedDict()
+        self.compacted_version = 0
+
+    @classmethod
+    def from_sample_data(cls):
+        """Build a store populated with the sample data set"""
+        from lms_system import initialize_sample_data
+        return cls(*initialize_sample_data())
+
+    def as_tuple(self):
+        """Return the raw dicts in initialize_sample_data() order"""
+        return self.users, self.courses, self.assignments, self.submissions, self.student_performance
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        """Consistent read-only view of courses, assignments and submissions"""
+        with self.lock:
+            records = self._records
+            return StoreSnapshot(self.epoch, records['courses'].freeze(), records['assignments'].freeze(),
+                                 records['submissions'].freeze())
+
+    def _put(self, kind, key, record):
+        # Caller holds the lock and has bumped the epoch for this transaction
+        self._records[kind].put(key, record)
+        self._log_change(kind, key, False, None)
+
+    def _delete(self, kind, key, course_id):
+        self._records[kind].pop(key, None)
+        self._log_change(kind, key, True, course_id)
+
+    def _log_change(self, kind, key, deleted, course_id):
+        self._changes.pop((kind, key), None)
+        self._changes[(kind, key)] = (self.epoch, deleted, course_id)
+
+    def _record_course(self, kind, record):
+        if kind != 'submissions':
+            return record.course_id
+        assignment = self.assignments.get(record.assignment_id)
+        return assignment.course_id if assignment is not None else None
+
+    # ------------------------------------------------------------------
+    # Delta sync
+    # ------------------------------------------------------------------
+
+    @property
+    def version(self):
+        return self.epoch
+
+    def entity_version(self, kind, key):
+        """Version at which an entity last changed (1 if unchanged since load)"""
+        entry = self._changes.get((kind, key))
+        return entry[0] if entry is not None else 1
+
+    def changes_since(self, since=0, courses=None, students=None):
+        """Entities changed after version `since` as JSON-ready dicts
+
+        Returns {'version', 'reset', 'courses', 'assignments',
+        'submissions', 'deleted'}. With reset=True the client's replica is
+        too old, empty, or from a version this store never reached (e.g.
+        before a server restart), and the response holds every live entity.
+        courses and students (sets of IDs) limit everything, tombstones
+        included, to those courses and to those students' submissions.
+        """
+        filtered = courses is not None or students is not None
+
+        def visible(kind, key, course_id):
+            if courses is not None and course_id not in courses:
+                return False
+            return students is None or kind != 'submissions' or key[0] in students
+
+        with self.lock:
+            version = self.epoch
+            records = self._records
+            reset = since <= 0 or since < self.compacted_version or since > version
+            changed = {'courses': [], 'assignments': [], 'submissions': []}
+            deleted = {'courses': [], 'assignments': [], 'submissions': []}
+            if reset:
+                for kind in changed:
+                    changed[kind] = [
+                        _record_json(r) for key, r in records[kind].items()
+                        if not filtered or visible(kind, key, self._record_course(kind, r))
+                    ]
+            else:
+                # The log is in version order, so walk back from the newest
+                for (kind, key), (changed_at, is_deleted, course_id) in reversed(self._changes.items()):
+                    if changed_at <= since:
+                        break
+                    if is_deleted:
+                        if not filtered or visible(kind, key, course_id):
+                            deleted[kind].append(list(key) if isinstance(key, tuple) else key)
+                        continue
+                    record = records[kind][key]
+                    if not filtered or visible(kind, key, self._record_course(kind, record)):
+                        changed[kind].append(_record_json(record))
+        return dict(version=version, reset=reset, deleted=deleted, **changed)
+
+    def compact(self, before):
+        """Drop tombstones at or below a version; older clients will be reset"""
+        with self.lock:
+            before = min(before, self.epoch)
+            for change_key in [k for k, (v, deleted, _) in self._changes.items() if deleted and v <= before]:
+                del self._changes[change_key]
+            self.compacted_version = max(self.compacted_version, before)
+            return self.compacted_version
+
+    # ------------------------------------------------------------------
+    # Change notifications
+    # ------------------------------------------------------------------
+
+    def subscribe(self, listener):
+        """Call listener(event, obj) after every write"""
+        with self.lock:
+            self._listeners = self._listeners + [listener]
+        return listener
+
+    def unsubscribe(self, listener):
+        """Stop notifying a listener"""
+        with self.lock:
+            self._listeners = [l for l in self._listeners if l is not listener]
+
+    def _notify(self, event, obj):
+        # Listeners run outside the lock so they can read (or write) freely
+        for listener in self._listeners:
+            listener(event, obj)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add_submission(self, submission):
+        """Store a new (or replacement) submission"""
+        with self.lock:
+            self.submissions[(submission.student_id, submission.assignment_id)] = submission
+            self.gradebook.set_submitted(submission.student_id, submission.assignment_id, submission.submitted_date)
+            self.gradebook.set_grade(submission.student_id, submission.assignment_id, submission.grade)
+            self.epoch += 1
+            self._put('submissions', (submission.student_id, submission.assignment_id), _submission_record(submission))
+        metrics.SUBMISSIONS.inc()
+        self._notify('submission', submission)
+        return submission
+
+    def add_assignment(self, assignment):
+        """Publish an assignment to its course"""
+        return self._publish([assignment])[0]
+
+    def publish_assignments(self, course_ids, title, description, due_date, points, difficulty):
+        """Create one assignment per course in a single transaction
+
+        Every course is checked before anything is written, so either all
+        assignments are published or none are. IDs come from the store's
+        allocator and the gradebook, snapshot records and epoch are
+        updated once for the whole batch.
+        """
+        from lms_system import Assignment
+
+        course_ids = list(dict.fromkeys(course_ids))
+        missing = [course_id for course_id in course_ids if course_id not in self.courses]
+        if missing:
+            raise KeyError(f"Unknown course(s): {', '.join(missing)}")
+        new_ids = self.assignment_ids.reserve(len(course_ids))
+        return self._publish([
+            Assignment(assignment_id, course_id, title, description, due_date, points, difficulty)
+            for assignment_id, course_id in zip(new_ids, course_ids)
+        ])
+
+    def _publish(self, new_assignments):
+        with self.lock:
+            for assignment in new_assignments:
+                if assignment.course_id not in self.courses:
+                    raise KeyError(f"Unknown course: {assignment.course_id}")
+                if assignment.assignment_id in self.assignments:
+                    raise ValueError(f"Assignment {assignment.assignment_id} already exists")
+
+            self.epoch += 1
+            for assignment in new_assignments:
+                self.assignments[assignment.assignment_id] = assignment
+                self.courses[assignment.course_id].assignments.append(assignment.assignment_id)
+                self._put('assignments', assignment.assignment_id, _assignment_record(assignment))
+                self.assignment_ids.observe(assignment.assignment_id)
+            for course_id in dict.fromkeys(a.course_id for a in new_assignments):
+                self._put('courses', course_id, _course_record(self.courses[course_id]))
+            self.gradebook.add_assignments([(a.assignment_id, a.course_id) for a in new_assignments])
+        for assignment in new_assignments:
+            self._notify('assignment', assignment)
+        return new_assignments
+
+    def enroll(self, student_id, course_id):
+        """Add a student to a course roster"""
+        with self.lock:
+            course = self.courses[course_id]
+            if self.enrollment.is_enrolled(student_id, course_id):
+                return course
+            course.students.append(student_id)
+            self.enrollment.enroll(student_id, course_id)
+            self.epoch += 1
+            self._put('courses', course_id, _course_record(course))
+            # Precomputed recommendations depend on the student's courses
+            self.grade_versions[student_id] += 1
+        self._notify('enrollment', Enrollment(student_id, course_id))
+        return course
+
+    def record_grade(self, submission, grade, feedback, ai_score=None):
+        """Write a grade to a submission and invalidate derived results"""
+        return self.record_grades([(submission, grade, feedback, ai_score)])[0]
+
+    def record_grades(self, grades):
+        """Write a batch of (submission, grade, feedback, ai_score) in one transaction"""
+        grades = list(grades)
+        with self.lock:
+            self.epoch += 1
+            for submission, grade, feedback, ai_score in grades:
+                submission.grade = grade
+                submission.feedback = feedback
+                if ai_score is not None:
+                    submission.ai_score = ai_score
+                self.gradebook.set_grade(submission.student_id, submission.assignment_id, grade)
+                self._put('submissions', (submission.student_id, submission.assignment_id), _submission_record(submission))
+                self.grade_versions[submission.student_id] += 1
+        for submission, _, _, ai_score in grades:
+            metrics.GRADES.labels(source='ai' if ai_score is not None else 'teacher').inc()
+            self._notify('grade', submission)
+        return [submission for submission, _, _, _ in grades]
+
+    def remove_submission(self, student_id, assignment_id):
+        """Delete a submission (e.g. withdrawn by the student)"""
+        with self.lock:
+            submission = self.submissions.pop((student_id, assignment_id), None)
+            if submission is None:
+                return None
+            self.gradebook.set_submitted(student_id, assignment_id, None)
+            self.gradebook.set_grade(student_id, assignment_id, None)
+            self.epoch += 1
+            assignment = self.assignments.get(assignment_id)
+            self._delete('submissions', (student_id, assignment_id),
+                         assignment.course_id if assignment is not None else None)
+            if submission.grade is not None:
+                self.grade_versions[student_id] += 1
+        self._notify('submission_removed', submission)
+        return submission
+
+    def remove_assignment(self, assignment_id):
+        """Delete an assignment and its submissions"""
+        removed = self.remove_assignments([assignment_id])
+        return removed[0] if removed else None
+
+    def remove_assignments(self, assignment_ids):
+        """Delete many assignments and their submissions in one transaction and one pass"""
+        removed = []
+        with self.lock:
+            for assignment_id in assignment_ids:
+                assignment = self.assignments.pop(assignment_id, None)
+                if assignment is not None:
+                    removed.append(assignment)
+            if not removed:
+                return removed
+            self.epoch += 1
+            courses = {}
+            for assignment in removed:
+                course = self.courses.get(assignment.course_id)
+                if course is not None and assignment.assignment_id in course.assignments:
+                    course.assignments.remove(assignment.assignment_id)
+                    courses[course.course_id] = course
+                self.gradebook.remove_assignment(assignment.assignment_id)
+                self._delete('assignments', assignment.assignment_id, assignment.course_id)
+            for course in courses.values():
+                self._put('courses', course.course_id, _course_record(course))
+            gone = {assignment.assignment_id: assignment.course_id for assignment in removed}
+            for key in [k for k in self.submissions if k[1] in gone]:
+                submission = self.submissions.pop(key)
+                self._delete('submissions', key, gone[key[1]])
+                if submission.grade is not None:
+                    self.grade_versions[key[0]] += 1
+        for assignment in removed:
+            self._notify('assignment_removed', assignment)
+        return removed
+
+    def update_performance(self, student_id, subject, score):
+        """Append a score to a student's performance history"""
+        with self.lock:
+            history = self.student_performance.get(student_id)
+            if history is None:
+                history = self.student_performance[student_id] = PerformanceHistory(window=HISTORY_WINDOW)
+            history.record(subject, score)
+            self.grade_versions[student_id] += 1
+
+    # ------------------------------------------------------------------
+    # Derived results
+    # ------------------------------------------------------------------
+
+    def pending_by_teacher(self):
+        """Number of ungraded submissions per teacher"""
+        snap = self.snapshot()
+        counts = {course.teacher: 0 for course in snap.courses.values()}
+        for sub in snap.submissions.values():
+            if sub.grade is None:
+                assignment = snap.assignments.get(sub.assignment_id)
+                if assignment is not None and assignment.course_id in snap.courses:
+                    counts[snap.courses[assignment.course_id].teacher] += 1
+        return counts
+
+    def grade_version(self, student_id):
+        """Current grade version for a student"""
+        return self.grade_versions.get(student_id, 0)
+
+    def stale_students(self):
+        """Students whose precomputed results are missing or out of date"""
+        with self.lock:
+            return [
+                user_id for user_id, user in self.users.items()
+                if user.role == 'student'
+                and self.precomputed.get(user_id, (None,))[0] != self.grade_version(user_id)
+            ]
+
+    def store_precomputed(self, student_id, version, results):
+        """Save derived results computed at the given grade version"""
+        with self.lock:
+            current = self.precomputed.get(student_id)
+            if current is None or current[0] <= version:
+                self.precomputed[student_id] = (version, results)
+
+    def precomputed_for(self, student_id):
+        """Precomputed results for a student, or None if missing or stale"""
+        entry = self.precomputed.get(student_id)
+        if entry is None or entry[0] != self.grade_version(student_id):
+            metrics.cache_miss('precomputed')
+            return None
+        metrics.cache_hit('precomputed')
+        return entry[1]
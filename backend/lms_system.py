@@ -10,8 +10,20 @@ This module contains all the core functionality for the LMS including:
 
 from datetime import datetime, timedelta
 from collections import defaultdict
+from contextlib import contextmanager
 import random
 
+from lms_rules import LEARNING_PATH_RULES
+from lms_background import BackgroundTask, OFFSCREEN_PLT
+from lms_enrollment import EnrollmentIndex
+from lms_gradebook import Gradebook, grade_bands
+from lms_grading_cache import GradingCache
+from lms_performance import as_history, build_histories
+from lms_store import IdAllocator
+import lms_templates as templates
+from lms_profiling import span, traced
+from lms_metrics import AI_GRADING_SECONDS, RENDER_SECONDS
+
 
 # ============================================================================
 # DATA MODELS
@@ -67,10 +79,15 @@ class Submission:
 # AI ASSISTANT
 # ============================================================================
 
+GRADER_VERSION = 1  # bump when auto_grade_assignment's scoring, rubric or feedback changes
+
+
 class AIAssistant:
     """AI-powered educational features"""
     
     @staticmethod
+    @traced('AIAssistant.auto_grade_assignment')
+    @AI_GRADING_SECONDS.time()
     def auto_grade_assignment(submission_content, assignment_difficulty, student_perf=None):
         """AI-assisted grading with score and feedback"""
         # Simulate AI grading based on content length and quality indicators
@@ -82,16 +99,10 @@ class AIAssistant:
         score = quality_score * difficulty_multipliers.get(assignment_difficulty, 1.0)
         
         # Adjust based on student performance history if available
-        if student_perf and isinstance(student_perf, dict):
-            # Look at average scores to adjust expectations
-            all_scores = []
-            for subject_scores in student_perf.values():
-                if isinstance(subject_scores, list):
-                    all_scores.extend(subject_scores)
-            if all_scores:
-                avg_performance = sum(all_scores) / len(all_scores)
-                # Adjust score slightly based on student's typical performance
-                score = score * 0.9 + avg_performance * 0.1
+        avg_performance = as_history(student_perf).mean()
+        if avg_performance is not None:
+            # Adjust score slightly based on student's typical performance
+            score = score * 0.9 + avg_performance * 0.1
         
         score = min(100, max(0, score))
         
@@ -115,70 +126,31 @@ class AIAssistant:
         return score, feedback, suggestions
     
     @staticmethod
+    def auto_grade_cached(submission_content, assignment_difficulty, student_perf=None):
+        """auto_grade_assignment through the shared grading result cache"""
+        return GRADING_CACHE.grade(submission_content, assignment_difficulty, student_perf)
+    
+    @staticmethod
+    @traced('AIAssistant.personalized_learning_path')
     def personalized_learning_path(student_id, student_performance):
         """Generate personalized learning recommendations"""
-        perf = student_performance.get(student_id, {})
-        strength = perf.get('strength', 'general')
-        weakness = perf.get('weakness', 'general')
-        
-        recommendations = []
-        
-        if weakness == 'math':
-            recommendations.append({
-                'type': 'Practice',
-                'title': 'Math Foundations Workshop',
-                'description': 'Extra practice on fractions and decimals',
-                'priority': 'High'
-            })
-            recommendations.append({
-                'type': 'Resource',
-                'title': 'Khan Academy Math Videos',
-                'description': 'Visual learning for mathematical concepts',
-                'priority': 'Medium'
-            })
-        elif weakness == 'writing':
-            recommendations.append({
-                'type': 'Practice',
-                'title': 'Writing Skills Lab',
-                'description': 'Improve essay structure and grammar',
-                'priority': 'High'
-            })
-        
-        if strength == 'math':
-            recommendations.append({
-                'type': 'Enrichment',
-                'title': 'Advanced Math Challenge',
-                'description': 'Algebra preview and problem-solving',
-                'priority': 'Medium'
-            })
-        elif strength == 'science':
-            recommendations.append({
-                'type': 'Enrichment',
-                'title': 'Science Fair Project',
-                'description': 'Apply scientific method to real research',
-                'priority': 'Medium'
-            })
-        
-        # General recommendation
-        recommendations.append({
-            'type': 'Social',
-            'title': 'Study Group',
-            'description': 'Collaborate with peers on challenging topics',
-            'priority': 'Low'
-        })
-        
-        return recommendations
+        return LEARNING_PATH_RULES.path_for(student_performance.get(student_id, {}))
+    
+    @staticmethod
+    @traced('AIAssistant.personalized_learning_paths')
+    def personalized_learning_paths(student_performance):
+        """Generate learning recommendations for every student in one pass"""
+        return LEARNING_PATH_RULES.paths_for_all(student_performance)
     
     @staticmethod
+    @traced('AIAssistant.intelligent_content_recommendation')
     def intelligent_content_recommendation(student_id, subject, student_performance):
         """Recommend study materials based on performance"""
-        perf = student_performance.get(student_id, {})
-        subject_scores = perf.get(subject.lower(), [])
+        avg_score = as_history(student_performance.get(student_id)).subject_mean(subject.lower())
         
-        if not subject_scores:
+        if avg_score is None:
             difficulty = 'medium'
         else:
-            avg_score = sum(subject_scores) / len(subject_scores)
             if avg_score >= 90:
                 difficulty = 'advanced'
             elif avg_score >= 75:
@@ -217,18 +189,16 @@ class AIAssistant:
         return ['General Study Materials', 'Practice Exercises', 'Review Sessions']
     
     @staticmethod
+    @traced('AIAssistant.predict_student_performance')
     def predict_student_performance(student_id, assignment_difficulty, student_performance):
         """Predict likely performance on upcoming assignment"""
-        perf = student_performance.get(student_id, {})
-        all_scores = []
-        for subject_scores in perf.values():
-            if isinstance(subject_scores, list):
-                all_scores.extend(subject_scores)
+        history = as_history(student_performance.get(student_id))
+        all_scores = history.scores()
         
         if not all_scores:
             return 75, "No historical data available"
         
-        avg_score = sum(all_scores) / len(all_scores)
+        avg_score = history.mean()
         
         # Adjust for difficulty
         difficulty_adjustments = {'easy': 5, 'medium': 0, 'hard': -5}
@@ -247,6 +217,9 @@ class AIAssistant:
         return predicted, confidence
 
 
+GRADING_CACHE = GradingCache(AIAssistant.auto_grade_assignment, GRADER_VERSION)
+
+
 # ============================================================================
 # SAMPLE DATA INITIALIZATION
 # ============================================================================
@@ -314,13 +287,13 @@ def initialize_sample_data():
     submissions[('student2', 'a1')].feedback = "Good effort. Review complex fractions."
 
     # Student performance history (for AI recommendations)
-    student_performance = {
+    student_performance = build_histories({
         'student1': {'math': [88, 92, 95, 90], 'science': [85, 91, 89], 'strength': 'math', 'weakness': 'writing'},
         'student2': {'math': [75, 78, 82, 79], 'science': [88, 85, 90], 'strength': 'science', 'weakness': 'math'},
         'student3': {'math': [92, 94, 96, 93], 'science': [94, 92, 95], 'strength': 'all', 'weakness': 'none'},
         'student4': {'english': [88, 85, 90], 'history': [82, 86, 84], 'strength': 'english', 'weakness': 'dates'},
         'student5': {'english': [94, 96, 95], 'history': [90, 92, 91], 'strength': 'all', 'weakness': 'none'},
-    }
+    })
     
     return users, courses, assignments, submissions, student_performance
 
@@ -329,616 +302,816 @@ def initialize_sample_data():
 # DASHBOARD RENDERING FUNCTIONS
 # ============================================================================
 
-def render_teacher_dashboard(current_user, users, courses, assignments, submissions, ai_assistant, student_performance, widgets, HTML, plt, clear_output, display, show_teacher_dashboard, logout):
-    """Render the complete teacher dashboard with all tabs"""
-    from IPython.display import display as ipydisplay, HTML as ipyHTML, clear_output as ipyclear
-    
+@contextmanager
+def _instrumented(name):
+    """Profiling span and render-latency metric for one dashboard section"""
+    with span(name), RENDER_SECONDS.labels(view=name).time():
+        yield
+
+
+def _compose(widgets, parts):
+    """Stack HTML fragments and widgets, merging adjacent fragments into one HTML widget"""
+    children = []
+    pending = []
+    for part in parts:
+        if isinstance(part, str):
+            pending.append(part)
+            continue
+        if pending:
+            children.append(widgets.HTML(templates.join(pending)))
+            pending = []
+        children.append(part)
+    if pending:
+        children.append(widgets.HTML(templates.join(pending)))
+    return widgets.VBox(children)
+
+
+_ASSIGNMENT_IDS = {}  # id(assignments) -> (assignments, IdAllocator) for dashboards without a store
+
+
+def _assignment_allocator(assignments):
+    """The IdAllocator for an assignments dict, kept across re-renders so deleted IDs stay retired"""
+    entry = _ASSIGNMENT_IDS.get(id(assignments))
+    if entry is None or entry[0] is not assignments:
+        entry = _ASSIGNMENT_IDS[id(assignments)] = (assignments, IdAllocator('a', assignments))
+    return entry[1]
+
+
+# ----------------------------------------------------------------------------
+# Teacher dashboard fragments
+# ----------------------------------------------------------------------------
+
+def _teacher_course_card_html(course):
+    """Course summary card for the teacher's My Courses tab"""
+    return templates.TEACHER_COURSE_CARD.render(
+        name=course.name,
+        subject=course.subject,
+        grade_level=course.grade_level,
+        student_count=len(course.students),
+        assignment_count=len(course.assignments)
+    )
+
+
+def _pending_card_html(assignment, sub, student):
+    """Card for a submission waiting to be graded"""
+    return templates.PENDING_SUBMISSION_CARD.render(
+        title=assignment.title,
+        student=student.name,
+        submitted=sub.submitted_date.strftime('%Y-%m-%d %H:%M'),
+        content=sub.content
+    )
+
+
+def _graded_card_html(assignment, sub, student):
+    """Card for a submission that has just been graded"""
+    return templates.GRADED_SUBMISSION_CARD.render(
+        title=assignment.title,
+        student=student.name,
+        grade=sub.grade,
+        points=assignment.points,
+        feedback=sub.feedback
+    )
+
+
+@traced('fragment.analytics')
+def analytics_html(course_ids, course_name, gradebook, plt):
+    """Performance summary and grade distribution chart for a set of courses"""
+    with span('scan.course_grades'):
+        scores = gradebook.course_grades(course_ids)
+
+    if not len(scores):
+        return templates.PARAGRAPH.render(text=f'No graded assignments yet for {course_name}.')
+
+    summary = templates.ANALYTICS_SUMMARY.render(
+        course_name=course_name,
+        avg_score=f'{scores.mean():.1f}',
+        count=len(scores),
+        max_score=f'{scores.max():g}',
+        min_score=f'{scores.min():g}'
+    )
+
+    # Grade distribution chart
+    fig, ax = plt.subplots(figsize=(8, 4))
+    score_ranges = ['0-60', '60-70', '70-80', '80-90', '90-100']
+    counts = grade_bands(scores)
+
+    colors = ['#ef4444', '#f59e0b', '#eab308', '#84cc16', '#10b981']
+    ax.bar(score_ranges, counts, color=colors)
+    ax.set_xlabel('Score Range')
+    ax.set_ylabel('Number of Students')
+    ax.set_title(f'Grade Distribution - {course_name}')
+    fig.tight_layout()
+
+    return templates.join([summary, templates.figure_to_html(fig, plt)])
+
+
+@traced('render.teacher_dashboard')
+@RENDER_SECONDS.labels(view='render.teacher_dashboard').time()
+def render_teacher_dashboard(current_user, users, courses, assignments, submissions, ai_assistant, student_performance, widgets, HTML, plt, clear_output, display, show_teacher_dashboard, logout, store=None, tree=None):
+    """Render the complete teacher dashboard with all tabs
+
+    When a store and a WidgetTree are given, the dashboard subscribes to
+    store changes and updates the affected widgets in place.
+    """
+
     clear_output()
-    
-    # Header
-    display(HTML(f"""
-    <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                padding: 20px; border-radius: 10px; color: white; margin-bottom: 20px;'>
-        <h2>👨‍🏫 Teacher Dashboard - Welcome, {current_user.name}!</h2>
-        <p style='margin: 5px 0;'>Manage your courses, grade assignments, and track student progress</p>
-    </div>
-    """))
-    
+
+    # Each tab is rendered into a single HTML document (plus its interactive
+    # widgets) and the whole dashboard is sent with one display() call
+    header = templates.TEACHER_HEADER.render(name=current_user.name)
+    enrollment = store.enrollment if store is not None else EnrollmentIndex(users, courses)
+    teacher_courses = [courses[cid] for cid in enrollment.teacher_courses(current_user.user_id)]
+    teacher_course_ids = {c.course_id for c in teacher_courses}
+    gradebook = store.gradebook if store is not None else Gradebook.from_data(users, courses, assignments, submissions)
+    assignment_ids = store.assignment_ids if store is not None else _assignment_allocator(assignments)
+    live = store is not None and tree is not None
+
     # Navigation tabs
     tab_contents = []
-    
+
     # Tab 1: My Courses
-    courses_output = widgets.Output()
-    with courses_output:
-        display(HTML("<h3>📚 My Courses</h3>"))
-        teacher_courses = [c for c in courses.values() if c.teacher == current_user.name]
-        
-        for course in teacher_courses:
-            student_count = len(course.students)
-            assignment_count = len(course.assignments)
-            
-            display(HTML(f"""
-            <div style='border: 2px solid #667eea; border-radius: 8px; padding: 15px; 
-                        margin: 10px 0; background-color: #f8f9ff;'>
-                <h4 style='color: #667eea; margin-top: 0;'>{course.name}</h4>
-                <p><strong>Subject:</strong> {course.subject} | <strong>Grade:</strong> {course.grade_level}</p>
-                <p>👥 {student_count} students | 📝 {assignment_count} assignments</p>
-            </div>
-            """))
-    
-    tab_contents.append(courses_output)
-    
+    with _instrumented('tab.teacher.courses'):
+        course_cards = {c.course_id: widgets.HTML(_teacher_course_card_html(c)) for c in teacher_courses}
+        tab_contents.append(_compose(widgets, [templates.HEADING.render(text='📚 My Courses')] + list(course_cards.values())))
+
     # Tab 2: Grade Assignments
-    grading_output = widgets.Output()
-    with grading_output:
-        display(HTML("<h3>📝 Grade Assignments</h3>"))
-        
-        # Get submissions needing grading
-        teacher_courses = [c for c in courses.values() if c.teacher == current_user.name]
-        pending_submissions = []
-        
-        for course in teacher_courses:
-            for assign_id in course.assignments:
-                assignment = assignments[assign_id]
-                for key, sub in submissions.items():
-                    if sub.assignment_id == assign_id and sub.grade is None:
-                        pending_submissions.append((assignment, sub, users[sub.student_id]))
-        
-        if pending_submissions:
-            for assignment, sub, student in pending_submissions:
-                # Create a container for this submission
-                submission_output = widgets.Output()
-                
-                with submission_output:
-                    display(HTML(f"""
-                    <div style='border: 2px solid #f59e0b; border-radius: 8px; padding: 15px;
-                                margin: 10px 0; background-color: #fffbeb;'>
-                        <h4 style='color: #f59e0b; margin-top: 0;'>{assignment.title}</h4>
-                        <p><strong>Student:</strong> {student.name} | <strong>Submitted:</strong> {sub.submitted_date.strftime('%Y-%m-%d %H:%M')}</p>
-                        <p><strong>Content:</strong> {sub.content}</p>
-                    </div>
-                    """))
-                
-                # AI grading button
-                def make_grade_callback(sub, assignment, student, submission_output):
-                    def grade_with_ai(b):
-                        score, feedback, suggestions = ai_assistant.auto_grade_assignment(
-                            sub.content, assignment.difficulty, student_performance.get(sub.student_id, {})
-                        )
-                        sub.grade = round(score)
-                        sub.ai_score = round(score)
-                        sub.feedback = feedback + " Suggestions: " + "; ".join(suggestions)
-                        
-                        with submission_output:
-                            clear_output()
-                            display(HTML(f"""
-                            <div style='border: 2px solid #10b981; border-radius: 8px; padding: 15px;
-                                        margin: 10px 0; background-color: #d1fae5;'>
-                                <h4 style='color: #10b981; margin-top: 0;'>✅ {assignment.title} - GRADED!</h4>
-                                <p><strong>Student:</strong> {student.name}</p>
-                                <p><strong>Score:</strong> {sub.grade}/{assignment.points} ({sub.grade}%)</p>
-                                <p><strong>Feedback:</strong> {sub.feedback}</p>
-                            </div>
-                            """))
-                    return grade_with_ai
-                
-                grade_btn = widgets.Button(
-                    description='🤖 AI Grade',
-                    button_style='info',
-                    tooltip='Use AI to grade this submission'
+    with _instrumented('tab.teacher.grading'):
+        grading_box = widgets.VBox()
+        all_graded = widgets.HTML(templates.ALL_GRADED.render())
+        pending_widgets = {}  # (student_id, assignment_id) -> (card, button)
+
+        def make_grade_callback(sub, assignment, student, card):
+            def grade_with_ai(b):
+                score, feedback, suggestions = ai_assistant.auto_grade_cached(
+                    sub.content, assignment.difficulty, student_performance.get(sub.student_id, {})
                 )
-                grade_btn.on_click(make_grade_callback(sub, assignment, student, submission_output))
-                
-                display(submission_output)
-                display(grade_btn)
-        else:
-            display(HTML("<p style='color: #10b981;'>✅ All submissions graded!</p>"))
-    
-    tab_contents.append(grading_output)
-    
+                full_feedback = feedback + " Suggestions: " + "; ".join(suggestions)
+                if store is not None:
+                    store.record_grade(sub, round(score), full_feedback, ai_score=round(score))
+                else:
+                    sub.grade = round(score)
+                    sub.ai_score = round(score)
+                    sub.feedback = full_feedback
+                    gradebook.set_grade(sub.student_id, sub.assignment_id, sub.grade)
+
+                card.value = _graded_card_html(assignment, sub, student)
+            return grade_with_ai
+
+        def pending_item(assignment, sub):
+            student = users[sub.student_id]
+            # Each submission card is updated in place once graded
+            card = widgets.HTML(_pending_card_html(assignment, sub, student))
+
+            # AI grading button
+            grade_btn = widgets.Button(
+                description='🤖 AI Grade',
+                button_style='info',
+                tooltip='Use AI to grade this submission'
+            )
+            grade_btn.on_click(make_grade_callback(sub, assignment, student, card))
+
+            pending_widgets[(sub.student_id, sub.assignment_id)] = (card, grade_btn)
+            return [card, grade_btn]
+
+        # Get submissions needing grading
+        with span('scan.pending_submissions'):
+            # One pass over the submissions (a snapshot when there is a store), grouped by assignment
+            by_assignment = {aid: [] for course in teacher_courses for aid in course.assignments}
+            records = store.snapshot().submissions if store is not None else submissions
+            for key, record in records.items():
+                if record.grade is None and key[1] in by_assignment:
+                    sub = submissions.get(key)
+                    if sub is not None and sub.grade is None:
+                        by_assignment[key[1]].append(sub)
+            pending = [(assignments[aid], sub) for aid, subs in by_assignment.items() for sub in subs]
+
+        pending_items = []
+        for assignment, sub in pending:
+            pending_items.extend(pending_item(assignment, sub))
+
+        grading_box.children = pending_items if pending_items else [all_graded]
+        tab_contents.append(_compose(widgets, [templates.HEADING.render(text='📝 Grade Assignments'), grading_box]))
+
     # Tab 3: Create Assignment
-    create_output = widgets.Output()
-    with create_output:
-        display(HTML("<h3>➕ Create New Assignment</h3>"))
-        
-        teacher_courses = [c for c in courses.values() if c.teacher == current_user.name]
+    with _instrumented('tab.teacher.create'):
         course_options = [(c.name, c.course_id) for c in teacher_courses]
-        
-        course_dropdown = widgets.Dropdown(
+
+        course_select = widgets.SelectMultiple(
             options=course_options,
-            description='Course:',
+            value=[course_options[0][1]] if course_options else [],
+            description='Courses:',
+            rows=min(len(course_options), 6) or 1,
             style={'description_width': '120px'}
         )
-        
+
         title_input = widgets.Text(
             description='Title:',
             placeholder='Enter assignment title',
             style={'description_width': '120px'}
         )
-        
+
         desc_input = widgets.Textarea(
             description='Description:',
             placeholder='Enter assignment description',
             style={'description_width': '120px'},
             rows=3
         )
-        
+
         points_input = widgets.IntText(
             value=100,
             description='Points:',
             style={'description_width': '120px'}
         )
-        
+
         difficulty_dropdown = widgets.Dropdown(
             options=['easy', 'medium', 'hard'],
             value='medium',
             description='Difficulty:',
             style={'description_width': '120px'}
         )
-        
+
         days_input = widgets.IntText(
             value=7,
             description='Due in (days):',
             style={'description_width': '120px'}
         )
-        
+
+        create_output = widgets.Output()
+
         def create_assignment(b):
-            new_id = f'a{len(assignments) + 1}'
-            new_assignment = Assignment(
-                new_id,
-                course_dropdown.value,
-                title_input.value,
-                desc_input.value,
-                datetime.now() + timedelta(days=days_input.value),
-                points_input.value,
-                difficulty_dropdown.value
-            )
-            assignments[new_id] = new_assignment
-            courses[course_dropdown.value].assignments.append(new_id)
-            
+            selected = list(course_select.value)
+            if not selected:
+                return
+            due_date = datetime.now() + timedelta(days=days_input.value)
+            if store is not None:
+                store.publish_assignments(selected, title_input.value, desc_input.value, due_date,
+                                          points_input.value, difficulty_dropdown.value)
+            else:
+                new_ids = assignment_ids.reserve(len(selected))
+                for new_id, course_id in zip(new_ids, selected):
+                    assignments[new_id] = Assignment(new_id, course_id, title_input.value, desc_input.value,
+                                                     due_date, points_input.value, difficulty_dropdown.value)
+                    courses[course_id].assignments.append(new_id)
+
             with create_output:
                 clear_output()
-                display(HTML(f"""
-                <div style='background-color: #d1fae5; border: 2px solid #10b981;
-                            border-radius: 8px; padding: 15px;'>
-                    <h4 style='color: #10b981;'>✅ Assignment Created!</h4>
-                    <p><strong>{title_input.value}</strong> has been added to {courses[course_dropdown.value].name}</p>
-                </div>
-                """))
-                show_teacher_dashboard()
-        
+                display(HTML(templates.SUCCESS_BANNER.render(
+                    title='✅ Assignment Created!',
+                    message=f"{title_input.value} has been added to {', '.join(courses[c].name for c in selected)}"
+                )))
+                if not live:
+                    show_teacher_dashboard()
+
         create_btn = widgets.Button(
             description='Create Assignment',
             button_style='success',
             icon='check'
         )
         create_btn.on_click(create_assignment)
-        
-        display(widgets.VBox([
-            course_dropdown, title_input, desc_input,
-            points_input, difficulty_dropdown, days_input,
-            create_btn
+
+        tab_contents.append(_compose(widgets, [
+            templates.HEADING.render(text='➕ Create New Assignment'),
+            widgets.VBox([
+                course_select, title_input, desc_input,
+                points_input, difficulty_dropdown, days_input,
+                create_btn
+            ]),
+            create_output
         ]))
-    
-    tab_contents.append(create_output)
-    
+
     # Tab 4: Analytics
-    analytics_output = widgets.Output()
-    with analytics_output:
-        display(HTML("<h3>📊 Class Analytics</h3>"))
-        
-        # Get all graded submissions for teacher's courses
-        teacher_courses = [c for c in courses.values() if c.teacher == current_user.name]
-        
-        # Course selector
-        course_options = [('All Courses', 'all')] + [(c.name, c.course_id) for c in teacher_courses]
-        course_dropdown = widgets.Dropdown(
-            options=course_options,
+    with _instrumented('tab.teacher.analytics'):
+        analytics_options = [('All Courses', 'all')] + [(c.name, c.course_id) for c in teacher_courses]
+        analytics_dropdown = widgets.Dropdown(
+            options=analytics_options,
             description='Course:',
             style={'description_width': 'initial'}
         )
-        
-        analytics_content = widgets.Output()
-        
+
+        analytics_content = widgets.HTML()
+
+        def selected_courses(selected_course):
+            if selected_course == 'all':
+                return teacher_course_ids, "All Courses"
+            return {selected_course}, courses[selected_course].name
+
+        # Statistics and the chart are computed on a background thread; rapid
+        # dropdown changes are debounced and only the latest selection is shown
+        def compute_analytics(selected_course):
+            course_ids, course_name = selected_courses(selected_course)
+            return analytics_html(course_ids, course_name, gradebook, OFFSCREEN_PLT)
+
+        def show_analytics(selected_course, html):
+            if selected_course == analytics_dropdown.value:
+                analytics_content.value = html
+
+        analytics = BackgroundTask(compute_analytics, show_analytics, name=f'lms-analytics-{current_user.user_id}')
+        if tree is not None:
+            tree.on_close(analytics.close)
+
         def update_analytics(change):
-            with analytics_content:
-                clear_output()
-                
-                selected_course = change['new']
-                
-                # Filter submissions by course
-                if selected_course == 'all':
-                    course_ids = [c.course_id for c in teacher_courses]
-                    course_name = "All Courses"
-                else:
-                    course_ids = [selected_course]
-                    course_name = courses[selected_course].name
-                
-                graded_submissions = []
-                for key, sub in submissions.items():
-                    if sub.grade is not None:
-                        assignment = assignments.get(sub.assignment_id)
-                        if assignment and assignment.course_id in course_ids:
-                            graded_submissions.append(sub)
-                
-                if graded_submissions:
-                    scores = [sub.grade for sub in graded_submissions]
-                    avg_score = sum(scores) / len(scores)
-                    
-                    display(HTML(f"""
-                    <div style='background-color: #e0e7ff; border: 2px solid #667eea;
-                                border-radius: 8px; padding: 15px; margin: 10px 0;'>
-                        <h4 style='color: #667eea;'>{course_name} - Performance Summary</h4>
-                        <p><strong>Average Score:</strong> {avg_score:.1f}%</p>
-                        <p><strong>Total Graded Submissions:</strong> {len(graded_submissions)}</p>
-                        <p><strong>Highest Score:</strong> {max(scores)}% | <strong>Lowest Score:</strong> {min(scores)}%</p>
-                    </div>
-                    """))
-                    
-                    # Grade distribution chart
-                    fig, ax = plt.subplots(figsize=(8, 4))
-                    score_ranges = ['0-60', '60-70', '70-80', '80-90', '90-100']
-                    counts = [
-                        sum(1 for s in scores if s < 60),
-                        sum(1 for s in scores if 60 <= s < 70),
-                        sum(1 for s in scores if 70 <= s < 80),
-                        sum(1 for s in scores if 80 <= s < 90),
-                        sum(1 for s in scores if s >= 90)
-                    ]
-                    
-                    colors = ['#ef4444', '#f59e0b', '#eab308', '#84cc16', '#10b981']
-                    ax.bar(score_ranges, counts, color=colors)
-                    ax.set_xlabel('Score Range')
-                    ax.set_ylabel('Number of Students')
-                    ax.set_title(f'Grade Distribution - {course_name}')
-                    plt.tight_layout()
-                    plt.show()
-                else:
-                    display(HTML(f"<p>No graded assignments yet for {course_name}.</p>"))
-        
-        course_dropdown.observe(update_analytics, names='value')
-        display(course_dropdown)
-        display(analytics_content)
-        
+            cached = analytics.request(change['new'])
+            analytics_content.value = cached if cached is not None else templates.PARAGRAPH.render(text='⏳ Computing analytics…')
+
+        analytics_dropdown.observe(update_analytics, names='value')
+
         # Initialize with default selection
         update_analytics({'new': 'all'})
-    
-    tab_contents.append(analytics_output)
-    
+
+        tab_contents.append(_compose(widgets, [
+            templates.HEADING.render(text='📊 Class Analytics'),
+            analytics_dropdown,
+            analytics_content
+        ]))
+
+    # Keep the tree current as submissions, grades and assignments arrive
+    if live:
+        def on_change(event, obj):
+            if event == 'assignment' and obj.course_id in course_cards:
+                course_cards[obj.course_id].value = _teacher_course_card_html(courses[obj.course_id])
+                return
+
+            if event not in ('submission', 'grade'):
+                return
+            assignment = assignments.get(obj.assignment_id)
+            if assignment is None or assignment.course_id not in teacher_course_ids:
+                return
+            key = (obj.student_id, obj.assignment_id)
+
+            if event == 'submission' and obj.grade is None:
+                children = [w for w in grading_box.children if w is not all_graded]
+                if key in pending_widgets:
+                    card, grade_btn = pending_widgets.pop(key)
+                    children = [w for w in children if w is not card and w is not grade_btn]
+                grading_box.children = children + pending_item(assignment, obj)
+            elif event == 'grade' and key in pending_widgets:
+                card, grade_btn = pending_widgets[key]
+                card.value = _graded_card_html(assignment, obj, users[obj.student_id])
+                grade_btn.disabled = True
+
+            if event == 'grade':
+                analytics.invalidate(['all', assignment.course_id])
+                course_ids, _ = selected_courses(analytics_dropdown.value)
+                if assignment.course_id in course_ids:
+                    update_analytics({'new': analytics_dropdown.value})
+
+        tree.on_change(on_change)
+
     # Create tabs
     tabs = widgets.Tab(children=tab_contents)
     tabs.set_title(0, '📚 My Courses')
     tabs.set_title(1, '📝 Grade Assignments')
     tabs.set_title(2, '➕ Create Assignment')
     tabs.set_title(3, '📊 Analytics')
-    
+
     # Logout button
     logout_btn = widgets.Button(description='Logout', button_style='danger', icon='sign-out')
     logout_btn.on_click(lambda b: logout())
-    
-    display(widgets.VBox([tabs, logout_btn]))
 
+    root = widgets.VBox([widgets.HTML(header), tabs, logout_btn])
+    if tree is not None:
+        tree.root = root
+    display(root)
+    return root
+
+
+# ----------------------------------------------------------------------------
+# Student dashboard fragments
+# ----------------------------------------------------------------------------
+
+def assignment_row_html(assignment, submission, now):
+    """Assignment row with its submission status for the student's My Courses tab"""
+    if submission:
+        if submission.grade is not None:
+            status = templates.STATUS.render(color='#10b981', text=f'✅ Graded: {submission.grade}%')
+            status_color = '#d1fae5'
+            border_color = '#10b981'
+        else:
+            status = templates.STATUS.render(color='#f59e0b', text='⏳ Submitted - Pending Grade')
+            status_color = '#fffbeb'
+            border_color = '#f59e0b'
+    else:
+        days_until_due = (assignment.due_date - now).days
+        if days_until_due < 0:
+            status = templates.STATUS.render(color='#ef4444', text='❌ Overdue')
+            status_color = '#fee2e2'
+            border_color = '#ef4444'
+        elif days_until_due <= 2:
+            status = templates.STATUS.render(color='#f59e0b', text=f'⚠️ Due in {days_until_due} days')
+            status_color = '#fffbeb'
+            border_color = '#f59e0b'
+        else:
+            status = templates.STATUS.render(color='#3b82f6', text=f'📝 Not submitted ({days_until_due} days left)')
+            status_color = '#eff6ff'
+            border_color = '#3b82f6'
+
+    return templates.ASSIGNMENT_ROW.render(
+        border_color=border_color,
+        status_color=status_color,
+        title=assignment.title,
+        description=assignment.description,
+        due=assignment.due_date.strftime('%Y-%m-%d'),
+        points=assignment.points,
+        difficulty=assignment.difficulty,
+        status=status
+    )
+
+
+@traced('fragment.student_progress')
+def _student_graded(student_id, assignments, submissions):
+    """The student's graded work as {assignment_id: (assignment, submission)}"""
+    with span('scan.student_submissions'):
+        graded = {}
+        for (sid, aid), s in submissions.items():
+            if sid == student_id and s.grade is not None:
+                assignment = assignments.get(aid)
+                if assignment:
+                    graded[aid] = (assignment, s)
+    return graded
+
+
+def _progress_summary_html(graded):
+    """Heading and overall performance of the Progress tab"""
+    parts = [templates.HEADING.render(text='📈 My Progress')]
+    if not graded:
+        parts.append(templates.PARAGRAPH.render(text='Complete and get graded on assignments to see your progress!'))
+        return templates.join(parts)
+
+    scores = [sub.grade for _, sub in graded.values()]
+    parts.append(templates.PROGRESS_SUMMARY.render(
+        avg_score=f'{sum(scores) / len(scores):.1f}',
+        count=len(scores),
+        best_score=max(scores),
+        recent_score=scores[-1]
+    ))
+    return templates.join(parts)
+
+
+def _progress_chart_html(scores, plt):
+    """Grade progression chart (empty with fewer than two grades)"""
+    if len(scores) < 2:
+        return templates.join([])
+    avg_score = sum(scores) / len(scores)
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.plot(range(1, len(scores) + 1), scores, marker='o', linewidth=2,
+           markersize=8, color='#3b82f6')
+    ax.axhline(y=avg_score, color='#10b981', linestyle='--', label=f'Average ({avg_score:.1f}%)')
+    ax.set_xlabel('Assignment Number')
+    ax.set_ylabel('Score (%)')
+    ax.set_title('Your Grade Progression')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return templates.figure_to_html(fig, plt)
+
+
+def _course_average_html(course_name, scores):
+    return templates.COURSE_AVERAGE.render(
+        course_name=course_name,
+        course_avg=f'{sum(scores) / len(scores):.1f}',
+        count=len(scores)
+    )
+
+
+def student_progress_html(student_id, courses, assignments, submissions, plt, defaultdict):
+    """The student's Progress tab as one HTML document"""
+    graded = _student_graded(student_id, assignments, submissions)
+    if not graded:
+        return _progress_summary_html(graded)
+
+    parts = [
+        _progress_summary_html(graded),
+        _progress_chart_html([sub.grade for _, sub in graded.values()], plt),
+        templates.SUBHEADING.render(text='📊 Performance by Course'),
+    ]
+
+    # Course breakdown
+    course_scores = defaultdict(list)
+    for assignment, sub in graded.values():
+        course_scores[courses[assignment.course_id].name].append(sub.grade)
+    for course_name, scores_list in course_scores.items():
+        parts.append(_course_average_html(course_name, scores_list))
+
+    return templates.join(parts)
+
+
+@traced('fragment.student_ai')
+def student_ai_html(student_id, student_courses, ai_assistant, student_performance, precomputed):
+    """The student's AI Recommendations tab as one HTML document"""
+    parts = [templates.HEADING.render(text='🤖 Personalized Learning Recommendations')]
+
+    # Get AI recommendations
+    if precomputed is not None:
+        recommendations = precomputed['learning_path']
+    else:
+        recommendations = ai_assistant.personalized_learning_path(student_id, student_performance)
+
+    parts.append(templates.LEARNING_PATH_INTRO.render())
+
+    priority_colors = {
+        'High': '#ef4444',
+        'Medium': '#f59e0b',
+        'Low': '#3b82f6'
+    }
+
+    for rec in recommendations:
+        parts.append(templates.RECOMMENDATION.render(
+            color=priority_colors.get(rec['priority'], '#3b82f6'),
+            type=rec['type'],
+            title=rec['title'],
+            priority=rec['priority'],
+            description=rec['description']
+        ))
+
+    # Content recommendations for each course
+    parts.append(templates.SUBHEADING.render(text='📚 Recommended Study Materials'))
+    for course in student_courses:
+        if precomputed is not None and course.course_id in precomputed['materials']:
+            materials = precomputed['materials'][course.course_id]
+        else:
+            materials = ai_assistant.intelligent_content_recommendation(
+                student_id, course.subject, student_performance
+            )
+
+        parts.append(templates.MATERIALS.render(
+            course_name=course.name,
+            items=templates.join(templates.LIST_ITEM.render(text=material) for material in materials)
+        ))
+
+    return templates.join(parts)
+
+
+@traced('fragment.student_upcoming')
+def student_upcoming_html(student_id, student_courses, assignments, submissions, ai_assistant, student_performance, precomputed, now):
+    """The student's Upcoming tab as one HTML document"""
+    parts = [templates.HEADING.render(text='📅 Upcoming Assignments')]
+
+    # Get all unsubmitted assignments
+    upcoming = []
+    for course in student_courses:
+        for assign_id in course.assignments:
+            assignment = assignments[assign_id]
+            submission_key = (student_id, assign_id)
+            if submission_key not in submissions:
+                days_left = (assignment.due_date - now).days
+                upcoming.append((assignment, course, days_left))
+
+    # Sort by due date
+    upcoming.sort(key=lambda x: x[2])
+
+    if not upcoming:
+        parts.append(templates.ALL_CAUGHT_UP.render())
+        return templates.join(parts)
+
+    for assignment, course, days_left in upcoming:
+        # AI prediction
+        if precomputed is not None and assignment.assignment_id in precomputed['predictions']:
+            predicted_score, confidence = precomputed['predictions'][assignment.assignment_id]
+        else:
+            predicted_score, confidence = ai_assistant.predict_student_performance(
+                student_id, assignment.difficulty, student_performance
+            )
+
+        parts.append(templates.UPCOMING_CARD.render(
+            color='#ef4444' if days_left < 0 else '#f59e0b' if days_left <= 2 else '#10b981',
+            title=assignment.title,
+            course_name=course.name,
+            due=assignment.due_date.strftime('%Y-%m-%d'),
+            days_left=days_left,
+            when='overdue' if days_left < 0 else 'left',
+            difficulty=assignment.difficulty,
+            points=assignment.points,
+            confidence=confidence
+        ))
+
+    return templates.join(parts)
+
+
+@traced('render.student_dashboard')
+@RENDER_SECONDS.labels(view='render.student_dashboard').time()
+def render_student_dashboard(current_user, users, courses, assignments, submissions, ai_assistant, student_performance, widgets, HTML, plt, defaultdict, clear_output, display, show_student_dashboard, logout, datetime, store=None, tree=None):
+    """Render the complete student dashboard with all tabs
+
+    When a store and a WidgetTree are given, the dashboard subscribes to
+    store changes and updates the affected widgets in place.
+    """
 
-def render_student_dashboard(current_user, users, courses, assignments, submissions, ai_assistant, student_performance, widgets, HTML, plt, defaultdict, clear_output, display, show_student_dashboard, logout, datetime):
-    """Render the complete student dashboard with all tabs"""
-    
     clear_output()
-    
-    # Header
-    display(HTML(f"""
-    <div style='background: linear-gradient(135deg, #06b6d4 0%, #3b82f6 100%);
-                padding: 20px; border-radius: 10px; color: white; margin-bottom: 20px;'>
-        <h2>👨‍🎓 Student Dashboard - Welcome, {current_user.name}!</h2>
-        <p style='margin: 5px 0;'>Grade {current_user.grade_level} | View courses, submit assignments, and track your progress</p>
-    </div>
-    """))
-    
+
+    student_id = current_user.user_id
+    live = store is not None and tree is not None
+
+    def current_precomputed():
+        # Results from the nightly precompute job, if still current
+        return store.precomputed_for(student_id) if store is not None else None
+
+    header = templates.STUDENT_HEADER.render(name=current_user.name, grade_level=current_user.grade_level)
+
     # Get student's courses
-    student_courses = [c for c in courses.values() if current_user.user_id in c.students]
-    
+    enrollment = store.enrollment if store is not None else EnrollmentIndex(users, courses)
+    student_courses = [courses[cid] for cid in enrollment.student_courses(student_id)]
+
     # Navigation tabs
     tab_contents = []
-    
+
     # Tab 1: My Courses & Assignments
-    courses_output = widgets.Output()
-    with courses_output:
-        display(HTML("<h3>📚 My Courses & Assignments</h3>"))
-        
+    with _instrumented('tab.student.courses'):
+        assignment_widgets = {}  # assignment_id -> (row, extra)
+
+        def make_submit_callback(aid, title, text_widget, extra):
+            def submit_assignment(b):
+                if text_widget.value.strip():
+                    new_submission = Submission(
+                        student_id,
+                        aid,
+                        text_widget.value,
+                        datetime.now()
+                    )
+                    if store is not None:
+                        store.add_submission(new_submission)
+                    else:
+                        submissions[(student_id, aid)] = new_submission
+
+                    extra.children = [widgets.HTML(templates.SUCCESS_BANNER.render(
+                        title='✅ Assignment Submitted!',
+                        message=f'{title} submitted successfully! Your teacher will grade it soon.'
+                    ))]
+            return submit_assignment
+
+        def extra_children(assignment, submission, extra):
+            # Show submission form if not submitted
+            if not submission:
+                submission_text = widgets.Textarea(
+                    placeholder=f'Enter your work for {assignment.title}...',
+                    layout=widgets.Layout(width='80%', height='80px')
+                )
+
+                submit_btn = widgets.Button(
+                    description='✅ Submit Assignment',
+                    button_style='success',
+                    icon='check'
+                )
+                submit_btn.on_click(make_submit_callback(assignment.assignment_id, assignment.title, submission_text, extra))
+                return [submission_text, submit_btn]
+
+            # Show feedback if graded
+            if submission.grade is not None:
+                return [widgets.HTML(templates.FEEDBACK.render(feedback=submission.feedback))]
+            return []
+
+        def assignment_item(assignment):
+            submission = submissions.get((student_id, assignment.assignment_id))
+            row = widgets.HTML(assignment_row_html(assignment, submission, datetime.now()))
+            extra = widgets.VBox()
+            extra.children = extra_children(assignment, submission, extra)
+            assignment_widgets[assignment.assignment_id] = (row, extra)
+            return [row, extra]
+
+        course_boxes = {}
         for course in student_courses:
-            display(HTML(f"""
-            <div style='border: 2px solid #06b6d4; border-radius: 8px; padding: 15px;
-                        margin: 10px 0; background-color: #ecfeff;'>
-                <h4 style='color: #06b6d4; margin-top: 0;'>{course.name}</h4>
-                <p><strong>Teacher:</strong> {course.teacher} | <strong>Subject:</strong> {course.subject}</p>
-            </div>
-            """))
-            
+            items = [widgets.HTML(templates.STUDENT_COURSE_CARD.render(
+                name=course.name, teacher=course.teacher, subject=course.subject
+            ))]
+
             # Show assignments for this course
             for assign_id in course.assignments:
-                assignment = assignments[assign_id]
-                
-                # Check submission status
-                submission_key = (current_user.user_id, assign_id)
-                submission = submissions.get(submission_key)
-                
-                if submission:
-                    if submission.grade is not None:
-                        status_html = f"<span style='color: #10b981;'>✅ Graded: {submission.grade}%</span>"
-                        status_color = '#d1fae5'
-                        border_color = '#10b981'
-                    else:
-                        status_html = "<span style='color: #f59e0b;'>⏳ Submitted - Pending Grade</span>"
-                        status_color = '#fffbeb'
-                        border_color = '#f59e0b'
-                else:
-                    days_until_due = (assignment.due_date - datetime.now()).days
-                    if days_until_due < 0:
-                        status_html = "<span style='color: #ef4444;'>❌ Overdue</span>"
-                        status_color = '#fee2e2'
-                        border_color = '#ef4444'
-                    elif days_until_due <= 2:
-                        status_html = f"<span style='color: #f59e0b;'>⚠️ Due in {days_until_due} days</span>"
-                        status_color = '#fffbeb'
-                        border_color = '#f59e0b'
-                    else:
-                        status_html = f"<span style='color: #3b82f6;'>📝 Not submitted ({days_until_due} days left)</span>"
-                        status_color = '#eff6ff'
-                        border_color = '#3b82f6'
-                
-                display(HTML(f"""
-                <div style='border-left: 4px solid {border_color}; padding: 10px; margin: 8px 0 8px 20px;
-                            background-color: {status_color};'>
-                    <p style='margin: 5px 0;'><strong>{assignment.title}</strong></p>
-                    <p style='margin: 5px 0; font-size: 0.9em;'>{assignment.description}</p>
-                    <p style='margin: 5px 0; font-size: 0.9em;'>
-                        <strong>Due:</strong> {assignment.due_date.strftime('%Y-%m-%d')} |
-                        <strong>Points:</strong> {assignment.points} |
-                        <strong>Difficulty:</strong> {assignment.difficulty}
-                    </p>
-                    <p style='margin: 5px 0;'>{status_html}</p>
-                </div>
-                """))
-                
-                # Show submission form if not submitted
-                if not submission:
-                    submission_area = widgets.Output()
-                    
-                    with submission_area:
-                        submission_text = widgets.Textarea(
-                            placeholder=f'Enter your work for {assignment.title}...',
-                            layout=widgets.Layout(width='80%', height='80px')
-                        )
-                        
-                        def make_submit_callback(aid, text_widget, output_area):
-                            def submit_assignment(b):
-                                if text_widget.value.strip():
-                                    new_submission = Submission(
-                                        current_user.user_id,
-                                        aid,
-                                        text_widget.value,
-                                        datetime.now()
-                                    )
-                                    submissions[(current_user.user_id, aid)] = new_submission
-                                    
-                                    with output_area:
-                                        clear_output()
-                                        display(HTML(f"""
-                                        <div style='background-color: #d1fae5; border: 2px solid #10b981;
-                                                    border-radius: 8px; padding: 15px; margin: 10px 0;'>
-                                            <h4 style='color: #10b981;'>✅ Assignment Submitted!</h4>
-                                            <p>{assignment.title} submitted successfully! Your teacher will grade it soon.</p>
-                                            <p style='font-size: 0.9em; margin-top: 10px;'><em>Logout and login again to see updated status.</em></p>
-                                        </div>
-                                        """))
-                            return submit_assignment
-                        
-                        submit_btn = widgets.Button(
-                            description='✅ Submit Assignment',
-                            button_style='success',
-                            icon='check'
-                        )
-                        submit_btn.on_click(make_submit_callback(assign_id, submission_text, submission_area))
-                        
-                        display(submission_text)
-                        display(submit_btn)
-                    
-                    display(submission_area)
-                
-                # Show feedback if graded
-                if submission and submission.grade is not None:
-                    display(HTML(f"""
-                    <div style='background-color: #f0f9ff; border: 1px solid #3b82f6;
-                                padding: 10px; margin: 5px 0 5px 20px; border-radius: 5px;'>
-                        <p style='margin: 5px 0;'><strong>Teacher Feedback:</strong> {submission.feedback}</p>
-                    </div>
-                    """))
-    
-    tab_contents.append(courses_output)
-    
+                items.extend(assignment_item(assignments[assign_id]))
+
+            course_boxes[course.course_id] = widgets.VBox(items)
+
+        tab_contents.append(_compose(widgets, [templates.HEADING.render(text='📚 My Courses & Assignments')] + list(course_boxes.values())))
+
     # Tab 2: My Progress
-    progress_output = widgets.Output()
-    with progress_output:
-        display(HTML("<h3>📈 My Progress</h3>"))
-        
-        # Get all graded submissions for this student
-        student_submissions = []
-        for (sid, aid), s in submissions.items():
-            if sid == current_user.user_id and s.grade is not None:
-                assignment = assignments.get(aid)
-                if assignment:
-                    student_submissions.append((assignment, s))
-        
-        if student_submissions:
-            scores = [sub.grade for _, sub in student_submissions]
-            avg_score = sum(scores) / len(scores)
-            
-            # Performance summary
-            display(HTML(f"""
-            <div style='background-color: #f0f9ff; border: 2px solid #3b82f6;
-                        border-radius: 8px; padding: 15px; margin: 10px 0;'>
-                <h4 style='color: #3b82f6;'>🎯 Overall Performance</h4>
-                <p><strong>Average Grade:</strong> {avg_score:.1f}%</p>
-                <p><strong>Assignments Completed:</strong> {len(student_submissions)}</p>
-                <p><strong>Best Score:</strong> {max(scores)}% | <strong>Recent Score:</strong> {scores[-1]}%</p>
-            </div>
-            """))
-            
-            # Progress chart
-            if len(scores) > 1:
-                fig, ax = plt.subplots(figsize=(8, 4))
-                ax.plot(range(1, len(scores) + 1), scores, marker='o', linewidth=2, 
-                       markersize=8, color='#3b82f6')
-                ax.axhline(y=avg_score, color='#10b981', linestyle='--', label=f'Average ({avg_score:.1f}%)')
-                ax.set_xlabel('Assignment Number')
-                ax.set_ylabel('Score (%)')
-                ax.set_title('Your Grade Progression')
-                ax.legend()
-                ax.grid(True, alpha=0.3)
-                plt.tight_layout()
-                plt.show()
-            
-            # Course breakdown
-            display(HTML("<h4>📊 Performance by Course</h4>"))
-            course_scores = defaultdict(list)
-            for assignment, sub in student_submissions:
-                course_name = courses[assignment.course_id].name
-                course_scores[course_name].append(sub.grade)
-            
-            for course_name, scores_list in course_scores.items():
-                course_avg = sum(scores_list) / len(scores_list)
-                display(HTML(f"""
-                <div style='padding: 10px; margin: 5px 0; background-color: #f9fafb;
-                            border-left: 4px solid #3b82f6;'>
-                    <strong>{course_name}:</strong> {course_avg:.1f}% average ({len(scores_list)} assignments)
-                </div>
-                """))
-        else:
-            display(HTML("<p>Complete and get graded on assignments to see your progress!</p>"))
-    
-    tab_contents.append(progress_output)
-    
+    with _instrumented('tab.student.progress'):
+        # Summary, chart and each course average are separate widgets so a
+        # new grade only replaces the ones it changes
+        source = store.snapshot() if store is not None else None
+        graded = _student_graded(student_id, source.assignments if source else assignments,
+                                 source.submissions if source else submissions)
+        progress_summary = widgets.HTML(_progress_summary_html(graded))
+        progress_chart = widgets.HTML()
+        course_averages = {}  # course_id -> HTML widget
+        course_breakdown = widgets.VBox()
+        breakdown_heading = widgets.HTML(templates.SUBHEADING.render(text='📊 Performance by Course'))
+
+        def course_average_html(course_id):
+            scores = [sub.grade for assignment, sub in graded.values() if assignment.course_id == course_id]
+            return _course_average_html(courses[course_id].name, scores)
+
+        def show_course_average(course_id):
+            if course_id in course_averages:
+                course_averages[course_id].value = course_average_html(course_id)
+                return
+            course_averages[course_id] = widgets.HTML(course_average_html(course_id))
+            course_breakdown.children = [breakdown_heading] + list(course_averages.values())
+
+        for course_id in dict.fromkeys(assignment.course_id for assignment, _ in graded.values()):
+            show_course_average(course_id)
+
+        # The chart is drawn on a background thread, like the teacher analytics
+        chart_scores = {'scores': [sub.grade for _, sub in graded.values()]}
+
+        def show_chart(key, html):
+            progress_chart.value = html
+
+        chart = BackgroundTask(lambda key: _progress_chart_html(chart_scores['scores'], OFFSCREEN_PLT),
+                               show_chart, name=f'lms-progress-{student_id}')
+        if tree is not None:
+            tree.on_close(chart.close)
+        chart.request('chart')
+
+        def update_progress(submission):
+            assignment = assignments[submission.assignment_id]
+            graded[submission.assignment_id] = (assignment, submission)
+            progress_summary.value = _progress_summary_html(graded)
+            show_course_average(assignment.course_id)
+            chart_scores['scores'] = [sub.grade for _, sub in graded.values()]
+            chart.invalidate()
+            chart.request('chart')
+
+        tab_contents.append(widgets.VBox([progress_summary, progress_chart, course_breakdown]))
+
     # Tab 3: AI Recommendations
-    ai_output = widgets.Output()
-    with ai_output:
-        display(HTML("<h3>🤖 Personalized Learning Recommendations</h3>"))
-        
-        # Get AI recommendations
-        recommendations = ai_assistant.personalized_learning_path(current_user.user_id, student_performance)
-        
-        display(HTML("""
-        <div style='background-color: #faf5ff; border: 2px solid #a855f7;
-                    border-radius: 8px; padding: 15px; margin: 10px 0;'>
-            <h4 style='color: #a855f7;'>🎯 Your Personalized Learning Path</h4>
-            <p>Based on your performance, we recommend the following resources:</p>
-        </div>
-        """))
-        
-        priority_colors = {
-            'High': '#ef4444',
-            'Medium': '#f59e0b',
-            'Low': '#3b82f6'
-        }
-        
-        for rec in recommendations:
-            color = priority_colors.get(rec['priority'], '#3b82f6')
-            display(HTML(f"""
-            <div style='border-left: 4px solid {color}; padding: 12px; margin: 10px 0;
-                        background-color: #f9fafb;'>
-                <p style='margin: 5px 0;'><strong>{rec['type']}: {rec['title']}</strong>
-                   <span style='color: {color}; float: right;'>Priority: {rec['priority']}</span></p>
-                <p style='margin: 5px 0; color: #6b7280;'>{rec['description']}</p>
-            </div>
-            """))
-        
-        # Content recommendations for each course
-        display(HTML("<h4>📚 Recommended Study Materials</h4>"))
-        for course in student_courses:
-            materials = ai_assistant.intelligent_content_recommendation(
-                current_user.user_id, course.subject, student_performance
-            )
-            
-            display(HTML(f"""
-            <div style='background-color: #f0fdf4; border: 1px solid #10b981;
-                        padding: 12px; margin: 10px 0; border-radius: 5px;'>
-                <strong style='color: #10b981;'>{course.name}:</strong>
-                <ul style='margin: 5px 0; padding-left: 20px;'>
-                    {''.join([f'<li>{material}</li>' for material in materials])}
-                </ul>
-            </div>
-            """))
-    
-    tab_contents.append(ai_output)
-    
+    with _instrumented('tab.student.ai'):
+        def ai_html():
+            return student_ai_html(student_id, student_courses, ai_assistant, student_performance, current_precomputed())
+
+        ai_tab = widgets.HTML(ai_html())
+        ai_state = {'stale': False}  # set when a grade arrives while the tab is hidden
+        tab_contents.append(ai_tab)
+
     # Tab 4: Upcoming Assignments
-    upcoming_output = widgets.Output()
-    with upcoming_output:
-        display(HTML("<h3>📅 Upcoming Assignments</h3>"))
-        
-        # Get all unsubmitted assignments
-        upcoming = []
-        for course in student_courses:
-            for assign_id in course.assignments:
-                assignment = assignments[assign_id]
-                submission_key = (current_user.user_id, assign_id)
-                if submission_key not in submissions:
-                    days_left = (assignment.due_date - datetime.now()).days
-                    upcoming.append((assignment, course, days_left))
-        
-        # Sort by due date
-        upcoming.sort(key=lambda x: x[2])
-        
-        if upcoming:
-            for assignment, course, days_left in upcoming:
-                # AI prediction
-                predicted_score, confidence = ai_assistant.predict_student_performance(
-                    current_user.user_id, assignment.difficulty, student_performance
-                )
-                
-                urgency_color = '#ef4444' if days_left < 0 else '#f59e0b' if days_left <= 2 else '#10b981'
-                
-                display(HTML(f"""
-                <div style='border: 2px solid {urgency_color}; border-radius: 8px;
-                            padding: 15px; margin: 10px 0; background-color: white;'>
-                    <h4 style='color: {urgency_color}; margin-top: 0;'>{assignment.title}</h4>
-                    <p><strong>Course:</strong> {course.name}</p>
-                    <p><strong>Due:</strong> {assignment.due_date.strftime('%Y-%m-%d')} 
-                       ({days_left} days {'overdue' if days_left < 0 else 'left'})</p>
-                    <p><strong>Difficulty:</strong> {assignment.difficulty} | <strong>Points:</strong> {assignment.points}</p>
-                    <div style='background-color: #f0f9ff; padding: 10px; margin-top: 10px; border-radius: 5px;'>
-                        <p style='margin: 5px 0;'><strong>🤖 AI Prediction:</strong> {confidence}</p>
-                    </div>
-                </div>
-                """))
-        else:
-            display(HTML("""
-            <div style='background-color: #d1fae5; border: 2px solid #10b981;
-                        border-radius: 8px; padding: 15px;'>
-                <p style='color: #10b981; margin: 0;'>✅ All caught up! No pending assignments.</p>
-            </div>
-            """))
-    
-    tab_contents.append(upcoming_output)
-    
+    with _instrumented('tab.student.upcoming'):
+        def upcoming_html():
+            return student_upcoming_html(student_id, student_courses, assignments, submissions,
+                                          ai_assistant, student_performance, current_precomputed(), datetime.now())
+
+        upcoming_tab = widgets.HTML(upcoming_html())
+        tab_contents.append(upcoming_tab)
+
+    # Keep the tree current as submissions, grades and assignments arrive
+    if live:
+        def on_change(event, obj):
+            if event == 'assignment' and obj.course_id in course_boxes:
+                box = course_boxes[obj.course_id]
+                box.children = list(box.children) + assignment_item(obj)
+                upcoming_tab.value = upcoming_html()
+                return
+
+            if event not in ('submission', 'grade') or obj.student_id != student_id:
+                return
+            if obj.assignment_id in assignment_widgets:
+                row, extra = assignment_widgets[obj.assignment_id]
+                row.value = assignment_row_html(assignments[obj.assignment_id], obj, datetime.now())
+                extra.children = extra_children(assignments[obj.assignment_id], obj, extra)
+            if event == 'submission':
+                upcoming_tab.value = upcoming_html()
+            elif obj.grade is not None and obj.assignment_id in assignments:
+                update_progress(obj)
+                # Recommendations are recomputed when the tab is next shown
+                if tabs.selected_index == 2:
+                    ai_tab.value = ai_html()
+                else:
+                    ai_state['stale'] = True
+
+        tree.on_change(on_change)
+
     # Create tabs
     tabs = widgets.Tab(children=tab_contents)
     tabs.set_title(0, '📚 My Courses')
     tabs.set_title(1, '📈 Progress')
     tabs.set_title(2, '🤖 AI Recommendations')
     tabs.set_title(3, '📅 Upcoming')
-    
+
+    def refresh_ai(change):
+        if change['new'] == 2 and ai_state['stale']:
+            ai_state['stale'] = False
+            ai_tab.value = ai_html()
+
+    tabs.observe(refresh_ai, names='selected_index')
+
     # Logout button
     logout_btn = widgets.Button(description='Logout', button_style='danger', icon='sign-out')
     logout_btn.on_click(lambda b: logout())
-    
-    display(widgets.VBox([tabs, logout_btn]))
+
+    root = widgets.VBox([widgets.HTML(header), tabs, logout_btn])
+    if tree is not None:
+        tree.root = root
+    display(root)
+    return root
 
 
+@traced('render.login_screen')
+@RENDER_SECONDS.labels(view='render.login_screen').time()
 def render_login_screen(users, widgets, HTML, display, login):
     """Render the login interface"""
     from IPython.display import clear_output
     clear_output()
     
-    display(HTML("""
+    # The login screen is sent to the front end as one widget tree
+    parts = []
+    
+    parts.append("""
     <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 padding: 30px; border-radius: 15px; color: white; text-align: center;
                 margin: 20px 0;'>
@@ -948,17 +1121,17 @@ def render_login_screen(users, widgets, HTML, display, login):
             Empowering teachers and students with intelligent learning tools
         </p>
     </div>
-    """))
+    """)
     
-    display(HTML("<h3 style='text-align: center; color: #4b5563;'>Select a user to login:</h3>"))
+    parts.append("<h3 style='text-align: center; color: #4b5563;'>Select a user to login:</h3>")
     
     # Teacher logins
-    display(HTML("""
+    parts.append("""
     <div style='background-color: #f0f9ff; border: 2px solid #3b82f6;
                 border-radius: 10px; padding: 15px; margin: 15px 0;'>
         <h4 style='color: #3b82f6; margin-top: 0;'>👨‍🏫 Teacher Accounts</h4>
     </div>
-    """))
+    """)
     
     teacher_btns = []
     for user_id, user in users.items():
@@ -972,15 +1145,15 @@ def render_login_screen(users, widgets, HTML, display, login):
             btn.on_click(lambda b, uid=user_id: login(uid))
             teacher_btns.append(btn)
     
-    display(widgets.VBox(teacher_btns, layout=widgets.Layout(align_items='center')))
+    parts.append(widgets.VBox(teacher_btns, layout=widgets.Layout(align_items='center')))
     
     # Student logins
-    display(HTML("""
+    parts.append("""
     <div style='background-color: #f0fdf4; border: 2px solid #10b981;
                 border-radius: 10px; padding: 15px; margin: 15px 0;'>
         <h4 style='color: #10b981; margin-top: 0;'>👨‍🎓 Student Accounts</h4>
     </div>
-    """))
+    """)
     
     student_btns = []
     for user_id, user in users.items():
@@ -994,10 +1167,10 @@ def render_login_screen(users, widgets, HTML, display, login):
             btn.on_click(lambda b, uid=user_id: login(uid))
             student_btns.append(btn)
     
-    display(widgets.VBox(student_btns, layout=widgets.Layout(align_items='center')))
+    parts.append(widgets.VBox(student_btns, layout=widgets.Layout(align_items='center')))
     
     # Features showcase
-    display(HTML("""
+    parts.append("""
     <div style='margin-top: 30px; padding: 20px; background-color: #faf5ff;
                 border-radius: 10px; border: 2px solid #a855f7;'>
         <h4 style='color: #a855f7; text-align: center;'>🤖 AI-Powered Features</h4>
@@ -1028,7 +1201,9 @@ def render_login_screen(users, widgets, HTML, display, login):
             </div>
         </div>
     </div>
-    """))
+    """)
+    
+    display(_compose(widgets, parts))
 
 
 print("✅ LMS System module loaded successfully!")
@@ -0,0 +1,271 @@
+"""
+K-12 Learning Management System - HTML Templates
+
+Dashboard markup lives here as precompiled templates. Each template is
+parsed once at import time into literal chunks and placeholders; render()
+HTML-escapes every value unless it is wrapped in Markup, so user content
+(submission text, feedback, titles) can never inject markup.
+"""
+
+import base64
+import html
+import io
+from string import Template
+
+from lms_profiling import span
+
+
+# ============================================================================
+# TEMPLATE ENGINE
+# ============================================================================
+
+class Markup(str):
+    """A string that is already safe HTML and must not be escaped again"""
+
+
+class HTMLTemplate:
+    """An auto-escaping ``$name`` template compiled once into parts"""
+
+    def __init__(self, source):
+        self.source = source
+        self.literals = []
+        self.names = []
+        pos = 0
+        for match in Template.pattern.finditer(source):
+            name = match.group('named') or match.group('braced')
+            if name is None:
+                if match.group('escaped') is not None:
+                    continue
+                raise ValueError(f"Invalid placeholder in template at {match.start()}")
+            self.literals.append(source[pos:match.start()])
+            self.names.append(name)
+            pos = match.end()
+        self.literals.append(source[pos:])
+        self.literals = [lit.replace('$$', '$') for lit in self.literals]
+
+    def render(self, **values):
+        """Render the template, escaping all non-Markup values"""
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = values[name]
+            if not isinstance(value, Markup):
+                value = html.escape(str(value), quote=True)
+            out.append(value)
+            out.append(literal)
+        return Markup(''.join(out))
+
+
+def join(fragments):
+    """Concatenate rendered fragments into one Markup document"""
+    return Markup(''.join(fragments))
+
+
+def figure_to_html(fig, plt):
+    """Embed a matplotlib figure as an inline PNG and close it"""
+    buffer = io.BytesIO()
+    with span('matplotlib.savefig'):
+        fig.savefig(buffer, format='png', bbox_inches='tight')
+        plt.close(fig)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return Markup(f"<img src='data:image/png;base64,{encoded}' style='max-width: 100%;'/>")
+
+
+# ============================================================================
+# SHARED
+# ============================================================================
+
+HEADING = HTMLTemplate("<h3>$text</h3>")
+SUBHEADING = HTMLTemplate("<h4>$text</h4>")
+PARAGRAPH = HTMLTemplate("<p>$text</p>")
+
+SUCCESS_BANNER = HTMLTemplate("""
+<div style='background-color: #d1fae5; border: 2px solid #10b981;
+            border-radius: 8px; padding: 15px; margin: 10px 0;'>
+    <h4 style='color: #10b981;'>$title</h4>
+    <p>$message</p>
+</div>
+""")
+
+
+# ============================================================================
+# TEACHER DASHBOARD
+# ============================================================================
+
+TEACHER_HEADER = HTMLTemplate("""
+<div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 20px; border-radius: 10px; color: white; margin-bottom: 20px;'>
+    <h2>👨‍🏫 Teacher Dashboard - Welcome, $name!</h2>
+    <p style='margin: 5px 0;'>Manage your courses, grade assignments, and track student progress</p>
+</div>
+""")
+
+TEACHER_COURSE_CARD = HTMLTemplate("""
+<div style='border: 2px solid #667eea; border-radius: 8px; padding: 15px;
+            margin: 10px 0; background-color: #f8f9ff;'>
+    <h4 style='color: #667eea; margin-top: 0;'>$name</h4>
+    <p><strong>Subject:</strong> $subject | <strong>Grade:</strong> $grade_level</p>
+    <p>👥 $student_count students | 📝 $assignment_count assignments</p>
+</div>
+""")
+
+PENDING_SUBMISSION_CARD = HTMLTemplate("""
+<div style='border: 2px solid #f59e0b; border-radius: 8px; padding: 15px;
+            margin: 10px 0; background-color: #fffbeb;'>
+    <h4 style='color: #f59e0b; margin-top: 0;'>$title</h4>
+    <p><strong>Student:</strong> $student | <strong>Submitted:</strong> $submitted</p>
+    <p><strong>Content:</strong> $content</p>
+</div>
+""")
+
+GRADED_SUBMISSION_CARD = HTMLTemplate("""
+<div style='border: 2px solid #10b981; border-radius: 8px; padding: 15px;
+            margin: 10px 0; background-color: #d1fae5;'>
+    <h4 style='color: #10b981; margin-top: 0;'>✅ $title - GRADED!</h4>
+    <p><strong>Student:</strong> $student</p>
+    <p><strong>Score:</strong> $grade/$points ($grade%)</p>
+    <p><strong>Feedback:</strong> $feedback</p>
+</div>
+""")
+
+ALL_GRADED = HTMLTemplate("<p style='color: #10b981;'>✅ All submissions graded!</p>")
+
+ANALYTICS_SUMMARY = HTMLTemplate("""
+<div style='background-color: #e0e7ff; border: 2px solid #667eea;
+            border-radius: 8px; padding: 15px; margin: 10px 0;'>
+    <h4 style='color: #667eea;'>$course_name - Performance Summary</h4>
+    <p><strong>Average Score:</strong> $avg_score%</p>
+    <p><strong>Total Graded Submissions:</strong> $count</p>
+    <p><strong>Highest Score:</strong> $max_score% | <strong>Lowest Score:</strong> $min_score%</p>
+</div>
+""")
+
+
+# ============================================================================
+# STUDENT DASHBOARD
+# ============================================================================
+
+STUDENT_HEADER = HTMLTemplate("""
+<div style='background: linear-gradient(135deg, #06b6d4 0%, #3b82f6 100%);
+            padding: 20px; border-radius: 10px; color: white; margin-bottom: 20px;'>
+    <h2>👨‍🎓 Student Dashboard - Welcome, $name!</h2>
+    <p style='margin: 5px 0;'>Grade $grade_level | View courses, submit assignments, and track your progress</p>
+</div>
+""")
+
+STUDENT_COURSE_CARD = HTMLTemplate("""
+<div style='border: 2px solid #06b6d4; border-radius: 8px; padding: 15px;
+            margin: 10px 0; background-color: #ecfeff;'>
+    <h4 style='color: #06b6d4; margin-top: 0;'>$name</h4>
+    <p><strong>Teacher:</strong> $teacher | <strong>Subject:</strong> $subject</p>
+</div>
+""")
+
+STATUS = HTMLTemplate("<span style='color: $color;'>$text</span>")
+
+ASSIGNMENT_ROW = HTMLTemplate("""
+<div style='border-left: 4px solid $border_color; padding: 10px; margin: 8px 0 8px 20px;
+            background-color: $status_color;'>
+    <p style='margin: 5px 0;'><strong>$title</strong></p>
+    <p style='margin: 5px 0; font-size: 0.9em;'>$description</p>
+    <p style='margin: 5px 0; font-size: 0.9em;'>
+        <strong>Due:</strong> $due |
+        <strong>Points:</strong> $points |
+        <strong>Difficulty:</strong> $difficulty
+    </p>
+    <p style='margin: 5px 0;'>$status</p>
+</div>
+""")
+
+FEEDBACK = HTMLTemplate("""
+<div style='background-color: #f0f9ff; border: 1px solid #3b82f6;
+            padding: 10px; margin: 5px 0 5px 20px; border-radius: 5px;'>
+    <p style='margin: 5px 0;'><strong>Teacher Feedback:</strong> $feedback</p>
+</div>
+""")
+
+PROGRESS_SUMMARY = HTMLTemplate("""
+<div style='background-color: #f0f9ff; border: 2px solid #3b82f6;
+            border-radius: 8px; padding: 15px; margin: 10px 0;'>
+    <h4 style='color: #3b82f6;'>🎯 Overall Performance</h4>
+    <p><strong>Average Grade:</strong> $avg_score%</p>
+    <p><strong>Assignments Completed:</strong> $count</p>
+    <p><strong>Best Score:</strong> $best_score% | <strong>Recent Score:</strong> $recent_score%</p>
+</div>
+""")
+
+COURSE_AVERAGE = HTMLTemplate("""
+<div style='padding: 10px; margin: 5px 0; background-color: #f9fafb;
+            border-left: 4px solid #3b82f6;'>
+    <strong>$course_name:</strong> $course_avg% average ($count assignments)
+</div>
+""")
+
+LEARNING_PATH_INTRO = HTMLTemplate("""
+<div style='background-color: #faf5ff; border: 2px solid #a855f7;
+            border-radius: 8px; padding: 15px; margin: 10px 0;'>
+    <h4 style='color: #a855f7;'>🎯 Your Personalized Learning Path</h4>
+    <p>Based on your performance, we recommend the following resources:</p>
+</div>
+""")
+
+RECOMMENDATION = HTMLTemplate("""
+<div style='border-left: 4px solid $color; padding: 12px; margin: 10px 0;
+            background-color: #f9fafb;'>
+    <p style='margin: 5px 0;'><strong>$type: $title</strong>
+       <span style='color: $color; float: right;'>Priority: $priority</span></p>
+    <p style='margin: 5px 0; color: #6b7280;'>$description</p>
+</div>
+""")
+
+MATERIALS = HTMLTemplate("""
+<div style='background-color: #f0fdf4; border: 1px solid #10b981;
+            padding: 12px; margin: 10px 0; border-radius: 5px;'>
+    <strong style='color: #10b981;'>$course_name:</strong>
+    <ul style='margin: 5px 0; padding-left: 20px;'>
+        $items
+    </ul>
+</div>
+""")
+
+LIST_ITEM = HTMLTemplate("<li>$text</li>")
+
+UPCOMING_CARD = HTMLTemplate("""
+<div style='border: 2px solid $color; border-radius: 8px;
+            padding: 15px; margin: 10px 0; background-color: white;'>
+    <h4 style='color: $color; margin-top: 0;'>$title</h4>
+    <p><strong>Course:</strong> $course_name</p>
+    <p><strong>Due:</strong> $due
+       ($days_left days $when)</p>
+    <p><strong>Difficulty:</strong> $difficulty | <strong>Points:</strong> $points</p>
+    <div style='background-color: #f0f9ff; padding: 10px; margin-top: 10px; border-radius: 5px;'>
+        <p style='margin: 5px 0;'><strong>🤖 AI Prediction:</strong> $confidence</p>
+    </div>
+</div>
+""")
+
+ALL_CAUGHT_UP = HTMLTemplate("""
+<div style='background-color: #d1fae5; border: 2px solid #10b981;
+            border-radius: 8px; padding: 15px;'>
+    <p style='color: #10b981; margin: 0;'>✅ All caught up! No pending assignments.</p>
+</div>
+""")
+
+
+# ============================================================================
+# STATIC SNAPSHOTS
+# ============================================================================
+
+STATIC_PAGE = HTMLTemplate("""<!DOCTYPE html>
+<html lang='en'>
+<head>
+    <meta charset='utf-8'>
+    <meta name='viewport' content='width=device-width, initial-scale=1'>
+    <title>$title</title>
+</head>
+<body style='font-family: -apple-system, Segoe UI, Roboto, sans-serif; max-width: 960px;
+             margin: 0 auto; padding: 20px;'>
+$body
+<p style='color: #6b7280; font-size: 0.85em; margin-top: 30px;'>Read-only snapshot generated $generated_at</p>
+</body>
+</html>
+""")
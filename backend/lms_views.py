@@ -0,0 +1,75 @@
+"""
+K-12 Learning Management System - Live Dashboard Views
+
+A dashboard is built once per user session as a widget tree and then kept
+current by store change notifications: grading a submission or submitting
+work updates only the affected card, row or summary widget instead of
+clearing the output and rebuilding every widget and chart.
+"""
+
+
+# ============================================================================
+# WIDGET TREES
+# ============================================================================
+
+class WidgetTree:
+    """A built dashboard and the store listeners that keep it current"""
+
+    def __init__(self, store):
+        self.store = store
+        self.root = None
+        self._listeners = []
+        self._closers = []
+
+    def on_change(self, listener):
+        """Subscribe listener(event, obj) to store changes for this tree's lifetime"""
+        self.store.subscribe(listener)
+        self._listeners.append(listener)
+        return listener
+
+    def on_close(self, callback):
+        """Call callback() when the tree is closed (e.g. to stop background work)"""
+        self._closers.append(callback)
+        return callback
+
+    def close(self):
+        """Unsubscribe from the store, stop background work and close the widgets"""
+        for listener in self._listeners:
+            self.store.unsubscribe(listener)
+        self._listeners = []
+        for callback in self._closers:
+            callback()
+        self._closers = []
+        if self.root is not None:
+            self.root.close()
+            self.root = None
+
+
+class SessionViews:
+    """Session-scoped cache of built dashboard trees, one per user"""
+
+    def __init__(self, store):
+        self.store = store
+        self.trees = {}
+
+    def show(self, user_id, render, display):
+        """Display the user's dashboard, building it with render(tree) on first use"""
+        tree = self.trees.get(user_id)
+        if tree is None or tree.root is None:
+            tree = WidgetTree(self.store)
+            render(tree)
+            self.trees[user_id] = tree
+        else:
+            display(tree.root)
+        return tree
+
+    def discard(self, user_id):
+        """Drop a user's tree so the next show() rebuilds it"""
+        tree = self.trees.pop(user_id, None)
+        if tree is not None:
+            tree.close()
+
+    def close(self):
+        """Drop every tree"""
+        for user_id in list(self.trees):
+            self.discard(user_id)
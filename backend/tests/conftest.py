@@ -0,0 +1,39 @@
+"""Shared fixtures: a small, fully deterministic LMS store"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lms_store import LMSStore  # noqa: E402
+from lms_system import Assignment, Course, Submission, User  # noqa: E402
+
+
+def build_store(students=12, courses=2, assignments=3):
+    """Students s0.. in every course c0.. taught by teacher t, every third assignment ungraded"""
+    users = {f's{i}': User(f's{i}', f'Student {i}', 'student', 7) for i in range(students)}
+    users['t'] = User('t', 'Teacher', 'teacher')
+    course_map, assignment_map, submission_map = {}, {}, {}
+    for c in range(courses):
+        course = Course(f'c{c}', f'Course {c}', 'Teacher', 7, ('Mathematics', 'Science')[c % 2])
+        course.students = [f's{i}' for i in range(students)]
+        course_map[course.course_id] = course
+        for a in range(assignments):
+            aid = f'c{c}a{a}'
+            assignment_map[aid] = Assignment(aid, course.course_id, f'Assignment {a}', 'Work', datetime(2026, 1, 10 + a),
+                                             100, 'medium')
+            course.assignments.append(aid)
+            for i in range(students):
+                submission = Submission(f's{i}', aid, f'answer {i} {aid}', datetime(2026, 1, 5 + a, 8 + c))
+                if a % 3 != 2:
+                    submission.grade = 60 + (i * 7 + a * 5 + c * 3) % 40
+                submission_map[(f's{i}', aid)] = submission
+    return LMSStore(users, course_map, assignment_map, submission_map, {})
+
+
+@pytest.fixture
+def store():
+    return build_store()
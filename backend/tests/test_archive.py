@@ -0,0 +1,95 @@
+"""Term archives: round-trips, merging with live history and atomic rewrites"""
+
+import os
+
+import numpy as np
+import pytest
+
+import lms_archive
+from lms_archive import TermArchive, archive_term, archived_history, open_archives
+from lms_performance import PerformanceHistory
+
+
+def _graded(store, student_id, course_id=None):
+    subs = [s for (sid, aid), s in store.submissions.items()
+            if sid == student_id and s.grade is not None
+            and (course_id is None or store.assignments[aid].course_id == course_id)]
+    return [s.grade for s in sorted(subs, key=lambda s: s.submitted_date)]
+
+
+def test_round_trip(store, tmp_path):
+    store.record_grade(store.submissions[('s3', 'c1a0')], 88, 'Clear explanation')
+    path = str(tmp_path / '2025-fall')
+    count = archive_term(store, path, '2025 Fall', remove=False)
+    assert count == len(store.submissions)
+
+    with TermArchive(path) as archive:
+        assert archive.term == '2025 Fall'
+        assert len(archive) == count
+        assert archive.student_scores('s3').tolist() == _graded(store, 's3')
+        assert archive.student_scores('s3', 'Science').tolist() == _graded(store, 's3', 'c1')
+        assert archive.student_scores('nobody').tolist() == []
+
+        record = archive.submission('s3', 'c1a0')
+        assert record['course_id'] == 'c1'
+        assert record['grade'] == 88.0 and record['feedback'] == 'Clear explanation'
+        assert record['content'] == store.submissions[('s3', 'c1a0')].content
+        assert archive.submission('s3', 'c1a2')['grade'] is None
+        assert archive.submission('s3', 'missing') is None
+
+        expected = [s.grade for (_, aid), s in store.submissions.items() if aid.startswith('c0') and s.grade is not None]
+        assert sorted(archive.course_grades('c0').tolist()) == sorted(expected)
+
+
+def test_archive_term_drops_archived_work_from_the_store(store, tmp_path):
+    total = len(store.submissions)
+    count = archive_term(store, str(tmp_path / 'term'), 'Term', course_ids=['c0'])
+    assert count == total // 2
+    assert not any(aid.startswith('c0') for aid in store.assignments)
+    assert len(store.submissions) == total - count
+    assert store.courses['c0'].assignments == []
+
+
+def test_archived_and_live_subjects_merge(store, tmp_path):
+    expected_math = _graded(store, 's5', 'c0')
+    archive_term(store, str(tmp_path / '2025-fall'), '2025 Fall')
+    live = PerformanceHistory()
+    live.record('math', 97.0)
+    live.record('science', 64.0)
+
+    archives = open_archives(str(tmp_path))
+    try:
+        # 'Mathematics' courses are archived under the live key 'math'
+        assert set(archives[0].subject_scores('s5')) == {'math', 'science'}
+        history = archived_history(archives, 's5', live=live)
+    finally:
+        for archive in archives:
+            archive.close()
+    assert set(history.subjects) == {'math', 'science'}
+    assert history.subject_scores('math') == expected_math + [97.0]
+
+
+def test_rewrite_replaces_the_archive_atomically(store, tmp_path, monkeypatch):
+    path = str(tmp_path / 'term')
+    archive_term(store, path, 'First', remove=False)
+    reader = TermArchive(path)
+    first_scores = reader.student_scores('s0').tolist()
+
+    store.record_grade(store.submissions[('s0', 'c0a2')], 100, 'Late but perfect')
+    archive_term(store, path, 'Second', remove=False)
+    # A reader opened before the rewrite keeps reading the old archive
+    assert reader.term == 'First' and reader.student_scores('s0').tolist() == first_scores
+    reader.close()
+    with TermArchive(path) as rewritten:
+        assert rewritten.term == 'Second'
+        assert rewritten.submission('s0', 'c0a2')['grade'] == 100.0
+
+    def fail(tmp, *args):
+        np.save(os.path.join(tmp, 'submissions.npy'), np.zeros(0))
+        raise OSError('disk full')
+    monkeypatch.setattr(lms_archive, '_write_files', fail)
+    with pytest.raises(OSError):
+        archive_term(store, path, 'Third', remove=False)
+    with TermArchive(path) as kept:
+        assert kept.term == 'Second'
+    assert os.listdir(tmp_path) == ['term']
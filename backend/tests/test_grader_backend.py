@@ -0,0 +1,124 @@
+"""GradingClient batching, fallback and error handling"""
+
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from lms_grader_backend import (GraderBackend, GradingClient, HTTPGraderBackend, LocalGraderBackend, grade_all,
+                                serve)
+
+
+class RaisingBackend(GraderBackend):
+    def __init__(self, error):
+        self.error = error
+        self.requests = 0
+
+    async def grade_batch(self, items):
+        self.requests += 1
+        raise self.error
+
+
+class SlowBackend(GraderBackend):
+    async def grade_batch(self, items):
+        await asyncio.sleep(10)
+
+
+class ShortBackend(GraderBackend):
+    async def grade_batch(self, items):
+        return []
+
+
+REQUESTS = [(f'answer number {i} ' * (i + 2), 'medium', {'math': [80.0]}) for i in range(10)]
+
+
+def _grade(backend, **options):
+    options.setdefault('backoff', 0)
+
+    async def run():
+        async with GradingClient(backend, **options) as client:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(client.grade_outcome(*r) for r in REQUESTS), return_exceptions=True), 10)
+            return results, client.stats
+    return asyncio.run(run())
+
+
+def test_batches_are_graded_remotely():
+    backend = LocalGraderBackend()
+    results, stats = _grade(backend, batch_size=4)
+    assert [outcome for _, outcome in results] == ['remote'] * len(REQUESTS)
+    assert stats['remote'] == len(REQUESTS)
+    assert backend.requests == stats['batches'] < len(REQUESTS)
+
+
+@pytest.mark.parametrize('backend', [RaisingBackend(TypeError('bad result')), RaisingBackend(AttributeError('list')),
+                                     ShortBackend()])
+def test_any_backend_failure_falls_back(backend):
+    results, stats = _grade(backend, retries=1)
+    assert [outcome for _, outcome in results] == ['fallback'] * len(REQUESTS)
+    assert stats['errors'] == 2 * stats['batches']
+    score, feedback, suggestions = results[0][0]
+    assert 0 <= score <= 100 and feedback
+
+
+def test_timeout_falls_back_and_skips_the_backend_during_cooldown():
+    async def run():
+        async with GradingClient(SlowBackend(), timeout=0.05, retries=0, max_wait=0, cooldown=60) as client:
+            first = await client.grade_outcome(*REQUESTS[0])
+            second = await client.grade_outcome(*REQUESTS[1])
+            return first[1], second[1], client.stats
+    first, second, stats = asyncio.run(run())
+    assert (first, second) == ('fallback', 'fallback')
+    assert stats['timeouts'] == 1
+
+
+def test_failing_fallback_raises_instead_of_hanging():
+    def fallback(*args):
+        raise RuntimeError('fallback down')
+    results, _ = _grade(RaisingBackend(ValueError()), retries=0, fallback=fallback)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def _raw_server(response):
+    """Raw socket server that answers every request with the same response bytes"""
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen()
+
+    def run():
+        while True:
+            connection, _ = listener.accept()
+            with connection:
+                connection.recv(65536)
+                connection.sendall(response)
+
+    threading.Thread(target=run, daemon=True).start()
+    return f'http://127.0.0.1:{listener.getsockname()[1]}/grade'
+
+
+def _response(body, status_line=b'HTTP/1.1 200 OK'):
+    return status_line + b'\r\nContent-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body
+
+
+@pytest.mark.parametrize('response', [
+    _response(b'{"results": [1]}'),
+    _response(b'[1, 2]'),
+    _response(b'not json'),
+    _response(b'{}', b'HTTP/1.1'),
+    _response(b'{}', b'HTTP/1.1 500 Internal Server Error'),
+])
+def test_malformed_http_responses_fall_back(response):
+    results, stats = _grade(HTTPGraderBackend(_raw_server(response)), retries=0, batch_size=len(REQUESTS))
+    assert [outcome for _, outcome in results] == ['fallback'] * len(REQUESTS)
+    assert stats['errors'] == stats['batches']
+
+
+def test_grade_all_over_http():
+    server = serve(port=0)
+    try:
+        graded = grade_all(HTTPGraderBackend(f'http://127.0.0.1:{server.server_address[1]}/grade'), REQUESTS)
+    finally:
+        server.shutdown()
+    assert [outcome for _, _, outcome in graded] == ['remote'] * len(REQUESTS)
+    assert all(seconds >= 0 for _, seconds, _ in graded)
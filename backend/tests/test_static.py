@@ -0,0 +1,55 @@
+"""Static snapshots: deterministic input hashes and incremental rebuilds"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import lms_static
+
+NOW = datetime(2026, 1, 8, 9, 0)
+
+HASH_SCRIPT = """
+from datetime import datetime
+import conftest, lms_static
+store = conftest.build_store()
+snap = store.snapshot()
+for user_id in ('t', 's0'):
+    user = store.users[user_id]
+    inputs = (lms_static.teacher_inputs if user.role == 'teacher' else lms_static.student_inputs)(snap, store, user)
+    print(lms_static.input_hash(inputs, datetime(2026, 1, 8)))
+"""
+
+
+def _hashes(seed):
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONHASHSEED=str(seed),
+               PYTHONPATH=os.pathsep.join([tests_dir, os.path.dirname(tests_dir)]))
+    output = subprocess.run([sys.executable, '-c', HASH_SCRIPT], env=env, capture_output=True, text=True, check=True)
+    return output.stdout.split()[-2:]
+
+
+def test_input_hash_does_not_depend_on_the_hash_seed():
+    assert _hashes(1) == _hashes(2) == _hashes(3)
+
+
+def test_rebuild_only_touches_changed_snapshots(store, tmp_path):
+    out = str(tmp_path)
+    first = lms_static.build_snapshots(store, out, workers=1, now=NOW)
+    assert len(first['built']) == len(store.users)
+
+    assert lms_static.build_snapshots(store, out, workers=1, now=NOW)['built'] == []
+
+    store.record_grade(store.submissions[('s4', 'c0a2')], 91, 'Good work')
+    rebuilt = lms_static.build_snapshots(store, out, workers=1, now=NOW)
+    assert sorted(rebuilt['built']) == ['student/s4', 'teacher/t']
+    assert rebuilt['unchanged'] == len(store.users) - 2
+
+
+def test_rebuild_removes_snapshots_of_deleted_users(store, tmp_path):
+    out = str(tmp_path)
+    lms_static.build_snapshots(store, out, workers=1, now=NOW)
+    del store.users['s11']
+    result = lms_static.build_snapshots(store, out, workers=1, now=NOW)
+    assert result['removed'] == ['student/s11']
+    assert not os.path.exists(os.path.join(out, 'students', 's11.json'))
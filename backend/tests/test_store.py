@@ -0,0 +1,73 @@
+"""Delta sync: versions, resets, filtered tombstones and compaction"""
+
+from datetime import datetime
+
+from lms_system import Submission
+
+
+def test_fresh_store_starts_at_version_one(store):
+    assert store.version == 1
+    assert store.entity_version('courses', 'c0') == 1
+
+
+def test_since_zero_resets_with_every_live_entity(store):
+    delta = store.changes_since(0)
+    assert delta['reset']
+    assert delta['version'] == 1
+    assert len(delta['courses']) == 2
+    assert len(delta['assignments']) == 6
+    assert len(delta['submissions']) == len(store.submissions)
+
+
+def test_current_version_gets_an_empty_delta(store):
+    delta = store.changes_since(store.version)
+    assert not delta['reset']
+    assert delta['submissions'] == [] and delta['deleted']['submissions'] == []
+
+
+def test_delta_holds_only_newer_changes(store):
+    since = store.version
+    store.add_submission(Submission('s0', 'c0a2', 'resubmitted', datetime(2026, 1, 9)))
+    delta = store.changes_since(since)
+    assert not delta['reset']
+    assert delta['version'] == since + 1
+    assert [(s['student_id'], s['assignment_id']) for s in delta['submissions']] == [('s0', 'c0a2')]
+    assert store.changes_since(delta['version'])['submissions'] == []
+
+
+def test_replica_from_the_future_is_reset(store):
+    # e.g. a client that synced with a store from before a server restart
+    delta = store.changes_since(store.version + 5)
+    assert delta['reset']
+    assert len(delta['submissions']) == len(store.submissions)
+
+
+def test_deletions_are_filtered_by_course_and_student(store):
+    since = store.version
+    store.remove_submission('s1', 'c0a0')
+    store.remove_submission('s2', 'c1a0')
+    store.remove_assignment('c1a1')
+
+    everything = store.changes_since(since)['deleted']
+    assert ['s1', 'c0a0'] in everything['submissions'] and ['s2', 'c1a0'] in everything['submissions']
+    assert everything['assignments'] == ['c1a1']
+
+    c0 = store.changes_since(since, courses={'c0'})['deleted']
+    assert c0['submissions'] == [['s1', 'c0a0']]
+    assert c0['assignments'] == []
+
+    s1 = store.changes_since(since, courses={'c0', 'c1'}, students={'s1'})['deleted']
+    assert sorted(s1['submissions']) == [['s1', 'c0a0'], ['s1', 'c1a1']]
+    assert s1['assignments'] == ['c1a1']
+
+
+def test_compaction_resets_clients_older_than_the_dropped_tombstones(store):
+    since = store.version
+    store.remove_submission('s1', 'c0a0')
+    store.add_submission(Submission('s3', 'c0a2', 'late', datetime(2026, 1, 12)))
+    compacted = store.compact(store.version)
+
+    assert compacted == store.version
+    assert store.changes_since(since)['reset']
+    assert not store.changes_since(compacted)['reset']
+    assert ('s1', 'c0a0') not in {(s['student_id'], s['assignment_id']) for s in store.changes_since(0)['submissions']}
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import { GraduationCap, BookOpen, Users, TrendingUp, Award, Brain, ChevronRight, CheckCircle, Clock, AlertTriangle, BarChart3 } from 'lucide-react';
 
 // Mock data - matches your Jupyter prototype
@@ -34,6 +34,8 @@ const mockData = {
   submissions: {
     s1: {
       id: 's1',
+      studentId: 'student1',
+      assignmentId: 'a1',
       student: 'Emma Wilson',
       assignment: 'Fractions Quiz',
       content: 'Completed all 20 problems with detailed work shown. Applied cross-multiplication method for complex fractions and showed step-by-step solutions.',
@@ -53,6 +55,22 @@ const mockData = {
   }
 };
 
+// Optional live updates from the Python backend (backend/lms_push.py).
+// Set REACT_APP_LMS_PUSH_URL, e.g. http://127.0.0.1:8765/events, and open the
+// app with ?session=<session_id> (a SessionManager session for the user) to enable.
+const PUSH_URL = process.env.REACT_APP_LMS_PUSH_URL;
+const PUSH_SESSION = new URLSearchParams(window.location.search).get('session');
+
+const useLiveUpdates = (user, onEvent) => {
+  useEffect(() => {
+    if (!PUSH_URL || !PUSH_SESSION || !user) return undefined;
+    const source = new EventSource(`${PUSH_URL}?session=${encodeURIComponent(PUSH_SESSION)}`);
+    const handle = (e) => onEvent(e.type, JSON.parse(e.data));
+    ['submission', 'grade', 'assignment'].forEach((type) => source.addEventListener(type, handle));
+    return () => source.close();
+  }, [user, onEvent]);
+};
+
 const LMSDemo = () => {
   const [currentView, setCurrentView] = useState('login');
   const [currentUser, setCurrentUser] = useState(null);
@@ -60,6 +78,23 @@ const LMSDemo = () => {
   const [submissions, setSubmissions] = useState(mockData.submissions);
   const [showAIGrading, setShowAIGrading] = useState(false);
 
+  // Apply grades pushed by the backend to the matching submission
+  const applyLiveEvent = useCallback((type, data) => {
+    if (type !== 'grade') return;
+    setSubmissions(prev => {
+      const id = Object.keys(prev).find(key =>
+        prev[key].studentId === data.student_id && prev[key].assignmentId === data.assignment_id
+      );
+      if (!id) return prev;
+      return {
+        ...prev,
+        [id]: { ...prev[id], grade: data.grade, aiScore: data.ai_score, feedback: data.feedback }
+      };
+    });
+  }, []);
+
+  useLiveUpdates(currentUser, applyLiveEvent);
+
   // AI Grading Function
   const gradeWithAI = (submissionId) => {
     setShowAIGrading(true);